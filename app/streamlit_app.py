@@ -14,7 +14,7 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
 from src.embeddings import EmbeddingService
 from src.vector_store import ChromaDBClient
-from src.retrieval import RAGRetriever
+from src.retrieval import RAGRetriever, RetrievalOptions
 from src.llm import OllamaClient
 from src.chat import MemoryManager
 from src.query import QueryEnhancer
@@ -213,9 +213,6 @@ def main():
         help="Minimum similarity score to include results"
     )
     
-    # Update retriever settings
-    retriever.use_reranking = use_reranking
-    
     st.sidebar.divider()
     
     # Hybrid search settings
@@ -242,9 +239,6 @@ def main():
         help="Expand queries with character variations and corrections"
     )
     
-    # Update retriever settings
-    retriever.use_hybrid_search = use_hybrid
-    
     st.sidebar.divider()
     
     # Citation settings
@@ -305,21 +299,32 @@ def main():
         with st.chat_message("assistant"):
             with st.spinner("Thinking..."):
                 
+                # Standalone retrieval query for follow-up questions
+                retrieval_query = retriever.condense_query(
+                    prompt, st.session_state.memory_manager.get_history()
+                )
+                
                 # Enhance query if enabled
-                enhanced_query = prompt
+                query_variants = None
                 if use_query_enhancement:
-                    enhanced_query = query_enhancer.enhance_query(prompt)
+                    query_variants = query_enhancer.get_query_variants(retrieval_query)
+                    enhanced_query = " OR ".join(query_variants)
                     if enhanced_query != prompt:
                         st.caption(f"🔍 Enhanced query: {enhanced_query}")
                 
                 # Retrieve relevant context
-                retrieved_chunks = retriever.retrieve(
-                    query=enhanced_query,
+                retrieval_options = RetrievalOptions.from_config(
+                    config['retrieval'],
+                    use_reranking=use_reranking,
+                    use_hybrid_search=use_hybrid,
                     initial_top_k=initial_top_k,
                     final_top_n=final_top_n,
                     similarity_threshold=similarity_threshold,
                     hybrid_alpha=hybrid_alpha
                 )
+                retrieved_chunks = retriever.retrieve(
+                    retrieval_query, retrieval_options, query_variants=query_variants
+                )
                 
                 # Format context for LLM
                 context = retriever.format_context(retrieved_chunks)
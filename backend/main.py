@@ -1,9 +1,14 @@
 """
 FastAPI Backend for Silverlight Studios Voice Chat Interface
 """
+import hashlib
+import json
 import logging
+import time
 from typing import Dict
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException
+from fastapi import (
+    FastAPI, WebSocket, WebSocketDisconnect, UploadFile, File, HTTPException, Request, Response
+)
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
@@ -21,7 +26,7 @@ from backend.models.schemas import (
     VoiceStatusResponse
 )
 from backend.services.transcription_service import TranscriptionService
-from backend.services.rag_service import RAGService
+from backend.services.rag_service import RAGService, RetrievalTrace
 
 # Configure logging
 logging.basicConfig(
@@ -55,11 +60,13 @@ class ConnectionManager:
     def __init__(self):
         self.active_connections: Dict[str, WebSocket] = {}
         self.memory_managers: Dict[str, any] = {}
+        self.session_states: Dict[str, any] = {}
     
     async def connect(self, websocket: WebSocket, client_id: str):
         await websocket.accept()
         self.active_connections[client_id] = websocket
         self.memory_managers[client_id] = rag_service.create_memory_manager()
+        self.session_states[client_id] = rag_service.create_session_state()
         logger.info(f"Client {client_id} connected")
     
     def disconnect(self, client_id: str):
@@ -67,10 +74,14 @@ class ConnectionManager:
             del self.active_connections[client_id]
         if client_id in self.memory_managers:
             del self.memory_managers[client_id]
+        self.session_states.pop(client_id, None)
         logger.info(f"Client {client_id} disconnected")
     
     def get_memory_manager(self, client_id: str):
         return self.memory_managers.get(client_id)
+    
+    def get_session_state(self, client_id: str):
+        return self.session_states.get(client_id)
 
 manager = ConnectionManager()
 
@@ -140,12 +151,37 @@ async def get_settings():
         "initial_top_k": {"min": 5, "max": 50, "step": 5},
         "final_top_n": {"min": 1, "max": 10, "step": 1},
         "similarity_threshold": {"min": 0.0, "max": 1.0, "step": 0.05},
-        "hybrid_alpha": {"min": 0.0, "max": 1.0, "step": 0.05}
+        "hybrid_alpha": {"min": 0.0, "max": 1.0, "step": 0.05},
+        "mmr_lambda": {"min": 0.0, "max": 1.0, "step": 0.05}
     }
     
     return SettingsResponse(defaults=defaults, ranges=ranges)
 
 
+@app.get("/api/retrieval/stats")
+async def get_retrieval_stats():
+    """Get retrieval cache statistics (hit rates for sizing caches)"""
+    return rag_service.get_retrieval_stats()
+
+
+@app.get("/api/sources/{source_id}")
+async def get_source(source_id: str, request: Request):
+    """Full text and metadata of a retrieved source, fetched when the user expands it"""
+    source = rag_service.get_source(source_id)
+    if source is None:
+        raise HTTPException(status_code=404, detail="Source not found")
+    
+    # Sources only change on re-ingestion; the ETag lets clients revalidate cheaply
+    digest = hashlib.sha1(json.dumps(source, sort_keys=True, default=str).encode("utf-8"))
+    headers = {
+        "ETag": f'"{digest.hexdigest()}"',
+        "Cache-Control": f"private, max-age={config.get('retrieval.source_cache_max_age', 3600)}"
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=source, headers=headers)
+
+
 @app.post("/api/transcribe", response_model=TranscriptionResponse)
 async def transcribe_audio(request: TranscriptionRequest):
     """Transcribe audio to text using OpenAI Whisper"""
@@ -169,20 +205,35 @@ async def chat(request: ChatRequest):
     """Standard REST chat endpoint (non-streaming)"""
     try:
         settings = request.settings or ChatSettings()
+        start_time = time.perf_counter()
+        
+        # Known FAQ question: answer from the FAQ index without the LLM
+        if settings.use_faq_answers:
+            faq_match = rag_service.match_faq(request.query)
+            if faq_match is not None:
+                rag_service.record_answer_latency('faq', (time.perf_counter() - start_time) * 1000)
+                return ChatResponse(
+                    response=faq_match['answer'],
+                    sources=[rag_service.faq_source(faq_match)]
+                )
         
-        # Enhance query if enabled
+        # Expand query into variants if enabled
+        query_variants = None
         enhanced_query = request.query
         if settings.use_query_enhancement:
-            enhanced_query = rag_service.enhance_query(request.query)
+            query_variants = rag_service.get_query_variants(request.query)
+            enhanced_query = " OR ".join(query_variants)
         
         # Retrieve context
         chunks = rag_service.retrieve_context(
-            query=enhanced_query,
+            query=request.query,
             initial_top_k=settings.initial_top_k,
             final_top_n=settings.final_top_n,
             similarity_threshold=settings.similarity_threshold,
             use_reranking=settings.use_reranking,
-            hybrid_alpha=settings.hybrid_alpha
+            hybrid_alpha=settings.hybrid_alpha,
+            query_variants=query_variants,
+            mmr_lambda=settings.mmr_lambda
         )
         
         # Format context
@@ -207,9 +258,11 @@ async def chat(request: ChatRequest):
         except Exception as e:
             logger.error(f"Error generating suggested questions: {e}")
         
+        rag_service.record_answer_latency('rag', (time.perf_counter() - start_time) * 1000)
+        
         return ChatResponse(
             response=response,
-            sources=chunks,
+            sources=rag_service.serialize_sources(chunks),
             enhanced_query=enhanced_query if enhanced_query != request.query else None,
             suggested_questions=suggested_questions if suggested_questions else None
         )
@@ -235,6 +288,7 @@ async def websocket_chat(websocket: WebSocket):
             
             query = data.get("query")
             settings_data = data.get("settings", {})
+            include_trace = bool(data.get("include_trace", False))
             
             if not query:
                 await websocket.send_json({
@@ -247,13 +301,41 @@ async def websocket_chat(websocket: WebSocket):
             settings = ChatSettings(**settings_data) if settings_data else ChatSettings()
             
             try:
+                start_time = time.perf_counter()
+                
                 # Get memory manager for this client
                 memory_manager = manager.get_memory_manager(client_id)
                 
-                # Enhance query if enabled
-                enhanced_query = query
+                # Known FAQ question: send the stored answer and skip retrieval and the LLM
+                if settings.use_faq_answers:
+                    faq_match = rag_service.match_faq(query)
+                    if faq_match is not None:
+                        await websocket.send_json({
+                            "type": "sources",
+                            "content": [rag_service.faq_source(faq_match)]
+                        })
+                        await websocket.send_json({
+                            "type": "chunk",
+                            "content": faq_match['answer']
+                        })
+                        memory_manager.add_user_message(query)
+                        memory_manager.add_assistant_message(faq_match['answer'])
+                        rag_service.record_answer_latency(
+                            'faq', (time.perf_counter() - start_time) * 1000
+                        )
+                        await websocket.send_json({
+                            "type": "done"
+                        })
+                        continue
+                
+                # Standalone retrieval query for follow-up questions
+                retrieval_query = rag_service.condense_query(query, memory_manager.get_history())
+                
+                # Expand query into variants if enabled
+                query_variants = None
                 if settings.use_query_enhancement:
-                    enhanced_query = rag_service.enhance_query(query)
+                    query_variants = rag_service.get_query_variants(retrieval_query)
+                    enhanced_query = " OR ".join(query_variants)
                     if enhanced_query != query:
                         await websocket.send_json({
                             "type": "enhanced_query",
@@ -261,23 +343,35 @@ async def websocket_chat(websocket: WebSocket):
                         })
                 
                 # Retrieve context
+                trace = RetrievalTrace() if include_trace else None
                 chunks = rag_service.retrieve_context(
-                    query=enhanced_query,
+                    query=retrieval_query,
                     initial_top_k=settings.initial_top_k,
                     final_top_n=settings.final_top_n,
                     similarity_threshold=settings.similarity_threshold,
                     use_reranking=settings.use_reranking,
-                    hybrid_alpha=settings.hybrid_alpha
+                    hybrid_alpha=settings.hybrid_alpha,
+                    query_variants=query_variants,
+                    trace=trace,
+                    mmr_lambda=settings.mmr_lambda,
+                    session=manager.get_session_state(client_id)
                 )
                 
                 # Send sources
                 await websocket.send_json({
                     "type": "sources",
-                    "content": chunks
+                    "content": rag_service.serialize_sources(chunks)
                 })
                 
-                # Format context
-                context = rag_service.format_context(chunks)
+                # Format context within the token budget
+                context = rag_service.format_context(chunks, trace=trace)
+                
+                # Send per-stage retrieval timings and packing stats if requested
+                if trace is not None:
+                    await websocket.send_json({
+                        "type": "trace",
+                        "content": trace.to_dict()
+                    })
                 
                 # Get chat history
                 chat_history = memory_manager.get_history()
@@ -316,6 +410,7 @@ async def websocket_chat(websocket: WebSocket):
                 
                 # Add assistant message to memory
                 memory_manager.add_assistant_message(full_response)
+                rag_service.record_answer_latency('rag', (time.perf_counter() - start_time) * 1000)
                 
                 # Generate suggested questions based on response and chunks
                 try:
@@ -0,0 +1,3 @@
+"""
+Pydantic request and response schemas for the backend API
+"""
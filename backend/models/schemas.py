@@ -0,0 +1,80 @@
+"""
+Pydantic schemas for the REST and WebSocket API
+"""
+from typing import List, Dict, Any, Optional, Literal
+from pydantic import BaseModel, Field
+
+
+class ChatSettings(BaseModel):
+    """Per-request RAG settings"""
+    use_reranking: bool = True
+    initial_top_k: int = Field(25, ge=1, le=100)
+    final_top_n: int = Field(5, ge=1, le=20)
+    similarity_threshold: float = Field(0.3, ge=0.0, le=1.0)
+    use_hybrid_search: bool = True
+    hybrid_alpha: float = Field(0.5, ge=0.0, le=1.0)
+    use_query_enhancement: bool = True
+    use_faq_answers: bool = True
+    mmr_lambda: Optional[float] = Field(None, ge=0.0, le=1.0)
+    citation_style: Literal["clean", "inline", "none"] = "clean"
+
+
+class ChatRequest(BaseModel):
+    """REST chat request"""
+    query: str
+    settings: Optional[ChatSettings] = None
+
+
+class ChatResponse(BaseModel):
+    """REST chat response"""
+    response: str
+    sources: List[Dict[str, Any]] = []
+    enhanced_query: Optional[str] = None
+    suggested_questions: Optional[List[str]] = None
+
+
+class TranscriptionRequest(BaseModel):
+    """Base64-encoded audio to transcribe"""
+    audio: str
+    format: str = "webm"
+
+
+class TranscriptionResponse(BaseModel):
+    """Transcription result"""
+    text: str
+    success: bool
+    error: Optional[str] = None
+
+
+class HealthResponse(BaseModel):
+    """Service health"""
+    status: str
+    llm_connected: bool
+    llm_provider: str
+    services_loaded: bool
+
+
+class SettingsResponse(BaseModel):
+    """Default settings and the ranges the UI offers"""
+    defaults: ChatSettings
+    ranges: Dict[str, Dict[str, float]]
+
+
+class VoiceSampleRequest(BaseModel):
+    """Base64-encoded voice sample for TTS voice cloning"""
+    audio: str
+    format: str = "webm"
+    session_id: Optional[str] = None
+
+
+class VoiceSampleResponse(BaseModel):
+    """Voice sample upload result"""
+    success: bool
+    message: str
+    error: Optional[str] = None
+
+
+class VoiceStatusResponse(BaseModel):
+    """Whether a session has a voice sample"""
+    has_voice: bool
+    session_id: str
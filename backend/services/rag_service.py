@@ -2,8 +2,11 @@
 RAG Service wrapper around existing components
 """
 import sys
+import json
+import threading
+from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Generator
+from typing import List, Dict, Any, Generator, Optional
 import logging
 
 # Add parent directory to path for imports
@@ -12,7 +15,10 @@ sys.path.insert(0, str(project_root))
 
 from src.embeddings import EmbeddingService
 from src.vector_store import ChromaDBClient
-from src.retrieval import RAGRetriever
+from src.retrieval import (
+    RAGRetriever, RetrievalOptions, RetrievalTrace, FAQIndex, SessionRetrievalState
+)
+from src.retrieval.sentence_window import window_sentence_ids
 from src.llm import OllamaClient
 from src.llm.groq_client import GroqClient
 from src.chat import MemoryManager
@@ -20,6 +26,11 @@ from src.query import QueryEnhancer
 
 logger = logging.getLogger(__name__)
 
+# Metadata and score fields sent with each source; the full text and
+# metadata are fetched on demand from /api/sources/{id}
+SOURCE_METADATA_FIELDS = ('source_file', 'page_num', 'document_type', 'chapter')
+SOURCE_SCORE_FIELDS = ('similarity', 'rerank_score', 'bm25_score', 'retrieval_method')
+
 
 class RAGService:
     """Service wrapper for RAG functionality"""
@@ -46,6 +57,17 @@ class RAGService:
             collection_name=config.vector_db_config['collection_name']
         )
         
+        # Sentence-level collection for index_granularity "sentence", if ingested
+        sentence_store = None
+        sentence_collection = config.vector_db_config.get('sentence_collection_name')
+        if sentence_collection:
+            sentence_store = ChromaDBClient(
+                persist_directory=config.vector_db_config['persist_directory'],
+                collection_name=sentence_collection
+            )
+            if sentence_store.get_collection_stats()['document_count'] == 0:
+                sentence_store = None
+        
         # Initialize retriever with hybrid search
         self.retriever = RAGRetriever(
             vector_store=self.vector_store,
@@ -53,9 +75,70 @@ class RAGService:
             reranker_model=config.retrieval_config['reranker_model'],
             use_reranking=config.retrieval_config['use_reranking'],
             use_hybrid_search=True,
-            bm25_index_path=str(config.bm25_index_path)
+            bm25_index_path=str(config.bm25_index_path),
+            rerank_cache_size=config.retrieval_config.get('rerank_cache_size', 4096),
+            rerank_mode=config.retrieval_config.get('rerank_mode', 'full'),
+            cascade_mass=config.retrieval_config.get('cascade_mass', 0.9),
+            cascade_temperature=config.retrieval_config.get('cascade_temperature', 0.1),
+            cascade_latency_budget_ms=config.retrieval_config.get('cascade_latency_budget_ms', 150),
+            rerank_skip_threshold=config.retrieval_config.get('rerank_skip_threshold'),
+            reranker_max_length=config.retrieval_config.get('reranker_max_length', 512),
+            reranker_batch_size=config.retrieval_config.get('reranker_batch_size', 32),
+            reranker_backend=config.retrieval_config.get('reranker_backend', 'torch'),
+            reranker_onnx_dir=config.retrieval_config.get('reranker_onnx_dir', './models/onnx'),
+            learned_ranker_path=config.retrieval_config.get(
+                'learned_ranker_path', './models/learned_ranker.json'
+            ),
+            semantic_cache_size=config.retrieval_config.get('semantic_cache_size', 0),
+            semantic_cache_threshold=config.retrieval_config.get('semantic_cache_threshold', 0.95),
+            index_manifest_path=config.vector_db_config.get('manifest_path'),
+            condensed_query_max_tokens=config.retrieval_config.get('condensed_query_max_tokens', 48),
+            context_token_budget=config.retrieval_config.get('context_token_budget'),
+            context_tokenizer=config.retrieval_config.get('context_tokenizer'),
+            adaptive_gap_ratio=config.retrieval_config.get('adaptive_gap_ratio', 0.5),
+            adaptive_min_score=config.retrieval_config.get('adaptive_min_score'),
+            router_centroids_path=config.vector_db_config.get('router_centroids_path'),
+            router_min_confidence=config.retrieval_config.get('router_min_confidence', 0.6),
+            router_max_types=config.retrieval_config.get('router_max_types', 2),
+            router_min_keyword_votes=config.retrieval_config.get('router_min_keyword_votes', 2),
+            mmr_pool_factor=config.retrieval_config.get('mmr_pool_factor', 3),
+            entity_index_path=config.vector_db_config.get('entity_index_path'),
+            entity_max_restrict=config.retrieval_config.get('entity_max_restrict', 40),
+            entity_max_df=config.retrieval_config.get('entity_max_df', 0.2),
+            sentence_store=sentence_store,
+            document_index_path=config.vector_db_config.get('document_index_path')
+        )
+        
+        # Characters of matched text sent with each source
+        self.source_snippet_chars = config.retrieval_config.get('source_snippet_chars', 240)
+        
+        # Base options that each request's settings are applied on top of
+        self.default_retrieval_options = RetrievalOptions.from_config(
+            config.retrieval_config, use_hybrid_search=True
         )
         
+        # Stored answers for known FAQ questions, served without the LLM
+        if config.retrieval_config.get('faq_enabled', True):
+            self.faq_index = FAQIndex(
+                persist_path=config.retrieval_config.get('faq_index_path', './faq_index'),
+                match_threshold=config.retrieval_config.get('faq_match_threshold', 0.9)
+            )
+        else:
+            self.faq_index = None
+        
+        # Answer latency of FAQ and full RAG answers, for the latency saved by the FAQ index
+        self._answer_latency = {"faq": [0, 0.0], "rag": [0, 0.0]}
+        self._answer_latency_lock = threading.Lock()
+        
+        # Query log used to calibrate the rerank skip threshold
+        query_log_path = config.retrieval_config.get('query_log_path')
+        self.query_log_path = Path(query_log_path) if query_log_path else None
+        self._query_log_lock = threading.Lock()
+        
+        # Running totals of context tokens before and after packing
+        self._context_stats = {"requests": 0, "unpacked_tokens": 0, "context_tokens": 0}
+        self._context_stats_lock = threading.Lock()
+        
         # Initialize LLM based on provider
         llm_provider = config.llm_provider
         
@@ -89,16 +172,208 @@ class RAGService:
             "vector_store_loaded": self.vector_store.get_collection_stats()['document_count'] > 0
         }
     
+    def get_retrieval_stats(self) -> Dict[str, Any]:
+        """Get retrieval cache and branch latency statistics"""
+        return {
+            "rerank_cache": self.retriever.get_rerank_cache_stats(),
+            "semantic_cache": self.retriever.get_semantic_cache_stats(),
+            "branch_timings": self.retriever.get_branch_timing_stats(),
+            "entity_index": self.retriever.get_entity_index_stats(),
+            "document_index": self.retriever.get_document_index_stats(),
+            "context_packing": self.get_context_packing_stats(),
+            "faq": self.get_faq_stats()
+        }
+    
+    def get_context_packing_stats(self) -> Dict[str, Any]:
+        """Get average context tokens per request before and after packing"""
+        with self._context_stats_lock:
+            stats = dict(self._context_stats)
+        requests = stats["requests"]
+        if not requests:
+            return {"requests": 0}
+        return {
+            "requests": requests,
+            "mean_unpacked_tokens": stats["unpacked_tokens"] / requests,
+            "mean_context_tokens": stats["context_tokens"] / requests,
+            "mean_tokens_saved": (stats["unpacked_tokens"] - stats["context_tokens"]) / requests
+        }
+    
+    def match_faq(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Look the query up in the FAQ direct-answer index
+        
+        Args:
+            query: User question
+        
+        Returns:
+            Matched question/answer pair with its source and confidence, or None
+        """
+        if self.faq_index is None or not len(self.faq_index):
+            return None
+        
+        query_embedding = self.embedding_service.embed_query(query)
+        match = self.faq_index.match(query, query_embedding)
+        if match is not None:
+            logger.info(
+                f"FAQ match ({match['confidence']:.3f}, {match['matched_by']}): {match['question']}"
+            )
+        return match
+    
+    @staticmethod
+    def faq_source(match: Dict[str, Any]) -> Dict[str, Any]:
+        """Source entry for an FAQ answer, in the same shape as retrieved chunks"""
+        return {
+            "id": f"faq:{match['source_file']}:{match['question']}",
+            "text": f"Q: {match['question']}\nA: {match['answer']}",
+            "metadata": {
+                "source_file": match['source_file'],
+                "page_num": match['page_num'],
+                "document_type": "faq"
+            },
+            "faq_match": {
+                "question": match['question'],
+                "confidence": match['confidence'],
+                "matched_by": match['matched_by']
+            }
+        }
+    
+    def serialize_sources(self, chunks: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Lean source entries for the client.
+        Each source carries its IDs, a title, a snippet of the matched text,
+        the display metadata and its scores; the full text is fetched lazily
+        through get_source() when the user expands the source.
+        
+        Args:
+            chunks: Retrieved chunks
+            
+        Returns:
+            JSON-ready source dicts
+        """
+        sources = []
+        for chunk in chunks:
+            metadata = chunk.get('metadata') or {}
+            text = chunk.get('text') or ''
+            snippet = self._snippet(chunk.get('hit_text') or text)
+            source_file = str(metadata.get('source_file', 'Unknown'))
+            title = Path(source_file).stem
+            if metadata.get('chapter'):
+                title = f"{title}, {metadata['chapter']}"
+            
+            source = {
+                'id': chunk['id'],
+                # Expanded hits are fetched as the run of chunks they cover
+                'source_id': ','.join(chunk.get('expanded_chunk_ids') or [chunk['id']]),
+                'title': title,
+                'snippet': snippet,
+                'truncated': snippet != text,
+                'metadata': {
+                    field: metadata[field] for field in SOURCE_METADATA_FIELDS if field in metadata
+                }
+            }
+            source.update({field: chunk[field] for field in SOURCE_SCORE_FIELDS if field in chunk})
+            sources.append(source)
+        
+        return sources
+    
+    def _snippet(self, text: str) -> str:
+        """Start of a text, cut at a word boundary"""
+        if len(text) <= self.source_snippet_chars:
+            return text
+        return text[:self.source_snippet_chars].rsplit(' ', 1)[0] + '…'
+    
+    def get_source(self, source_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Full text and metadata of a source sent by serialize_sources.
+        
+        Args:
+            source_id: Chunk ID, comma-separated chunk IDs of an expanded hit,
+                or a sentence window ID
+            
+        Returns:
+            Dict with 'id', 'text' and 'metadata', or None if it does not exist
+        """
+        sentence_ids = window_sentence_ids(source_id)
+        if sentence_ids and self.retriever.sentence_store is not None:
+            store, ids, separator = self.retriever.sentence_store, sentence_ids, ' '
+        else:
+            store, ids, separator = self.vector_store, source_id.split(','), '\n'
+        
+        stored = store.get_by_ids(ids, include=["documents", "metadatas"])
+        found = {
+            stored_id: (text, metadata)
+            for stored_id, text, metadata in zip(
+                stored['ids'], stored['documents'], stored['metadatas']
+            )
+        }
+        # Windows are clipped to the sentences of the page; chunk runs must be complete
+        if sentence_ids:
+            ids = [i for i in ids if i in found]
+        if not ids or any(i not in found for i in ids):
+            return None
+        
+        return {
+            'id': source_id,
+            'text': separator.join(found[i][0] for i in ids),
+            'metadata': found[ids[0]][1] or {}
+        }
+    
+    def record_answer_latency(self, kind: str, elapsed_ms: float) -> None:
+        """Record the end-to-end latency of an answer ('faq' or 'rag')"""
+        with self._answer_latency_lock:
+            stats = self._answer_latency[kind]
+            stats[0] += 1
+            stats[1] += elapsed_ms
+    
+    def get_faq_stats(self) -> Dict[str, Any]:
+        """Get the FAQ match rate and the latency saved by direct answers"""
+        if self.faq_index is None:
+            return {"enabled": False}
+        
+        with self._answer_latency_lock:
+            (faq_count, faq_ms), (rag_count, rag_ms) = (
+                self._answer_latency["faq"], self._answer_latency["rag"]
+            )
+        mean_faq_ms = faq_ms / faq_count if faq_count else 0.0
+        mean_rag_ms = rag_ms / rag_count if rag_count else 0.0
+        
+        stats = {"enabled": True, **self.faq_index.get_stats()}
+        stats.update({
+            "mean_faq_answer_ms": mean_faq_ms,
+            "mean_rag_answer_ms": mean_rag_ms,
+            "estimated_ms_saved": faq_count * max(mean_rag_ms - mean_faq_ms, 0.0) if rag_count else None
+        })
+        return stats
+    
     def create_memory_manager(self, max_turns: int = None) -> MemoryManager:
         """Create a new memory manager instance for a session"""
         if max_turns is None:
             max_turns = self.config.memory_config.get('k', 5)
         return MemoryManager(max_turns=max_turns)
     
+    def create_session_state(self) -> Optional[SessionRetrievalState]:
+        """Create the retrieval state reused across a session's follow-up questions"""
+        retrieval_config = self.config.retrieval_config
+        if not retrieval_config.get('session_reuse', False):
+            return None
+        return SessionRetrievalState(
+            topic_threshold=retrieval_config.get('session_topic_threshold', 0.7),
+            fresh_top_k=retrieval_config.get('session_fresh_top_k', 6),
+            pool_size=retrieval_config.get('session_pool_size', 12)
+        )
+    
     def enhance_query(self, query: str) -> str:
         """Enhance query using query enhancer"""
         return self.query_enhancer.enhance_query(query)
     
+    def condense_query(self, query: str, chat_history: List[Dict[str, str]] = None) -> str:
+        """Turn a follow-up question into a standalone retrieval query"""
+        return self.retriever.condense_query(query, chat_history)
+    
+    def get_query_variants(self, query: str) -> List[str]:
+        """Get query variants to search in parallel"""
+        return self.query_enhancer.get_query_variants(query)
+    
     def retrieve_context(
         self,
         query: str,
@@ -106,7 +381,11 @@ class RAGService:
         final_top_n: int = 5,
         similarity_threshold: float = 0.3,
         use_reranking: bool = True,
-        hybrid_alpha: float = 0.5
+        hybrid_alpha: float = 0.5,
+        query_variants: List[str] = None,
+        trace: RetrievalTrace = None,
+        mmr_lambda: Optional[float] = None,
+        session: Optional[SessionRetrievalState] = None
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant context for query
@@ -118,28 +397,85 @@ class RAGService:
             similarity_threshold: Minimum similarity score
             use_reranking: Whether to use reranking
             hybrid_alpha: Weight for hybrid search (0=keyword, 1=semantic)
+            query_variants: Query rewrites searched alongside the query
+            trace: Optional RetrievalTrace filled with per-stage timings
+            mmr_lambda: MMR relevance weight for a diverse final set
+                (None uses the configured default)
+            session: Conversation state; on-topic follow-ups rerank the previous
+                turn's candidates instead of running a full search
         
         Returns:
             List of retrieved chunks with metadata
         """
-        # Update retriever settings
-        self.retriever.use_reranking = use_reranking
-        self.retriever.use_hybrid_search = True
-        
-        # Retrieve chunks
-        chunks = self.retriever.retrieve(
-            query=query,
+        # Request-scoped options; the shared retriever is never mutated
+        options = self.default_retrieval_options.replace(
             initial_top_k=initial_top_k,
             final_top_n=final_top_n,
             similarity_threshold=similarity_threshold,
+            use_reranking=use_reranking,
+            use_hybrid_search=True,
             hybrid_alpha=hybrid_alpha
         )
+        if mmr_lambda is not None:
+            options = options.replace(mmr_lambda=mmr_lambda)
+        
+        # Retrieve chunks
+        chunks = self.retriever.retrieve(
+            query, options, query_variants=query_variants, trace=trace, session=session
+        )
+        
+        self._log_query(query, chunks)
         
         return chunks
     
-    def format_context(self, chunks: List[Dict[str, Any]]) -> str:
-        """Format retrieved chunks into context string"""
-        return self.retriever.format_context(chunks)
+    def _log_query(self, query: str, chunks: List[Dict[str, Any]]) -> None:
+        """Append the query and its rerank decision to the query log"""
+        if self.query_log_path is None:
+            return
+        
+        decision = chunks[0].get('rerank_decision', {}) if chunks else {}
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "query": query,
+            "reranked": decision.get('reranked'),
+            "rerank_reason": decision.get('reason'),
+            "confidence": decision.get('confidence')
+        }
+        
+        try:
+            with self._query_log_lock:
+                self.query_log_path.parent.mkdir(parents=True, exist_ok=True)
+                with open(self.query_log_path, 'a') as f:
+                    f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning(f"Could not write query log: {e}")
+    
+    def format_context(self, chunks: List[Dict[str, Any]], trace: RetrievalTrace = None) -> str:
+        """
+        Format retrieved chunks into a token-budgeted context string
+        
+        Args:
+            chunks: Retrieved chunks
+            trace: Optional RetrievalTrace that receives the packing statistics
+        
+        Returns:
+            Context string for the LLM
+        """
+        context, stats = self.retriever.pack_context(chunks)
+        
+        if stats:
+            logger.info(
+                f"Context packed: {stats['context_tokens']} tokens "
+                f"({stats['tokens_saved']} saved, {stats['merged_chunks']} chunks merged)"
+            )
+            with self._context_stats_lock:
+                self._context_stats["requests"] += 1
+                self._context_stats["unpacked_tokens"] += stats["unpacked_tokens"]
+                self._context_stats["context_tokens"] += stats["context_tokens"]
+        if trace is not None:
+            trace.note(context_packing=stats)
+        
+        return context
     
     def generate_response(
         self,
@@ -4,7 +4,8 @@
 
 'use client';
 
-import { Message, Source } from '@/types';
+import { Message, Source, SourceDetail } from '@/types';
+import { getSource } from '@/services/api';
 import ReactMarkdown from 'react-markdown';
 import remarkGfm from 'remark-gfm';
 import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
@@ -163,6 +164,22 @@ export default function MessageBubble({ message, isStreaming = false, isGenerati
 
 function SourceItem({ source, index }: { source: Source; index: number }) {
   const [expanded, setExpanded] = useState(false);
+  const [detail, setDetail] = useState<SourceDetail | null>(null);
+  const [loading, setLoading] = useState(false);
+
+  // Full text is fetched the first time the source is expanded
+  const toggleExpanded = async () => {
+    const opening = !expanded;
+    setExpanded(opening);
+    if (opening && !detail && !source.text && source.source_id) {
+      setLoading(true);
+      setDetail(await getSource(source.source_id));
+      setLoading(false);
+    }
+  };
+
+  const metadata = { ...source.metadata, ...(detail?.metadata || {}) };
+  const fullText = detail?.text || source.text || source.snippet || '';
 
   // Helper function to safely parse metadata arrays
   const parseMetadataArray = (value: any): string[] => {
@@ -179,19 +196,19 @@ function SourceItem({ source, index }: { source: Source; index: number }) {
     return [];
   };
 
-  const characters = parseMetadataArray(source.metadata.characters);
-  const locations = parseMetadataArray(source.metadata.locations);
-  const spells = parseMetadataArray(source.metadata.spells);
+  const characters = parseMetadataArray(metadata.characters);
+  const locations = parseMetadataArray(metadata.locations);
+  const spells = parseMetadataArray(metadata.spells);
 
   return (
     <div className="bg-secondary/50 backdrop-blur-sm border border-border rounded-lg p-3 text-sm">
       <div className="flex justify-between items-start gap-2 mb-1">
         <div className="font-semibold text-foreground">
-          Source {index}: {source.metadata.source_file || 'Unknown'}, Page{' '}
-          {source.metadata.page_num || '?'}
+          Source {index}: {source.title || metadata.source_file || 'Unknown'}, Page{' '}
+          {metadata.page_num || '?'}
         </div>
         <motion.button
-          onClick={() => setExpanded(!expanded)}
+          onClick={toggleExpanded}
           whileHover={{ scale: 1.05 }}
           whileTap={{ scale: 0.95 }}
           className="text-foreground-muted hover:text-primary text-xs transition-colors"
@@ -200,6 +217,10 @@ function SourceItem({ source, index }: { source: Source; index: number }) {
         </motion.button>
       </div>
 
+      {!expanded && source.snippet && (
+        <div className="text-xs text-foreground-muted mb-1">{source.snippet}</div>
+      )}
+
       <div className="text-xs text-foreground-muted space-y-1">
         {source.similarity !== undefined && (
           <div>Similarity: {source.similarity.toFixed(3)}</div>
@@ -222,7 +243,7 @@ function SourceItem({ source, index }: { source: Source; index: number }) {
           className="mt-2"
         >
           <div className="text-xs bg-background rounded p-2 max-h-32 overflow-y-auto border border-border">
-            {source.text}
+            {loading ? 'Loading…' : fullText}
           </div>
 
           {(characters.length > 0 || locations.length > 0 || spells.length > 0) && (
@@ -6,6 +6,7 @@ import {
   TranscriptionResponse, 
   HealthStatus, 
   SettingsResponse,
+  SourceDetail,
   VoiceSampleResponse,
   TTSResponse,
   VoiceStatusResponse
@@ -80,6 +81,22 @@ export async function getSettings(): Promise<SettingsResponse | null> {
   }
 }
 
+/**
+ * Get the full text and metadata of a retrieved source
+ */
+export async function getSource(sourceId: string): Promise<SourceDetail | null> {
+  try {
+    const response = await fetch(`${API_URL}/api/sources/${encodeURIComponent(sourceId)}`);
+    if (!response.ok) {
+      throw new Error(`Source fetch failed: ${response.statusText}`);
+    }
+    return await response.json();
+  } catch (error) {
+    console.error('Get source error:', error);
+    return null;
+  }
+}
+
 /**
  * Convert Blob to base64 string
  */
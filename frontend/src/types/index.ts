@@ -11,19 +11,35 @@ export interface Message {
   suggested_questions?: string[];
 }
 
+export interface SourceMetadata {
+  source_file?: string;
+  page_num?: number;
+  document_type?: string;
+  chapter?: string;
+  characters?: string[];
+  locations?: string[];
+  spells?: string[];
+}
+
 export interface Source {
-  text: string;
-  metadata: {
-    source_file?: string;
-    page_num?: number;
-    characters?: string[];
-    locations?: string[];
-    spells?: string[];
-  };
+  id?: string;
+  source_id?: string; // ID to fetch the full text from /api/sources/{id}
+  title?: string;
+  snippet?: string;
+  truncated?: boolean;
+  text?: string; // Full text (sent inline only for FAQ answers)
+  metadata: SourceMetadata;
   similarity?: number;
   rerank_score?: number;
   retrieval_method?: string;
   bm25_score?: number;
+  faq_match?: { question: string; confidence: number; matched_by: string };
+}
+
+export interface SourceDetail {
+  id: string;
+  text: string;
+  metadata: SourceMetadata;
 }
 
 export interface ChatSettings {
@@ -34,6 +50,8 @@ export interface ChatSettings {
   use_hybrid_search: boolean;
   hybrid_alpha: number;
   use_query_enhancement: boolean;
+  use_faq_answers?: boolean;
+  mmr_lambda?: number | null;
   citation_style: 'clean' | 'none';
 }
 
@@ -44,10 +62,35 @@ export interface TranscriptionResponse {
 }
 
 export interface WebSocketMessage {
-  type: 'chunk' | 'sources' | 'enhanced_query' | 'suggested_questions' | 'done' | 'error';
+  type: 'chunk' | 'sources' | 'enhanced_query' | 'suggested_questions' | 'trace' | 'done' | 'error';
   content: any;
 }
 
+export interface RetrievalTraceStage {
+  name: string;
+  start_ms: number;
+  duration_ms: number;
+  [detail: string]: any;
+}
+
+export interface RetrievalTrace {
+  total_ms: number;
+  stages: RetrievalTraceStage[];
+  candidate_counts: Record<string, number>;
+  cache: Record<string, { hits: number; misses: number }>;
+  query_variants?: number;
+  rerank_mode?: string;
+  rerank_decision?: { reranked: boolean; reason: string; confidence: number | null };
+  context_packing?: {
+    unpacked_tokens: number;
+    context_tokens: number;
+    tokens_saved: number;
+    merged_chunks: number;
+    duplicate_spans: number;
+    [detail: string]: any;
+  };
+}
+
 export interface HealthStatus {
   status: string;
   llm_connected: boolean;
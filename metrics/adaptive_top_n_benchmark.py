@@ -0,0 +1,102 @@
+"""
+Adaptive top-n benchmark: fixed final_top_n vs. the adaptive score cut-off.
+Reports chunks and packed context tokens per answer, recall on the evaluation
+query set, and a suggested adaptive_min_score calibrated from the rerank
+scores of relevant chunks.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import existing modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics.retrieval_eval import (
+    load_config,
+    load_eval_set,
+    build_retriever,
+    is_relevant,
+    recall_at_k,
+    mean
+)
+from src.retrieval.options import RetrievalOptions
+
+
+def main():
+    """Compare fixed and adaptive final_top_n on the evaluation set."""
+    parser = argparse.ArgumentParser(description="Benchmark the adaptive top-n cut-off")
+    parser.add_argument('--config', type=str, default='config/config.yaml')
+    parser.add_argument('--eval-set', type=str, default=None)
+    parser.add_argument('--relevant-coverage', type=float, default=0.95,
+                        help='Share of relevant chunks the suggested min score keeps')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    eval_set = load_eval_set(args.eval_set)
+    retrieval_config = config['retrieval']
+
+    retriever = build_retriever(
+        config,
+        rerank_mode=retrieval_config.get('rerank_mode', 'full'),
+        context_token_budget=retrieval_config.get('context_token_budget'),
+        context_tokenizer=retrieval_config.get('context_tokenizer'),
+        adaptive_gap_ratio=retrieval_config.get('adaptive_gap_ratio', 0.5),
+        adaptive_min_score=retrieval_config.get('adaptive_min_score')
+    )
+    fixed_options = RetrievalOptions.from_config(retrieval_config, adaptive_top_n=False)
+    adaptive_options = fixed_options.replace(adaptive_top_n=True)
+    top_n = fixed_options.final_top_n
+
+    rows = []
+    relevant_scores = []
+    for item in eval_set:
+        query = item['query']
+        fixed = retriever.retrieve(query, fixed_options)
+        adaptive = retriever.retrieve(query, adaptive_options)
+
+        relevant_scores.extend(
+            c['rerank_score'] for c in fixed if 'rerank_score' in c and is_relevant(c, item)
+        )
+
+        rows.append({
+            'query': query,
+            'fixed_chunks': len(fixed),
+            'adaptive_chunks': len(adaptive),
+            'fixed_tokens': retriever.pack_context(fixed)[1].get('context_tokens', 0),
+            'adaptive_tokens': retriever.pack_context(adaptive)[1].get('context_tokens', 0),
+            'fixed_recall': recall_at_k(fixed, item, top_n),
+            'adaptive_recall': recall_at_k(adaptive, item, top_n),
+            'reason': adaptive[0].get('top_n_decision', {}).get('reason', '-') if adaptive else '-'
+        })
+
+    print("\n" + "=" * 100)
+    print(f"{'Query':<50} {'N fixed':>8} {'N adapt':>8} {'Tok fixed':>10} {'Tok adapt':>10}  {'Reason'}")
+    print("-" * 100)
+    for row in rows:
+        print(
+            f"{row['query'][:50]:<50} {row['fixed_chunks']:>8} {row['adaptive_chunks']:>8} "
+            f"{row['fixed_tokens']:>10} {row['adaptive_tokens']:>10}  {row['reason']}"
+        )
+    print("-" * 100)
+
+    fixed_tokens = mean([r['fixed_tokens'] for r in rows])
+    adaptive_tokens = mean([r['adaptive_tokens'] for r in rows])
+    saved = (1 - adaptive_tokens / fixed_tokens) * 100 if fixed_tokens else 0.0
+    print(f"Avg chunks per answer:  fixed {mean([r['fixed_chunks'] for r in rows]):.2f} | "
+          f"adaptive {mean([r['adaptive_chunks'] for r in rows]):.2f}")
+    print(f"Avg context tokens:     fixed {fixed_tokens:.1f} | adaptive {adaptive_tokens:.1f} "
+          f"({saved:.1f}% saved)")
+    print(f"Avg recall@{top_n}:          fixed {mean([r['fixed_recall'] for r in rows]):.3f} | "
+          f"adaptive {mean([r['adaptive_recall'] for r in rows]):.3f}")
+    if relevant_scores:
+        suggested = float(np.percentile(relevant_scores, (1 - args.relevant_coverage) * 100))
+        print(f"Suggested adaptive_min_score (keeps {args.relevant_coverage:.0%} of relevant "
+              f"chunks): {suggested:.3f}")
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Two-level search benchmark: flat chunk search vs. document routing.
+For each document_top_k, reports retrieval latency, recall of the final
+results, and document recall (share of relevant source files among the
+selected documents) on the evaluation query set.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import existing modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics.retrieval_eval import (
+    load_config,
+    load_eval_set,
+    build_retriever,
+    recall_at_k,
+    timed,
+    mean
+)
+from src.retrieval.options import RetrievalOptions
+from src.retrieval.trace import RetrievalTrace
+
+
+def main():
+    """Compare flat and document-routed retrieval on the evaluation set."""
+    parser = argparse.ArgumentParser(description="Benchmark two-level document routing")
+    parser.add_argument('--config', type=str, default='config/config.yaml')
+    parser.add_argument('--eval-set', type=str, default=None)
+    parser.add_argument('--top-documents', type=int, nargs='+', default=[1, 2, 3, 5])
+    parser.add_argument('--warmup', type=int, default=2)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    eval_set = load_eval_set(args.eval_set)
+    retrieval_config = config['retrieval']
+
+    retriever = build_retriever(
+        config,
+        rerank_mode=retrieval_config.get('rerank_mode', 'full'),
+        rerank_cache_size=0,  # Each setting must pay for its own reranking
+        document_index_path=config['vector_db'].get('document_index_path')
+    )
+    if not len(retriever.document_index):
+        print("Document summary index is empty; run scripts/ingest_data.py first")
+        return
+
+    # Only the document restriction differs between settings
+    flat_options = RetrievalOptions.from_config(
+        retrieval_config,
+        adaptive_top_n=False,
+        use_query_router=False,
+        use_entity_index=False,
+        use_document_routing=False
+    )
+    top_n = flat_options.final_top_n
+
+    settings = [('flat', flat_options)]
+    for top_documents in args.top_documents:
+        settings.append((
+            f'top {top_documents} docs',
+            flat_options.replace(use_document_routing=True, document_top_k=top_documents)
+        ))
+
+    for item in eval_set[:args.warmup]:
+        retriever.retrieve(item['query'], flat_options)
+
+    rows = []
+    for label, options in settings:
+        latencies, recalls, document_recalls, fallbacks = [], [], [], 0
+        for item in eval_set:
+            trace = RetrievalTrace()
+            results, elapsed_ms = timed(retriever.retrieve, item['query'], options, trace=trace)
+            latencies.append(elapsed_ms)
+            recalls.append(recall_at_k(results, item, top_n))
+
+            trace_info = trace.to_dict()
+            fallbacks += int(bool(trace_info.get('document_fallback')))
+            selected = set(trace_info.get('document_selection', {}).get('documents', []))
+            relevant = set(item.get('relevant_sources', []))
+            if selected and relevant:
+                document_recalls.append(len(selected & relevant) / len(relevant))
+        rows.append((
+            label,
+            mean(latencies),
+            float(np.percentile(latencies, 95)),
+            mean(recalls),
+            mean(document_recalls) if document_recalls else None,
+            fallbacks
+        ))
+
+    print("\n" + "=" * 90)
+    print(f"{'Search':<14} {'Mean ms':>9} {'P95 ms':>9} {f'Recall@{top_n}':>10} "
+          f"{'Doc recall':>11} {'Fallbacks':>10}")
+    print("-" * 90)
+    for label, mean_ms, p95_ms, recall, document_recall, fallbacks in rows:
+        document_recall = f"{document_recall:.3f}" if document_recall is not None else "-"
+        print(f"{label:<14} {mean_ms:>9.1f} {p95_ms:>9.1f} {recall:>10.3f} "
+              f"{document_recall:>11} {fallbacks:>10}")
+    print("=" * 90)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+MMR benchmark: prompt-token reduction at equal answer coverage.
+Coverage is the recall of relevant source files in the final context. For
+each MMR lambda, the smallest top-n that matches the coverage of plain
+reranking at final_top_n is found, and its packed prompt tokens are compared.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path to import existing modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics.retrieval_eval import (
+    load_config,
+    load_eval_set,
+    build_retriever,
+    recall_at_k,
+    mean
+)
+from src.retrieval.options import RetrievalOptions
+
+
+def main():
+    """Compare prompt tokens and coverage across MMR lambdas on the evaluation set."""
+    parser = argparse.ArgumentParser(description="Benchmark MMR diversification")
+    parser.add_argument('--config', type=str, default='config/config.yaml')
+    parser.add_argument('--eval-set', type=str, default=None)
+    parser.add_argument('--lambdas', type=float, nargs='+', default=[0.5, 0.7, 0.85])
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    eval_set = load_eval_set(args.eval_set)
+    retrieval_config = config['retrieval']
+
+    retriever = build_retriever(
+        config,
+        rerank_mode=retrieval_config.get('rerank_mode', 'full'),
+        context_token_budget=None,
+        context_tokenizer=retrieval_config.get('context_tokenizer'),
+        mmr_pool_factor=retrieval_config.get('mmr_pool_factor', 3)
+    )
+    # No adaptive cut-off or token budget, so only MMR and top-n change the context
+    base_options = RetrievalOptions.from_config(
+        retrieval_config, adaptive_top_n=False, mmr_lambda=None
+    )
+    top_n = base_options.final_top_n
+
+    def evaluate(mmr_lambda, n):
+        """Mean packed tokens and recall with the given lambda and top-n."""
+        options = base_options.replace(mmr_lambda=mmr_lambda, final_top_n=n)
+        tokens, recalls = [], []
+        for item in eval_set:
+            results = retriever.retrieve(item['query'], options)
+            tokens.append(retriever.pack_context(results)[1].get('context_tokens', 0))
+            recalls.append(recall_at_k(results, item, n))
+        return mean(tokens), mean(recalls)
+
+    baseline_tokens, baseline_recall = evaluate(None, top_n)
+
+    rows = [('no MMR', top_n, baseline_tokens, baseline_recall)]
+    for mmr_lambda in args.lambdas:
+        # Smallest top-n reaching the baseline coverage (final_top_n if none does)
+        for n in range(1, top_n + 1):
+            tokens, recall = evaluate(mmr_lambda, n)
+            if recall >= baseline_recall:
+                break
+        rows.append((f'MMR {mmr_lambda:.2f}', n, tokens, recall))
+
+    print("\n" + "=" * 80)
+    print(f"{'Setting':<12} {'Top-n':>6} {'Prompt tokens':>14} {'Saved':>8} {'Coverage':>9}")
+    print("-" * 80)
+    for label, n, tokens, recall in rows:
+        saved = (1 - tokens / baseline_tokens) * 100 if baseline_tokens else 0.0
+        print(f"{label:<12} {n:>6} {tokens:>14.1f} {saved:>7.1f}% {recall:>9.3f}")
+    print("-" * 80)
+    print(f"Baseline coverage (recall@{top_n} without MMR): {baseline_recall:.3f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -261,14 +261,18 @@ Answer:"""
         # 3. Format Context
         print("\n📖 Step 3: Context Formatting")
         context_start = time.time()
-        context = self.retriever.format_context(results)
+        context, packing_stats = self.retriever.pack_context(results)
         context_time = time.time() - context_start
         metrics['context_formatting'] = {
             'time_seconds': round(context_time, 4),
-            'context_length_chars': len(context)
+            'context_length_chars': len(context),
+            'context_tokens': packing_stats.get('context_tokens', 0),
+            'tokens_saved': packing_stats.get('tokens_saved', 0)
         }
         print(f"   ⏱️  Time: {context_time*1000:.2f}ms")
         print(f"   📏 Context Length: {len(context)} characters")
+        print(f"   🧮 Context Tokens: {packing_stats.get('context_tokens', 0)} "
+              f"({packing_stats.get('tokens_saved', 0)} saved by packing)")
         
         # 4. LLM Response Generation
         print("\n🤖 Step 4: LLM Response Generation (Groq)")
@@ -0,0 +1,100 @@
+"""
+Query router benchmark: global search vs. document_type routing.
+Reports retrieval latency and recall with and without the router, and how
+often the router routes or abstains, for each router_min_keyword_votes
+setting on the evaluation query set.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import existing modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics.retrieval_eval import (
+    load_config,
+    load_eval_set,
+    build_retriever,
+    recall_at_k,
+    timed,
+    mean
+)
+from src.retrieval.options import RetrievalOptions
+from src.retrieval.trace import RetrievalTrace
+
+
+def main():
+    """Compare global and routed retrieval on the evaluation set."""
+    parser = argparse.ArgumentParser(description="Benchmark the document_type query router")
+    parser.add_argument('--config', type=str, default='config/config.yaml')
+    parser.add_argument('--eval-set', type=str, default=None)
+    parser.add_argument('--min-keyword-votes', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--warmup', type=int, default=2)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    eval_set = load_eval_set(args.eval_set)
+    retrieval_config = config['retrieval']
+
+    retriever = build_retriever(
+        config,
+        rerank_mode=retrieval_config.get('rerank_mode', 'full'),
+        rerank_cache_size=0,  # Each setting must pay for its own reranking
+        router_centroids_path=config['vector_db'].get('router_centroids_path'),
+        router_min_confidence=retrieval_config.get('router_min_confidence', 0.6),
+        router_max_types=retrieval_config.get('router_max_types', 2)
+    )
+
+    # Only the router differs between settings
+    global_options = RetrievalOptions.from_config(
+        retrieval_config,
+        adaptive_top_n=False,
+        use_query_router=False,
+        use_entity_index=False,
+        use_document_routing=False
+    )
+    routed_options = global_options.replace(use_query_router=True)
+    top_n = global_options.final_top_n
+
+    settings = [('global', None, global_options)]
+    for min_votes in args.min_keyword_votes:
+        settings.append((f'routed, votes>={min_votes}', min_votes, routed_options))
+
+    for item in eval_set[:args.warmup]:
+        retriever.retrieve(item['query'], global_options)
+
+    rows = []
+    for label, min_votes, options in settings:
+        if min_votes is not None:
+            retriever.query_router.min_keyword_votes = min_votes
+        latencies, recalls, routed = [], [], 0
+        for item in eval_set:
+            trace = RetrievalTrace()
+            results, elapsed_ms = timed(retriever.retrieve, item['query'], options, trace=trace)
+            latencies.append(elapsed_ms)
+            recalls.append(recall_at_k(results, item, top_n))
+            route = trace.to_dict().get('route') or {}
+            routed += int(bool(route.get('document_types')))
+        rows.append((
+            label,
+            mean(latencies),
+            float(np.percentile(latencies, 95)),
+            mean(recalls),
+            routed
+        ))
+
+    print("\n" + "=" * 80)
+    print(f"{'Search':<20} {'Mean ms':>9} {'P95 ms':>9} {f'Recall@{top_n}':>10} {'Routed':>8}")
+    print("-" * 80)
+    for label, mean_ms, p95_ms, recall, routed in rows:
+        print(f"{label:<20} {mean_ms:>9.1f} {p95_ms:>9.1f} {recall:>10.3f} "
+              f"{routed:>5}/{len(eval_set)}")
+    print("=" * 80)
+    print("Enable use_query_router only where routed recall matches global recall")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+"""
+Rerank benchmark: full cross-encoder reranking vs. cascade reranking vs. the
+distilled learned ranker. Reports rerank time and NDCG on the evaluation query set.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+# Add parent directory to path to import existing modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics.retrieval_eval import (
+    load_config,
+    load_eval_set,
+    build_retriever,
+    ndcg_at_k,
+    timed,
+    mean
+)
+
+
+def main():
+    """Compare full, cascade and learned reranking on the evaluation set."""
+    parser = argparse.ArgumentParser(description="Benchmark cascade reranking")
+    parser.add_argument('--config', type=str, default='config/config.yaml')
+    parser.add_argument('--eval-set', type=str, default=None)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    eval_set = load_eval_set(args.eval_set)
+    top_k = config['retrieval']['initial_top_k']
+    top_n = config['retrieval']['final_top_n']
+
+    # Disable the score cache so both modes pay the full cross-encoder cost
+    retriever = build_retriever(
+        config,
+        rerank_cache_size=0,
+        cascade_mass=config['retrieval'].get('cascade_mass', 0.9),
+        cascade_temperature=config['retrieval'].get('cascade_temperature', 0.1),
+        cascade_latency_budget_ms=config['retrieval'].get('cascade_latency_budget_ms', 150),
+        learned_ranker_path=config['retrieval'].get(
+            'learned_ranker_path', './models/learned_ranker.json'
+        )
+    )
+    has_learned = retriever.learned_ranker is not None
+    if not has_learned:
+        print("No learned ranker found; run scripts/train_learned_ranker.py to include it")
+
+    # Warm up the cross-encoder and the per-pair cost estimate
+    warmup = retriever._hybrid_retrieve(eval_set[0]['query'], top_k, 0.0)
+    retriever._rerank(eval_set[0]['query'], list(warmup))
+
+    rows = []
+    for item in eval_set:
+        query = item['query']
+        candidates = retriever._hybrid_retrieve(query, top_k, 0.0)
+
+        full, full_ms = timed(retriever._rerank, query, [dict(c) for c in candidates])
+        cascade, cascade_ms = timed(
+            retriever._cascade_rerank, query, [dict(c) for c in candidates], top_n
+        )
+        reranked = sum(1 for c in cascade if 'rerank_score' in c)
+        if has_learned:
+            learned, learned_ms = timed(
+                retriever._learned_rerank, query, [dict(c) for c in candidates]
+            )
+        else:
+            learned, learned_ms = [], 0.0
+
+        rows.append({
+            'query': query,
+            'candidates': len(candidates),
+            'cascade_reranked': reranked,
+            'full_ms': full_ms,
+            'cascade_ms': cascade_ms,
+            'learned_ms': learned_ms,
+            'full_ndcg': ndcg_at_k(full, item, top_n),
+            'cascade_ndcg': ndcg_at_k(cascade, item, top_n),
+            'learned_ndcg': ndcg_at_k(learned, item, top_n)
+        })
+
+    print("\n" + "=" * 100)
+    print(f"{'Query':<50} {'Cands':>6} {'M':>4} {'Full ms':>9} {'Casc ms':>9} {'NDCG full':>10} {'NDCG casc':>10}")
+    print("-" * 100)
+    for row in rows:
+        print(
+            f"{row['query'][:50]:<50} {row['candidates']:>6} {row['cascade_reranked']:>4} "
+            f"{row['full_ms']:>9.1f} {row['cascade_ms']:>9.1f} "
+            f"{row['full_ndcg']:>10.3f} {row['cascade_ndcg']:>10.3f}"
+        )
+    print("-" * 100)
+
+    full_ms = mean([r['full_ms'] for r in rows])
+    cascade_ms = mean([r['cascade_ms'] for r in rows])
+    saved = (1 - cascade_ms / full_ms) * 100 if full_ms else 0.0
+    print(f"Avg rerank time:  full {full_ms:.1f}ms | cascade {cascade_ms:.1f}ms ({saved:.1f}% saved)")
+    print(f"Avg NDCG@{top_n}:      full {mean([r['full_ndcg'] for r in rows]):.3f} | "
+          f"cascade {mean([r['cascade_ndcg'] for r in rows]):.3f}")
+    if has_learned:
+        print(f"Learned ranker:   {mean([r['learned_ms'] for r in rows]):.3f}ms | "
+              f"NDCG@{top_n} {mean([r['learned_ndcg'] for r in rows]):.3f}")
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
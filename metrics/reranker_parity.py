@@ -0,0 +1,98 @@
+"""
+Parity check: quantized ONNX reranker vs. the torch cross-encoder.
+Scores the same candidates with both backends on the evaluation queries and
+reports rank agreement and latency.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import existing modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics.retrieval_eval import load_config, load_eval_set, build_retriever, timed, mean
+from src.retrieval.reranker import CrossEncoderReranker
+from src.retrieval.onnx_reranker import OnnxCrossEncoderReranker
+
+
+def spearman(a: np.ndarray, b: np.ndarray) -> float:
+    """Spearman rank correlation of two score arrays."""
+    if len(a) < 2:
+        return 1.0
+    rank_a = np.argsort(np.argsort(a))
+    rank_b = np.argsort(np.argsort(b))
+    return float(np.corrcoef(rank_a, rank_b)[0, 1])
+
+
+def main():
+    """Compare torch and ONNX reranker rankings on the evaluation set."""
+    parser = argparse.ArgumentParser(description="ONNX reranker parity check")
+    parser.add_argument('--config', type=str, default='config/config.yaml')
+    parser.add_argument('--eval-set', type=str, default=None)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    retrieval_config = config['retrieval']
+    eval_set = load_eval_set(args.eval_set)
+    top_k = retrieval_config['initial_top_k']
+    top_n = retrieval_config['final_top_n']
+
+    retriever = build_retriever(config, use_reranking=False)
+
+    model_name = retrieval_config['reranker_model']
+    max_length = retrieval_config.get('reranker_max_length', 512)
+    torch_reranker = CrossEncoderReranker(model_name, max_length=max_length)
+    onnx_reranker = OnnxCrossEncoderReranker(
+        model_name,
+        max_length=max_length,
+        onnx_dir=retrieval_config.get('reranker_onnx_dir', './models/onnx')
+    )
+
+    rows = []
+    for item in eval_set:
+        query = item['query']
+        candidates = retriever._hybrid_retrieve(query, top_k, 0.0)
+        if len(candidates) < 2:
+            continue
+
+        # Warm the tokenization cache so only model time is compared
+        torch_reranker.score(query, candidates)
+        onnx_reranker.score(query, candidates)
+
+        torch_scores, torch_ms = timed(torch_reranker.score, query, candidates)
+        onnx_scores, onnx_ms = timed(onnx_reranker.score, query, candidates)
+
+        torch_top = set(np.argsort(-torch_scores)[:top_n])
+        onnx_top = set(np.argsort(-onnx_scores)[:top_n])
+
+        rows.append({
+            'query': query,
+            'spearman': spearman(torch_scores, onnx_scores),
+            'top1_match': int(np.argmax(torch_scores) == np.argmax(onnx_scores)),
+            'topn_overlap': len(torch_top & onnx_top) / top_n,
+            'torch_ms': torch_ms,
+            'onnx_ms': onnx_ms
+        })
+
+    print("\n" + "=" * 100)
+    print(f"{'Query':<50} {'Spearman':>9} {'Top-1':>6} {'Top-n':>6} {'Torch ms':>9} {'ONNX ms':>9}")
+    print("-" * 100)
+    for row in rows:
+        print(
+            f"{row['query'][:50]:<50} {row['spearman']:>9.3f} {row['top1_match']:>6} "
+            f"{row['topn_overlap']:>6.2f} {row['torch_ms']:>9.1f} {row['onnx_ms']:>9.1f}"
+        )
+    print("-" * 100)
+    print(f"Mean Spearman: {mean([r['spearman'] for r in rows]):.3f}")
+    print(f"Top-1 agreement: {mean([r['top1_match'] for r in rows]):.1%}")
+    print(f"Top-{top_n} overlap: {mean([r['topn_overlap'] for r in rows]):.1%}")
+    print(f"Avg scoring time: torch {mean([r['torch_ms'] for r in rows]):.1f}ms | "
+          f"onnx {mean([r['onnx_ms'] for r in rows]):.1f}ms")
+    print("=" * 100)
+
+
+if __name__ == "__main__":
+    main()
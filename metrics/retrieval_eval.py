@@ -0,0 +1,111 @@
+"""
+Shared helpers for retrieval quality and latency benchmarks.
+Loads the evaluation query set and computes NDCG / recall against it.
+"""
+
+import sys
+import json
+import math
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+# Add parent directory to path to import existing modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import yaml
+
+from src.embeddings.embedding_service import EmbeddingService
+from src.vector_store.chroma_client import ChromaDBClient
+from src.retrieval.retriever import RAGRetriever
+
+
+DEFAULT_EVAL_SET = Path(__file__).parent / "eval_queries.json"
+
+
+def load_config(config_path: str = "config/config.yaml") -> Dict[str, Any]:
+    """Load the YAML configuration."""
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def load_eval_set(path: str = None) -> List[Dict[str, Any]]:
+    """
+    Load evaluation queries.
+
+    Each entry has a 'query' and 'relevant_sources' (list of source file names);
+    a chunk is relevant when its source file is listed.
+    """
+    with open(path or DEFAULT_EVAL_SET, 'r') as f:
+        return json.load(f)
+
+
+def build_retriever(config: Dict[str, Any], **overrides) -> RAGRetriever:
+    """Build a retriever from config, with keyword overrides for the retriever."""
+    embedding_service = EmbeddingService(
+        model_name=config['embeddings']['model_name'],
+        device=config['embeddings']['device'],
+        batch_size=config['embeddings']['batch_size']
+    )
+    vector_store = ChromaDBClient(
+        persist_directory=config['vector_db']['persist_directory'],
+        collection_name=config['vector_db']['collection_name']
+    )
+
+    kwargs = {
+        'reranker_model': config['retrieval']['reranker_model'],
+        'use_reranking': True,
+        'use_hybrid_search': True,
+        'bm25_index_path': "./bm25_index",
+    }
+    kwargs.update(overrides)
+
+    return RAGRetriever(
+        vector_store=vector_store,
+        embedding_service=embedding_service,
+        **kwargs
+    )
+
+
+def is_relevant(chunk: Dict[str, Any], item: Dict[str, Any]) -> bool:
+    """Check whether a retrieved chunk is relevant for an evaluation item."""
+    source = chunk.get('metadata', {}).get('source_file', '')
+    return source in item.get('relevant_sources', [])
+
+
+def ndcg_at_k(chunks: List[Dict[str, Any]], item: Dict[str, Any], k: int) -> float:
+    """
+    Binary-relevance NDCG@k.
+    The ideal ranking assumes at least k relevant chunks exist in the corpus.
+    """
+    dcg = sum(
+        1.0 / math.log2(rank + 2)
+        for rank, chunk in enumerate(chunks[:k])
+        if is_relevant(chunk, item)
+    )
+    idcg = sum(1.0 / math.log2(rank + 2) for rank in range(k))
+    return dcg / idcg if idcg > 0 else 0.0
+
+
+def recall_at_k(chunks: List[Dict[str, Any]], item: Dict[str, Any], k: int) -> float:
+    """Share of relevant source files that appear in the top k chunks."""
+    relevant = set(item.get('relevant_sources', []))
+    if not relevant:
+        return 0.0
+    found = {
+        chunk.get('metadata', {}).get('source_file', '')
+        for chunk in chunks[:k]
+    }
+    return len(found & relevant) / len(relevant)
+
+
+def timed(fn: Callable, *args, **kwargs) -> Tuple[Any, float]:
+    """Run fn and return (result, elapsed milliseconds)."""
+    start_time = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, (time.perf_counter() - start_time) * 1000
+
+
+def mean(values: List[float]) -> float:
+    """Mean of a list, 0.0 when empty."""
+    return sum(values) / len(values) if values else 0.0
@@ -0,0 +1,105 @@
+"""
+Sentence-window benchmark: chunk index vs. sentence-level index.
+Runs the evaluation queries at both granularities and reports retrieval
+latency, recall and packed context tokens. The sentence index is built by
+scripts/ingest_data.py --sentence-index.
+"""
+
+import sys
+import argparse
+from pathlib import Path
+
+import numpy as np
+
+# Add parent directory to path to import existing modules
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from metrics.retrieval_eval import (
+    load_config,
+    load_eval_set,
+    build_retriever,
+    recall_at_k,
+    timed,
+    mean
+)
+from src.retrieval.options import RetrievalOptions
+from src.vector_store.chroma_client import ChromaDBClient
+
+
+def main():
+    """Compare chunk and sentence-window retrieval on the evaluation set."""
+    parser = argparse.ArgumentParser(description="Benchmark sentence-window retrieval")
+    parser.add_argument('--config', type=str, default='config/config.yaml')
+    parser.add_argument('--eval-set', type=str, default=None)
+    parser.add_argument('--windows', type=int, nargs='+', default=[1, 2, 3])
+    parser.add_argument('--sentence-top-k', type=int, nargs='+', default=[10, 25])
+    parser.add_argument('--warmup', type=int, default=2)
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    eval_set = load_eval_set(args.eval_set)
+    retrieval_config = config['retrieval']
+
+    sentence_store = ChromaDBClient(
+        persist_directory=config['vector_db']['persist_directory'],
+        collection_name=config['vector_db'].get(
+            'sentence_collection_name', config['vector_db']['collection_name'] + "_sentences"
+        )
+    )
+    if sentence_store.get_collection_stats()['document_count'] == 0:
+        print("Sentence index is empty; run scripts/ingest_data.py --sentence-index first")
+        return
+
+    retriever = build_retriever(
+        config,
+        rerank_mode=retrieval_config.get('rerank_mode', 'full'),
+        rerank_cache_size=0,  # Warm-up queries must not make later runs faster
+        context_token_budget=None,
+        context_tokenizer=retrieval_config.get('context_tokenizer'),
+        sentence_store=sentence_store
+    )
+    # Fixed top-n, no caches or expansions that differ between granularities
+    base_options = RetrievalOptions.from_config(
+        retrieval_config,
+        adaptive_top_n=False,
+        neighbor_window=0,
+        mmr_lambda=None,
+        use_entity_index=False
+    )
+    top_n = base_options.final_top_n
+
+    settings = [('chunk', base_options)]
+    for top_k in args.sentence_top_k:
+        for window in args.windows:
+            settings.append((
+                f'sentence k={top_k} w={window}',
+                base_options.replace(
+                    index_granularity='sentence', sentence_window=window, initial_top_k=top_k
+                )
+            ))
+
+    for item in eval_set[:args.warmup]:
+        retriever.retrieve(item['query'], base_options)
+
+    rows = []
+    for label, options in settings:
+        latencies, recalls, tokens = [], [], []
+        for item in eval_set:
+            results, elapsed_ms = timed(retriever.retrieve, item['query'], options)
+            latencies.append(elapsed_ms)
+            recalls.append(recall_at_k(results, item, top_n))
+            tokens.append(retriever.pack_context(results)[1].get('context_tokens', 0))
+        rows.append((
+            label, mean(latencies), float(np.percentile(latencies, 95)), mean(recalls), mean(tokens)
+        ))
+
+    print("\n" + "=" * 80)
+    print(f"{'Index':<24} {'Mean ms':>9} {'P95 ms':>9} {f'Recall@{top_n}':>10} {'Ctx tokens':>11}")
+    print("-" * 80)
+    for label, mean_ms, p95_ms, recall, context_tokens in rows:
+        print(f"{label:<24} {mean_ms:>9.1f} {p95_ms:>9.1f} {recall:>10.3f} {context_tokens:>11.1f}")
+    print("=" * 80)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Calibrate the rerank skip threshold from logged queries.
+For each query, compares the first-stage top chunk with the cross-encoder's top
+chunk and picks the lowest confidence threshold at which skipping reranking
+keeps the top result unchanged for the target share of queries.
+
+Queries are only logged when retrieval.query_log_path is set (it is null by
+default); set it, collect traffic, then run this script.
+"""
+
+import os
+import re
+import sys
+import json
+import argparse
+import yaml
+from typing import List, Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.embeddings import EmbeddingService
+from src.vector_store import ChromaDBClient
+from src.retrieval import RAGRetriever
+
+
+def load_config(config_path: str = "config/config.yaml"):
+    """Load configuration from YAML file"""
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def load_logged_queries(log_path: str) -> List[str]:
+    """
+    Load unique queries from the JSONL query log.
+
+    Args:
+        log_path: Path to the query log written by RAGService
+
+    Returns:
+        Unique queries in first-seen order
+    """
+    queries = []
+    seen = set()
+
+    with open(log_path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            query = json.loads(line).get('query', '')
+            if query and query not in seen:
+                seen.add(query)
+                queries.append(query)
+
+    return queries
+
+
+def choose_threshold(
+    observations: List[Tuple[float, bool]],
+    target_agreement: float,
+    min_support: int
+) -> Tuple[float, float, float]:
+    """
+    Choose the lowest threshold whose skipped queries meet the target agreement.
+
+    Args:
+        observations: (confidence, top chunk unchanged by reranking) per query
+        target_agreement: Required share of skipped queries with an unchanged top chunk
+        min_support: Minimum number of queries that must be skipped at the threshold
+
+    Returns:
+        Tuple of (threshold, agreement at threshold, skip rate); threshold is None
+        when no candidate threshold qualifies
+    """
+    candidates = sorted({conf for conf, _ in observations if conf > 0})
+
+    for threshold in candidates:
+        skipped = [unchanged for conf, unchanged in observations if conf >= threshold]
+        if len(skipped) < min_support:
+            break
+        agreement = sum(skipped) / len(skipped)
+        if agreement >= target_agreement:
+            return threshold, agreement, len(skipped) / len(observations)
+
+    return None, 0.0, 0.0
+
+
+def write_threshold(config_path: str, threshold: float) -> None:
+    """Update rerank_skip_threshold in place, keeping the rest of the file intact"""
+    with open(config_path, 'r') as f:
+        content = f.read()
+
+    content, count = re.subn(
+        r'^([ \t]*rerank_skip_threshold:)[^#\n]*(#.*)?$',
+        lambda m: f"{m.group(1)} {threshold:.4f}" + (f"  {m.group(2)}" if m.group(2) else ""),
+        content,
+        flags=re.MULTILINE
+    )
+    if count == 0:
+        raise ValueError(f"rerank_skip_threshold not found in {config_path}")
+
+    with open(config_path, 'w') as f:
+        f.write(content)
+
+
+def main():
+    """Main entry point for the calibration script"""
+    parser = argparse.ArgumentParser(
+        description="Calibrate the rerank skip threshold from logged queries"
+    )
+    parser.add_argument('--config', type=str, default='config/config.yaml',
+                        help='Path to configuration file')
+    parser.add_argument('--query-log', type=str, default=None,
+                        help='Query log (defaults to retrieval.query_log_path)')
+    parser.add_argument('--target-agreement', type=float, default=0.95,
+                        help='Required share of skipped queries whose top chunk reranking would not change')
+    parser.add_argument('--min-support', type=int, default=10,
+                        help='Minimum number of skipped queries at the chosen threshold')
+    parser.add_argument('--write-config', action='store_true',
+                        help='Write the chosen threshold to the config file')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    retrieval_config = config['retrieval']
+    log_path = args.query_log or retrieval_config.get('query_log_path')
+
+    if not log_path or not os.path.exists(log_path):
+        print(f"No query log found at {log_path}")
+        print("Set retrieval.query_log_path, collect queries, or pass --query-log")
+        sys.exit(1)
+
+    queries = load_logged_queries(log_path)
+    print(f"Loaded {len(queries)} unique queries from {log_path}")
+    if not queries:
+        return
+
+    embedding_service = EmbeddingService(
+        model_name=config['embeddings']['model_name'],
+        device=config['embeddings']['device'],
+        batch_size=config['embeddings']['batch_size']
+    )
+    vector_store = ChromaDBClient(
+        persist_directory=config['vector_db']['persist_directory'],
+        collection_name=config['vector_db']['collection_name']
+    )
+    retriever = RAGRetriever(
+        vector_store=vector_store,
+        embedding_service=embedding_service,
+        reranker_model=retrieval_config['reranker_model'],
+        use_reranking=True,
+        use_hybrid_search=True,
+        rerank_cache_size=0
+    )
+
+    observations = []
+    for query in queries:
+        candidates = retriever._hybrid_retrieve(
+            query,
+            retrieval_config['initial_top_k'],
+            retrieval_config['similarity_threshold']
+        )
+        if not candidates:
+            continue
+
+        confidence = retriever.first_stage_confidence(candidates)
+        first_stage_top = candidates[0]['id']
+        reranked_top = retriever._rerank(query, list(candidates))[0]['id']
+        observations.append((confidence, first_stage_top == reranked_top))
+
+    threshold, agreement, skip_rate = choose_threshold(
+        observations, args.target_agreement, args.min_support
+    )
+
+    print(f"\nQueries evaluated: {len(observations)}")
+    print(f"Top chunk unchanged by reranking: "
+          f"{sum(u for _, u in observations) / len(observations):.1%} of all queries")
+
+    if threshold is None:
+        print("No threshold meets the target agreement; leave rerank_skip_threshold unset")
+        return
+
+    print(f"Recommended rerank_skip_threshold: {threshold:.4f}")
+    print(f"  Agreement on skipped queries: {agreement:.1%}")
+    print(f"  Share of queries skipping rerank: {skip_rate:.1%}")
+
+    if args.write_config:
+        write_threshold(args.config, threshold)
+        print(f"Wrote threshold to {args.config}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,10 +13,20 @@ from tqdm import tqdm
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 
-from src.chunking import chunk_document, ChunkingStrategy
+from src.chunking import (
+    chunk_document,
+    generate_chunk_ids,
+    link_chunk_neighbors,
+    split_page_sentences,
+    extract_text_from_pdf,
+    ChunkingStrategy
+)
 from src.embeddings import EmbeddingService
-from src.vector_store import ChromaDBClient
-from src.retrieval import BM25Index
+from src.vector_store import ChromaDBClient, write_index_manifest
+from src.retrieval import (
+    BM25Index, FAQIndex, EntityIndex, DocumentSummaryIndex, extract_qa_pairs, sentence_id
+)
+from src.query import QueryRouter
 
 
 def load_config(config_path: str = "config/config.yaml"):
@@ -25,11 +35,37 @@ def load_config(config_path: str = "config/config.yaml"):
         return yaml.safe_load(f)
 
 
+def embed_length_sorted(embedding_service, texts: list, batch_size: int) -> list:
+    """
+    Embed texts in batches of similar length to minimize padding.
+    
+    Args:
+        embedding_service: Embedding service instance
+        texts: Texts to embed
+        batch_size: Texts per batch
+        
+    Returns:
+        Embeddings (as lists) in the order of texts
+    """
+    order = sorted(range(len(texts)), key=lambda i: len(texts[i]))
+    embeddings = [None] * len(texts)
+    
+    for i in tqdm(range(0, len(order), batch_size), desc="Embedding sentence batches"):
+        batch = order[i:i + batch_size]
+        batch_embeddings = embedding_service.embed_texts([texts[j] for j in batch])
+        for j, embedding in zip(batch, batch_embeddings.tolist()):
+            embeddings[j] = embedding
+    
+    return embeddings
+
+
 def ingest_documents(
     data_dir: str,
     chunking_strategy: ChunkingStrategy,
     config: dict,
-    reset_db: bool = False
+    reset_db: bool = False,
+    faq_markdown: list = None,
+    sentence_index: bool = False
 ):
     """
     Main ingestion pipeline.
@@ -39,6 +75,8 @@ def ingest_documents(
         chunking_strategy: Strategy to use for chunking
         config: Configuration dictionary
         reset_db: Whether to reset the database before ingesting
+        faq_markdown: Extra markdown files with Q/A pairs for the FAQ index
+        sentence_index: Also build the sentence-level index for sentence-window retrieval
     """
     print("=" * 80)
     print("Silverlight Studios RAG - Data Ingestion Pipeline")
@@ -111,6 +149,12 @@ def ingest_documents(
     
     print(f"\nTotal chunks created: {len(all_chunks)}")
     
+    # Stable chunk IDs shared by ChromaDB and the BM25 index
+    chunk_ids = generate_chunk_ids(all_chunks)
+    
+    # Adjacency links for neighbor expansion at retrieval time
+    link_chunk_neighbors(all_chunks, chunk_ids)
+    
     # Generate embeddings
     print("\n5. Generating embeddings...")
     chunk_texts = [chunk['text'] for chunk in all_chunks]
@@ -125,9 +169,29 @@ def ingest_documents(
     
     print(f"Generated {len(embeddings)} embeddings")
     
+    # Per-document-type centroids used by the query router
+    router_centroids_path = config['vector_db'].get(
+        'router_centroids_path',
+        os.path.join(config['vector_db']['persist_directory'], 'router_centroids.npz')
+    )
+    type_counts = QueryRouter.build_centroids(
+        embeddings,
+        [chunk.get('document_type', '') for chunk in all_chunks],
+        router_centroids_path
+    )
+    print(f"Query router centroids saved to {router_centroids_path}: {type_counts}")
+    
+    # Document and section centroids for two-level search
+    document_index_path = config['vector_db'].get(
+        'document_index_path',
+        os.path.join(config['vector_db']['persist_directory'], 'document_index.npz')
+    )
+    summary_counts = DocumentSummaryIndex.build(embeddings, all_chunks, document_index_path)
+    print(f"Document summary index saved to {document_index_path}: {summary_counts}")
+    
     # Ingest into vector store
     print("\n6. Ingesting into ChromaDB...")
-    vector_store.ingest_chunks(all_chunks, embeddings)
+    vector_store.ingest_chunks(all_chunks, embeddings, ids=chunk_ids)
     
     # Show statistics
     print("\n7. Ingestion complete!")
@@ -140,7 +204,88 @@ def ingest_documents(
     # Build BM25 index for hybrid search
     print("\n8. Building BM25 index for hybrid search...")
     bm25_index = BM25Index()
-    bm25_index.build_index(all_chunks)
+    bm25_index.build_index(all_chunks, ids=chunk_ids)
+    
+    # Entity/location postings for entity-centric queries
+    entity_index_path = config['vector_db'].get(
+        'entity_index_path', os.path.join(config['vector_db']['persist_directory'], 'entity_index')
+    )
+    entity_index = EntityIndex(persist_path=entity_index_path)
+    term_counts = entity_index.build(all_chunks, chunk_ids)
+    print(f"Entity index saved to {entity_index_path}: {term_counts}")
+    
+    # Record the rebuild so result caches derived from the index are invalidated
+    manifest_path = config['vector_db'].get(
+        'manifest_path', os.path.join(config['vector_db']['persist_directory'], 'index_manifest.json')
+    )
+    manifest = write_index_manifest(
+        manifest_path,
+        collection_name=config['vector_db']['collection_name'],
+        embedding_model=config['embeddings']['model_name'],
+        chunking_strategy=chunking_strategy.value,
+        num_chunks=len(all_chunks),
+        document_count=stats['document_count']
+    )
+    print(f"\n9. Index manifest written: {manifest_path} (version {manifest['version']})")
+    
+    # Question/answer pairs for direct FAQ answers
+    print("\n10. Building FAQ direct-answer index...")
+    faq_pages = []
+    for pdf_file in pdf_files:
+        if "faq" in pdf_file.name.lower():
+            faq_pages.extend(extract_text_from_pdf(str(pdf_file)))
+    for md_file in faq_markdown or []:
+        if not os.path.exists(md_file):
+            print(f"  FAQ markdown not found, skipping: {md_file}")
+            continue
+        with open(md_file, 'r', encoding='utf-8') as f:
+            faq_pages.append({"text": f.read(), "page_num": 1, "source_file": Path(md_file).name})
+    
+    # Keep the first occurrence of each question
+    faq_pairs = []
+    seen_questions = set()
+    for pair in extract_qa_pairs(faq_pages):
+        key = ' '.join(pair['question'].lower().split())
+        if key not in seen_questions:
+            seen_questions.add(key)
+            faq_pairs.append(pair)
+    
+    faq_index = FAQIndex(persist_path=config['retrieval'].get('faq_index_path', './faq_index'))
+    if faq_pairs:
+        question_embeddings = embedding_service.embed_texts([p['question'] for p in faq_pairs])
+    else:
+        question_embeddings = []
+    faq_index.build(faq_pairs, question_embeddings)
+    
+    # Sentence-level index for sentence-window retrieval
+    if sentence_index:
+        print("\n11. Building sentence-level index...")
+        sentences = []
+        for pdf_file in pdf_files:
+            sentences.extend(split_page_sentences(extract_text_from_pdf(str(pdf_file))))
+        print(f"  Split {len(sentences)} sentences")
+        
+        sentence_store = ChromaDBClient(
+            persist_directory=config['vector_db']['persist_directory'],
+            collection_name=config['vector_db'].get(
+                'sentence_collection_name',
+                config['vector_db']['collection_name'] + "_sentences"
+            )
+        )
+        sentence_store.reset_collection()
+        sentence_embeddings = embed_length_sorted(
+            embedding_service,
+            [sentence['text'] for sentence in sentences],
+            config['embeddings']['batch_size'] * 4
+        )
+        sentence_store.ingest_chunks(
+            sentences,
+            sentence_embeddings,
+            ids=[
+                sentence_id(s['source_file'], s['page_num'], s['sentence_index'])
+                for s in sentences
+            ]
+        )
     
     print("\n" + "=" * 80)
     print("Ingestion pipeline completed successfully!")
@@ -181,6 +326,20 @@ def main():
         help='Reset the vector database before ingesting'
     )
     
+    parser.add_argument(
+        '--faq-markdown',
+        type=str,
+        nargs='*',
+        default=['data/md files/comprehensive_tour_faq.md'],
+        help='Markdown files with Q/A pairs added to the FAQ direct-answer index'
+    )
+    
+    parser.add_argument(
+        '--sentence-index',
+        action='store_true',
+        help='Also build the sentence-level index for sentence-window retrieval'
+    )
+    
     args = parser.parse_args()
     
     # Load configuration
@@ -195,7 +354,9 @@ def main():
             data_dir=args.data_dir,
             chunking_strategy=strategy,
             config=config,
-            reset_db=args.reset_db
+            reset_db=args.reset_db,
+            faq_markdown=args.faq_markdown,
+            sentence_index=args.sentence_index
         )
     except Exception as e:
         print(f"\nError during ingestion: {e}")
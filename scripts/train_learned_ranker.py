@@ -0,0 +1,157 @@
+"""
+Train the lightweight learned ranker from cross-encoder scores.
+Logs first-stage features for every fused candidate together with its
+cross-encoder score, fits a ridge model on CPU and saves it for
+rerank_mode="learned".
+"""
+
+import os
+import sys
+import json
+import argparse
+import yaml
+import numpy as np
+from pathlib import Path
+from tqdm import tqdm
+
+# Add parent directory to path for imports
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from src.embeddings import EmbeddingService
+from src.vector_store import ChromaDBClient
+from src.retrieval import RAGRetriever
+from src.retrieval.learned_ranker import LearnedRanker, FEATURE_NAMES
+
+
+def load_config(config_path: str = "config/config.yaml"):
+    """Load configuration from YAML file"""
+    with open(config_path, 'r') as f:
+        return yaml.safe_load(f)
+
+
+def load_training_queries(path: str):
+    """
+    Load training queries from a query log (.jsonl) or an evaluation set (.json).
+
+    Args:
+        path: Path to the query source
+
+    Returns:
+        Unique queries in first-seen order
+    """
+    with open(path, 'r') as f:
+        if path.endswith('.jsonl'):
+            entries = [json.loads(line) for line in f if line.strip()]
+        else:
+            entries = json.load(f)
+
+    queries = []
+    for entry in entries:
+        query = entry.get('query', '') if isinstance(entry, dict) else str(entry)
+        if query and query not in queries:
+            queries.append(query)
+    return queries
+
+
+def main():
+    """Main entry point for training the learned ranker"""
+    parser = argparse.ArgumentParser(
+        description="Distill cross-encoder scores into a lightweight ranker"
+    )
+    parser.add_argument('--config', type=str, default='config/config.yaml',
+                        help='Path to configuration file')
+    parser.add_argument('--queries', type=str, default=None,
+                        help='Query log (.jsonl) or evaluation set (.json); '
+                             'defaults to retrieval.query_log_path')
+    parser.add_argument('--features-out', type=str, default='./models/learned_ranker_features.jsonl',
+                        help='Where to log candidate features and cross-encoder labels')
+    parser.add_argument('--model-out', type=str, default=None,
+                        help='Model path (defaults to retrieval.learned_ranker_path)')
+    parser.add_argument('--l2', type=float, default=1.0,
+                        help='Ridge regularization strength')
+    args = parser.parse_args()
+
+    config = load_config(args.config)
+    retrieval_config = config['retrieval']
+    queries_path = args.queries or retrieval_config.get('query_log_path')
+    model_out = args.model_out or retrieval_config.get(
+        'learned_ranker_path', './models/learned_ranker.json'
+    )
+
+    if not queries_path or not Path(queries_path).exists():
+        print(f"No training queries found at {queries_path}")
+        print("Pass --queries metrics/eval_queries.json or collect a query log first")
+        sys.exit(1)
+
+    queries = load_training_queries(queries_path)
+    print(f"Loaded {len(queries)} training queries from {queries_path}")
+
+    embedding_service = EmbeddingService(
+        model_name=config['embeddings']['model_name'],
+        device=config['embeddings']['device'],
+        batch_size=config['embeddings']['batch_size']
+    )
+    vector_store = ChromaDBClient(
+        persist_directory=config['vector_db']['persist_directory'],
+        collection_name=config['vector_db']['collection_name']
+    )
+    retriever = RAGRetriever(
+        vector_store=vector_store,
+        embedding_service=embedding_service,
+        reranker_model=retrieval_config['reranker_model'],
+        use_reranking=True,
+        use_hybrid_search=True,
+        rerank_mode="full",
+        rerank_cache_size=0
+    )
+    ranker = LearnedRanker()
+
+    # 1. Log features and cross-encoder labels for every fused candidate
+    all_features = []
+    all_labels = []
+    Path(args.features_out).parent.mkdir(parents=True, exist_ok=True)
+
+    with open(args.features_out, 'w') as log_file:
+        for query in tqdm(queries, desc="Scoring queries"):
+            candidates = retriever._hybrid_retrieve(
+                query, retrieval_config['initial_top_k'], 0.0
+            )
+            if not candidates:
+                continue
+
+            features = ranker.extract_features(query, candidates)
+            labels = retriever.reranker.score(query, candidates)
+
+            for candidate, row, label in zip(candidates, features, labels):
+                log_file.write(json.dumps({
+                    'query': query,
+                    'chunk_id': candidate['id'],
+                    'features': dict(zip(FEATURE_NAMES, row.tolist())),
+                    'label': float(label)
+                }) + "\n")
+
+            all_features.append(features)
+            all_labels.append(np.asarray(labels, dtype=np.float64))
+
+    if not all_features:
+        print("No candidates retrieved; nothing to train on")
+        sys.exit(1)
+
+    # 2. Fit and save
+    features = np.vstack(all_features)
+    labels = np.concatenate(all_labels)
+    ranker.fit(features, labels, l2=args.l2)
+    ranker.save(model_out)
+
+    print(f"\nTrained on {len(labels)} candidates ({len(all_features)} queries)")
+    print(f"Train RMSE: {ranker.metadata['train_rmse']:.4f}")
+    print("Feature weights (standardized):")
+    for name, weight in sorted(zip(FEATURE_NAMES, ranker.weights), key=lambda x: -abs(x[1])):
+        print(f"  {name:<26} {weight:+.4f}")
+    print(f"\nFeatures logged to: {args.features_out}")
+    print(f"Model saved to: {model_out}")
+    print("Compare NDCG vs latency with: python metrics/rerank_benchmark.py")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,9 @@ from .chunker import (
     hybrid_chunking,
     extract_text_from_pdf,
     chunk_document,
+    generate_chunk_ids,
+    link_chunk_neighbors,
+    split_page_sentences,
     ChunkingStrategy
 )
 
@@ -15,5 +18,8 @@ __all__ = [
     "hybrid_chunking",
     "extract_text_from_pdf",
     "chunk_document",
+    "generate_chunk_ids",
+    "link_chunk_neighbors",
+    "split_page_sentences",
     "ChunkingStrategy"
 ]
\ No newline at end of file
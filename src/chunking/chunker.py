@@ -9,6 +9,8 @@ import fitz  # PyMuPDF
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from sentence_transformers import SentenceTransformer
 import numpy as np
+import hashlib
+import re
 import sys
 import os
 
@@ -353,6 +355,135 @@ def hybrid_chunking(
     return final_chunks
 
 
+def generate_chunk_ids(chunks: List[Dict[str, Any]]) -> List[str]:
+    """
+    Generate stable chunk IDs shared by the vector store and the BM25 index.
+    IDs are derived from source file, page, position and text, so re-ingesting
+    the same documents yields the same IDs.
+    
+    Args:
+        chunks: List of chunk dictionaries
+        
+    Returns:
+        List of chunk IDs aligned with chunks
+    """
+    ids = []
+    seen = {}
+    
+    for position, chunk in enumerate(chunks):
+        key = "|".join([
+            str(chunk.get("source_file", "")),
+            str(chunk.get("page_num", "")),
+            str(chunk.get("chunk_id", position)),
+            chunk.get("text", "")
+        ])
+        chunk_hash = hashlib.sha1(key.encode("utf-8")).hexdigest()[:20]
+        
+        # Disambiguate identical chunks
+        count = seen.get(chunk_hash, 0)
+        seen[chunk_hash] = count + 1
+        ids.append(chunk_hash if count == 0 else f"{chunk_hash}-{count}")
+    
+    return ids
+
+
+def link_chunk_neighbors(chunks: List[Dict[str, Any]], ids: List[str]) -> List[Dict[str, Any]]:
+    """
+    Record each chunk's previous and next chunk and its parent page.
+    Neighbors are linked in reading order within a source file, so retrieval
+    can expand a small hit to its surrounding chunks by ID.
+
+    Args:
+        chunks: List of chunk dictionaries, in document order per source file
+        ids: Chunk IDs aligned with chunks (see generate_chunk_ids)
+
+    Returns:
+        The same chunks with prev_chunk_id, next_chunk_id and parent_id set
+        ("" when there is no neighbor)
+    """
+    by_source = {}
+    for position, chunk in enumerate(chunks):
+        by_source.setdefault(str(chunk.get("source_file", "")), []).append(position)
+
+    for source, positions in by_source.items():
+        # Stable sort keeps the chunker's order within a page
+        positions.sort(key=lambda p: int(chunks[p].get("page_num", 0) or 0))
+
+        for i, position in enumerate(positions):
+            chunk = chunks[position]
+            chunk["prev_chunk_id"] = ids[positions[i - 1]] if i > 0 else ""
+            chunk["next_chunk_id"] = ids[positions[i + 1]] if i + 1 < len(positions) else ""
+            chunk["parent_id"] = f"{source}|{chunk.get('page_num', '')}"
+
+    return chunks
+
+
+# Sentence end (punctuation plus closing quotes/brackets, not followed by a
+# lower-case word as after "a.m.") or a blank line
+SENTENCE_BOUNDARY = re.compile(r'[.!?]+["\'\)\]]*(?=\s+(?![a-z]))|\n\s*\n')
+
+
+def split_page_sentences(
+    pages: List[Dict[str, Any]],
+    min_chars: int = 20
+) -> List[Dict[str, Any]]:
+    """
+    Split pages into sentences that keep their position in the page.
+    Fragments shorter than min_chars (headings, list markers) are joined to
+    the following sentence.
+    
+    Args:
+        pages: Page dicts with 'text', 'page_num' and 'source_file'
+            (as returned by extract_text_from_pdf)
+        min_chars: Minimum sentence length
+        
+    Returns:
+        Sentence dicts with 'text', 'source_file', 'page_num', 'document_type',
+        'sentence_index', 'char_start' and 'char_end'
+    """
+    metadata_extractor = MetadataExtractor()
+    sentences = []
+    
+    for page in pages:
+        text = page["text"]
+        document_type = metadata_extractor.extract_document_type(page["source_file"])
+        
+        # Raw spans between boundaries
+        spans = []
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(text):
+            spans.append((start, match.end()))
+            start = match.end()
+        spans.append((start, len(text)))
+        
+        index = 0
+        pending_start = None
+        for span_start, span_end in spans:
+            if pending_start is not None:
+                span_start = pending_start
+            raw = text[span_start:span_end]
+            sentence = " ".join(raw.split())
+            if not sentence:
+                continue
+            if len(sentence) < min_chars and span_end < len(text):
+                pending_start = span_start
+                continue
+            pending_start = None
+            
+            sentences.append({
+                "text": sentence,
+                "source_file": page["source_file"],
+                "page_num": page["page_num"],
+                "document_type": document_type,
+                "sentence_index": index,
+                "char_start": span_start + len(raw) - len(raw.lstrip()),
+                "char_end": span_start + len(raw.rstrip())
+            })
+            index += 1
+    
+    return sentences
+
+
 def chunk_document(
     pdf_path: str,
     strategy: ChunkingStrategy = ChunkingStrategy.RECURSIVE,
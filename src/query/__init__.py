@@ -1,3 +1,5 @@
 from .query_enhancer import QueryEnhancer
+from .query_condenser import QueryCondenser
+from .query_router import QueryRouter
 
-__all__ = ["QueryEnhancer"]
+__all__ = ["QueryEnhancer", "QueryCondenser", "QueryRouter"]
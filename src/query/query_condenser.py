@@ -0,0 +1,109 @@
+"""
+Condense follow-up questions into short standalone retrieval queries.
+Instead of concatenating earlier messages, carries the key entities of the
+previous user turn over to the new question (a cheap stand-in for coreference
+resolution) and caps the result, so retrieval cost does not grow with the
+conversation.
+"""
+
+from typing import List, Dict, Optional
+import re
+
+from ..metadata import MetadataExtractor
+
+
+# Words that usually point back to something named in an earlier turn
+ANAPHORS = {
+    "it", "its", "they", "them", "their", "theirs", "he", "him", "his",
+    "she", "her", "hers", "this", "that", "these", "those", "there", "one"
+}
+
+
+class QueryCondenser:
+    """Build a standalone query from a follow-up and the previous user turn"""
+
+    def __init__(
+        self,
+        max_query_tokens: int = 48,
+        max_carryover_terms: int = 4,
+        max_lookback_turns: int = 2
+    ):
+        """
+        Initialize the condenser.
+
+        Args:
+            max_query_tokens: Maximum whitespace tokens in the condensed query
+            max_carryover_terms: Maximum key terms carried over from earlier turns
+            max_lookback_turns: Earlier user turns searched for key terms
+        """
+        self.max_query_tokens = max_query_tokens
+        self.max_carryover_terms = max_carryover_terms
+        self.max_lookback_turns = max_lookback_turns
+        self.metadata_extractor = MetadataExtractor()
+
+    def key_terms(self, text: str) -> List[str]:
+        """Entities, locations and production terms mentioned in text, most specific first"""
+        terms = (
+            self.metadata_extractor.extract_entities(text)
+            + self.metadata_extractor.extract_locations(text)
+            + self.metadata_extractor.extract_production_terms(text)
+        )
+
+        # Prefer multi-word names, and drop terms contained in a longer one
+        unique = sorted(set(terms), key=lambda term: (-len(term.split()), term))
+        kept = []
+        for term in unique:
+            if not any(term.lower() in other.lower() for other in kept):
+                kept.append(term)
+        return kept
+
+    def _previous_user_turns(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]]
+    ) -> List[str]:
+        """Most recent earlier user messages, newest first"""
+        turns = [
+            msg.get('content', '') for msg in conversation_history
+            if msg.get('role') == 'user'
+        ]
+        # Callers may have already appended the current question
+        if turns and turns[-1].strip() == query.strip():
+            turns = turns[:-1]
+        return turns[::-1][:self.max_lookback_turns]
+
+    def needs_context(self, query: str) -> bool:
+        """Whether the question depends on earlier turns to be understood"""
+        # Only an explicit reference back; a question naming nothing may be a new topic
+        words = set(re.findall(r"[a-z']+", query.lower()))
+        return bool(words & ANAPHORS)
+
+    def condense(
+        self,
+        query: str,
+        conversation_history: Optional[List[Dict[str, str]]] = None
+    ) -> str:
+        """
+        Condense a follow-up question into a standalone retrieval query.
+
+        Args:
+            query: Current user question
+            conversation_history: Previous messages ({'role', 'content'})
+
+        Returns:
+            Query with carried-over key terms, capped at max_query_tokens
+        """
+        carried = []
+        if conversation_history and self.needs_context(query):
+            query_lower = query.lower()
+            for turn in self._previous_user_turns(query, conversation_history):
+                terms = [t for t in self.key_terms(turn) if t.lower() not in query_lower]
+                if terms:
+                    carried = terms[:self.max_carryover_terms]
+                    break
+
+        carried_tokens = ' '.join(carried).split()[:self.max_query_tokens - 1]
+        query_budget = max(self.max_query_tokens - len(carried_tokens), 1)
+        query_tokens = query.split()[:query_budget]
+
+        return ' '.join(query_tokens + carried_tokens)
@@ -31,20 +31,24 @@ class QueryEnhancer:
             "stage": ["sound stage", "soundstage", "production stage"],
         }
     
-    def enhance_query(self, query: str) -> str:
+    def get_query_variants(self, query: str, max_variants: int = 3) -> List[str]:
         """
-        Enhance query with simple expansions.
+        Build retrieval variants of a query with simple expansions.
+        The first variant is the query with abbreviations expanded; each other
+        variant is the same query with one term replaced by an expansion, so
+        every variant still asks the whole question when searched on its own.
         
         Args:
             query: Original user query
+            max_variants: Maximum number of variants to return
             
         Returns:
-            Enhanced query string
+            List of query variants, original first
         """
         # Keep original query and create lowercase version for matching
         original_query = query
         lower_query = query.lower()
-        enhanced_parts = []
+        variants = []
         
         # Work with a copy of the original query for modifications
         modified_query = original_query
@@ -59,23 +63,42 @@ class QueryEnhancer:
                 lower_query = modified_query.lower()
         
         # Add the modified query (preserving original case)
-        enhanced_parts.append(modified_query)
+        variants.append(modified_query)
         
         # Check for term expansions
         for term, expansions in self.term_expansions.items():
             pattern = r'\b' + re.escape(term) + r'\b'
             if re.search(pattern, lower_query, re.IGNORECASE):
-                # Add expansions that aren't already in the query
+                # Replace the term, or the expansion the query already uses
+                # (e.g. "sound stage"), with an expansion that isn't in the query
+                used = [e for e in expansions if e.lower() in lower_query]
+                span = r'\b' + re.escape(used[0]) + r'\b' if used else pattern
                 for expansion in expansions:
                     if expansion.lower() not in lower_query:
-                        enhanced_parts.append(expansion)
+                        rewrite = re.sub(
+                            span, lambda m: expansion, modified_query,
+                            count=1, flags=re.IGNORECASE
+                        )
+                        if rewrite != modified_query:
+                            variants.append(rewrite)
                         break  # Only add first expansion to keep it simple
         
-        # Join unique parts with OR operator for retrieval
         # Keep original query first for better relevance
-        enhanced_query = " OR ".join(enhanced_parts[:3])  # Limit to 3 variations max
+        return variants[:max_variants]
+    
+    def enhance_query(self, query: str) -> str:
+        """
+        Enhance query with simple expansions, as one display string.
+        Retrieval should use get_query_variants() instead, so that each variant
+        is embedded and searched separately.
         
-        return enhanced_query
+        Args:
+            query: Original user query
+            
+        Returns:
+            Enhanced query string
+        """
+        return " OR ".join(self.get_query_variants(query))
     
     def get_query_keywords(self, query: str) -> List[str]:
         """
@@ -0,0 +1,205 @@
+"""
+Query router that predicts which document types can answer a question.
+Combines keyword rules with a nearest-centroid classifier over query
+embeddings, so retrieval can search only the matching document_type
+partitions and fall back to the whole corpus when the router is unsure.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+import re
+import numpy as np
+
+
+# Keywords that point at a document type (matched on word boundaries)
+DEFAULT_KEYWORD_RULES = {
+    "faq": [
+        "how much", "price", "cost", "ticket", "tickets", "hours", "open", "parking",
+        "refund", "accessible", "wheelchair", "allowed", "can i", "do you"
+    ],
+    "tour": ["tour", "tours", "guide", "guided", "visit", "visitor", "vip", "tram"],
+    "production": [
+        "film", "filmed", "filming", "movie", "director", "directed", "producer",
+        "screenplay", "script", "cast", "shot", "production"
+    ],
+    "backlot": [
+        "backlot", "new york street", "western town", "silverlight gulch",
+        "saloon", "sheriff", "henderson house", "evergreen heights", "suburban"
+    ],
+    "facilities": ["stage", "stages", "sound stage", "facility", "facilities", "building", "studio space"],
+    "operations": ["operations", "staff", "security", "schedule", "policy", "policies", "safety"],
+    "techniques": [
+        "technique", "techniques", "effects", "vfx", "stunt", "stunts", "camera",
+        "lighting", "choreography", "practical effects", "visual effects"
+    ]
+}
+
+
+class QueryRouter:
+    """Predict likely document types for a query"""
+
+    def __init__(
+        self,
+        centroids_path: Optional[str] = None,
+        keyword_rules: Optional[Dict[str, List[str]]] = None,
+        keyword_weight: float = 0.5,
+        temperature: float = 0.05,
+        min_confidence: float = 0.6,
+        max_types: int = 2,
+        min_keyword_votes: int = 2
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            centroids_path: .npz file of per-type embedding centroids written at
+                ingestion (keyword rules only when missing)
+            keyword_rules: Document type -> keywords (defaults to DEFAULT_KEYWORD_RULES)
+            keyword_weight: Weight of the keyword vote against the centroid classifier
+            temperature: Softmax temperature over centroid cosine similarities
+            min_confidence: Probability mass the predicted types must cover;
+                below it the router abstains and search stays global
+            max_types: Maximum number of document types to route to
+            min_keyword_votes: Keyword hits a type needs before keywords alone
+                can route to it; weaker votes only count for types the centroid
+                classifier would route to on its own
+        """
+        self.keyword_weight = keyword_weight
+        self.temperature = temperature
+        self.min_confidence = min_confidence
+        self.max_types = max_types
+        self.min_keyword_votes = min_keyword_votes
+
+        rules = keyword_rules or DEFAULT_KEYWORD_RULES
+        self._keyword_patterns = {
+            doc_type: re.compile(
+                r"\b(" + "|".join(re.escape(k) for k in sorted(keywords, key=len, reverse=True)) + r")\b"
+            )
+            for doc_type, keywords in rules.items()
+        }
+
+        self.document_types: List[str] = []
+        self.centroids: Optional[np.ndarray] = None
+        if centroids_path and Path(centroids_path).exists():
+            self.load_centroids(centroids_path)
+
+    @staticmethod
+    def build_centroids(
+        embeddings: np.ndarray,
+        document_types: List[str],
+        path: str
+    ) -> Dict[str, int]:
+        """
+        Compute and save the normalized mean embedding of each document type.
+
+        Args:
+            embeddings: Chunk embeddings
+            document_types: document_type of each chunk (untyped chunks are skipped)
+            path: Output .npz path
+
+        Returns:
+            Number of chunks per document type
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        labels = np.array(document_types, dtype=object)
+        types = sorted({t for t in document_types if t})
+
+        centroids = []
+        counts = {}
+        for doc_type in types:
+            mask = labels == doc_type
+            centroid = embeddings[mask].mean(axis=0)
+            centroids.append(centroid / (np.linalg.norm(centroid) or 1.0))
+            counts[doc_type] = int(mask.sum())
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            document_types=np.array(types),
+            centroids=np.array(centroids, dtype=np.float32)
+        )
+        return counts
+
+    def load_centroids(self, path: str) -> None:
+        """Load per-type centroids saved by build_centroids()"""
+        data = np.load(path)
+        self.document_types = [str(t) for t in data['document_types']]
+        self.centroids = data['centroids']
+        print(f"Loaded query router centroids for {len(self.document_types)} document types")
+
+    def _keyword_votes(self, query: str) -> Dict[str, float]:
+        """Keyword hits per document type"""
+        query_lower = query.lower()
+        return {
+            doc_type: float(len(pattern.findall(query_lower)))
+            for doc_type, pattern in self._keyword_patterns.items()
+        }
+
+    def _select(self, types: List[str], scores: np.ndarray) -> Tuple[List[str], float]:
+        """Smallest set of types covering min_confidence, up to max_types, and its mass"""
+        order = np.argsort(-scores, kind='stable')
+        chosen = []
+        confidence = 0.0
+        for i in order[:self.max_types]:
+            if scores[i] <= 0:
+                break
+            chosen.append(types[i])
+            confidence += float(scores[i])
+            if confidence >= self.min_confidence:
+                break
+        if confidence < self.min_confidence:
+            return [], confidence
+        return chosen, confidence
+
+    def route(self, query: str, query_embedding: Optional[np.ndarray] = None) -> Dict[str, Any]:
+        """
+        Predict the document types likely to answer a query.
+
+        Args:
+            query: Query text
+            query_embedding: L2-normalized query embedding (keyword rules only if None)
+
+        Returns:
+            Dict with 'document_types' (empty when the router abstains),
+            'confidence' and per-type 'scores'
+        """
+        types = sorted(set(self.document_types) | set(self._keyword_patterns))
+        scores = np.zeros(len(types))
+
+        # Keyword vote, as a distribution over types
+        votes = self._keyword_votes(query)
+        vote_array = np.array([votes.get(t, 0.0) for t in types])
+
+        # Nearest-centroid probabilities
+        has_centroids = self.centroids is not None and query_embedding is not None
+        if has_centroids:
+            similarities = self.centroids @ np.asarray(query_embedding, dtype=np.float32)
+            weights = np.exp((similarities - similarities.max()) / self.temperature)
+            probabilities = weights / weights.sum()
+            for doc_type, probability in zip(self.document_types, probabilities):
+                scores[types.index(doc_type)] = probability
+
+        # A single incidental keyword must not narrow the search on its own:
+        # weak votes need the centroid classifier to agree
+        weak = vote_array < self.min_keyword_votes
+        if has_centroids:
+            centroid_types, _ = self._select(types, scores)
+            agreeing = np.array([t in centroid_types for t in types], dtype=bool)
+            vote_array = np.where(weak & ~agreeing, 0.0, vote_array)
+        else:
+            vote_array = np.where(weak, 0.0, vote_array)
+        has_votes = vote_array.sum() > 0
+
+        if has_votes and has_centroids:
+            scores = (1 - self.keyword_weight) * scores + self.keyword_weight * vote_array / vote_array.sum()
+        elif has_votes:
+            scores = vote_array / vote_array.sum()
+        elif not has_centroids:
+            return {'document_types': [], 'confidence': 0.0, 'scores': {}, 'reason': 'no_signal'}
+
+        chosen, confidence = self._select(types, scores)
+
+        score_map = {t: float(s) for t, s in zip(types, scores) if s > 0}
+        if not chosen:
+            return {'document_types': [], 'confidence': confidence, 'scores': score_map, 'reason': 'unsure'}
+        return {'document_types': chosen, 'confidence': confidence, 'scores': score_map, 'reason': 'routed'}
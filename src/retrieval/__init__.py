@@ -1,5 +1,33 @@
-from .retriever import RAGRetriever
-from .bm25_index import BM25Index
+import importlib
 
-__all__ = ["RAGRetriever", "BM25Index"]
+# Public name -> submodule defining it
+_EXPORTS = {
+    "RAGRetriever": ".retriever",
+    "BM25Index": ".bm25_index",
+    "Candidate": ".candidate",
+    "ChunkTable": ".candidate",
+    "candidates_to_dicts": ".candidate",
+    "RerankScoreCache": ".rerank_cache",
+    "CrossEncoderReranker": ".reranker",
+    "RetrievalOptions": ".options",
+    "SemanticQueryCache": ".semantic_cache",
+    "RetrievalTrace": ".trace",
+    "ContextPacker": ".context_packer",
+    "FAQIndex": ".faq_index",
+    "extract_qa_pairs": ".faq_index",
+    "SessionRetrievalState": ".session_state",
+    "EntityIndex": ".entity_index",
+    "sentence_id": ".sentence_window",
+    "DocumentSummaryIndex": ".document_index",
+}
 
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    # Submodules are imported on first use, so the pure-Python parts (packing,
+    # session state, the summary indexes) load without torch, Chroma or BM25
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(importlib.import_module(module, __name__), name)
@@ -9,6 +9,8 @@ import os
 from pathlib import Path
 import numpy as np
 
+from .candidate import ChunkTable
+
 
 class BM25Index:
     """BM25 index for sparse text retrieval"""
@@ -25,25 +27,38 @@ class BM25Index:
         
         self.bm25 = None
         self.documents = []
+        self.texts = []
         self.doc_ids = []
-        self.metadata = []
+        # Chunk metadata, column per field
+        self.chunk_table = ChunkTable()
+        # True when doc_ids are the chunk IDs shared with the vector store
+        self.has_shared_ids = False
+        # Boolean document mask per metadata field and value, built on first use
+        self._value_masks: Dict[str, Dict[str, np.ndarray]] = {}
+        # Chunk ID -> document position, built on first use
+        self._id_positions: Dict[str, int] = None
         
         # Try to load existing index
         self._load_index()
     
-    def build_index(self, chunks: List[Dict[str, Any]]) -> None:
+    def build_index(self, chunks: List[Dict[str, Any]], ids: List[str] = None) -> None:
         """
         Build BM25 index from chunks.
         
         Args:
             chunks: List of chunks with 'text' and metadata
+            ids: Chunk IDs shared with the vector store (defaults to positional IDs)
         """
         print("Building BM25 index...")
         
         # Extract documents and metadata
         self.documents = []
+        self.texts = []
         self.doc_ids = []
-        self.metadata = []
+        metadata = []
+        self.has_shared_ids = ids is not None
+        self._value_masks = {}
+        self._id_positions = None
         
         for i, chunk in enumerate(chunks):
             text = chunk.get('text', '')
@@ -51,8 +66,10 @@ class BM25Index:
             tokenized_text = text.lower().split()
             
             self.documents.append(tokenized_text)
-            self.doc_ids.append(str(i))  # Use index as ID
-            self.metadata.append({k: v for k, v in chunk.items() if k != 'text'})
+            self.texts.append(text)
+            self.doc_ids.append(str(ids[i]) if ids is not None else str(i))
+            metadata.append({k: v for k, v in chunk.items() if k != 'text'})
+        self.chunk_table = ChunkTable.from_records(metadata)
         
         # Build BM25 index
         self.bm25 = BM25Okapi(self.documents)
@@ -62,13 +79,23 @@ class BM25Index:
         
         print(f"BM25 index built with {len(self.documents)} documents")
     
-    def search(self, query: str, top_k: int = 25) -> List[Tuple[int, float]]:
+    def search(
+        self,
+        query: str,
+        top_k: int = 25,
+        document_types: List[str] = None,
+        chunk_ids: List[str] = None,
+        source_files: List[str] = None
+    ) -> List[Tuple[int, float]]:
         """
         Search using BM25.
         
         Args:
             query: Search query
             top_k: Number of results to return
+            document_types: Only return chunks of these document types (all if None)
+            chunk_ids: Only score these chunks (all if None; needs shared chunk IDs)
+            source_files: Only return chunks of these source files (all if None)
             
         Returns:
             List of (doc_index, score) tuples
@@ -80,9 +107,35 @@ class BM25Index:
         # Tokenize query
         tokenized_query = query.lower().split()
         
+        # Chunks outside the routed partitions and documents are excluded
+        mask = None
+        if document_types:
+            mask = self.document_type_mask(document_types)
+        if source_files:
+            file_mask = self.metadata_mask('source_file', source_files)
+            mask = file_mask if mask is None else mask & file_mask
+        
+        # Only the given chunks: score just those documents
+        if chunk_ids is not None and self.has_shared_ids:
+            positions = self.positions_of(chunk_ids)
+            if mask is not None:
+                positions = positions[mask[positions]]
+            if not len(positions):
+                return []
+            subset_scores = np.asarray(
+                self.bm25.get_batch_scores(tokenized_query, positions.tolist())
+            )
+            order = np.argsort(subset_scores)[::-1][:top_k]
+            return [
+                (int(positions[i]), float(subset_scores[i])) for i in order if subset_scores[i] > 0
+            ]
+        
         # Get BM25 scores
         scores = self.bm25.get_scores(tokenized_query)
         
+        if mask is not None:
+            scores = np.where(mask, scores, 0.0)
+        
         # Get top k indices
         top_indices = np.argsort(scores)[::-1][:top_k]
         
@@ -91,6 +144,64 @@ class BM25Index:
         
         return results
     
+    def document_type_mask(self, document_types: List[str]) -> np.ndarray:
+        """
+        Boolean mask of the chunks belonging to any of the given document types.
+        
+        Args:
+            document_types: Document types to include
+            
+        Returns:
+            Boolean array aligned with the indexed documents
+        """
+        return self.metadata_mask('document_type', document_types)
+    
+    def metadata_mask(self, field: str, values: List[str]) -> np.ndarray:
+        """
+        Boolean mask of the chunks whose metadata field has any of the given values.
+        
+        Args:
+            field: Metadata field (e.g. 'document_type', 'source_file')
+            values: Values to include
+            
+        Returns:
+            Boolean array aligned with the indexed documents
+        """
+        value_masks = self._value_masks.get(field)
+        if value_masks is None:
+            labels = np.array(
+                ['' if value is None else str(value) for value in self.chunk_table.column(field)],
+                dtype=object
+            )
+            value_masks = {value: labels == value for value in set(labels)}
+            self._value_masks[field] = value_masks
+        
+        mask = np.zeros(len(self.documents), dtype=bool)
+        for value in values:
+            if value in value_masks:
+                mask |= value_masks[value]
+        return mask
+    
+    def positions_of(self, chunk_ids: List[str]) -> np.ndarray:
+        """
+        Document positions of the given chunk IDs (unknown IDs are skipped).
+        
+        Args:
+            chunk_ids: Chunk IDs shared with the vector store
+            
+        Returns:
+            Integer array of document positions
+        """
+        id_positions = self._id_positions
+        if id_positions is None:
+            id_positions = {doc_id: i for i, doc_id in enumerate(self.doc_ids)}
+            self._id_positions = id_positions
+        
+        return np.array(
+            [id_positions[chunk_id] for chunk_id in chunk_ids if chunk_id in id_positions],
+            dtype=np.int64
+        )
+    
     def get_documents_by_indices(self, indices: List[int]) -> List[Dict[str, Any]]:
         """
         Get documents by their indices.
@@ -105,22 +216,29 @@ class BM25Index:
         
         for idx in indices:
             if 0 <= idx < len(self.documents):
-                # Reconstruct the document
                 doc = {
-                    'text': ' '.join(self.documents[idx]),
+                    'text': self.text_at(idx),
                     'doc_id': self.doc_ids[idx],
-                    **self.metadata[idx]
+                    **self.chunk_table.row(idx)
                 }
                 results.append(doc)
         
         return results
     
+    def text_at(self, idx: int) -> str:
+        """Original text of a document when stored, else reconstructed from tokens"""
+        if self.texts:
+            return self.texts[idx]
+        return ' '.join(self.documents[idx])
+    
     def _save_index(self) -> None:
         """Save BM25 index to disk"""
         index_data = {
             'documents': self.documents,
+            'texts': self.texts,
             'doc_ids': self.doc_ids,
-            'metadata': self.metadata,
+            'has_shared_ids': self.has_shared_ids,
+            'metadata_columns': self.chunk_table.columns,
             'bm25_params': {
                 'k1': self.bm25.k1 if self.bm25 else 1.2,
                 'b': self.bm25.b if self.bm25 else 0.75,
@@ -146,8 +264,20 @@ class BM25Index:
                 index_data = pickle.load(f)
             
             self.documents = index_data['documents']
+            self.texts = index_data.get('texts', [])
             self.doc_ids = index_data['doc_ids']
-            self.metadata = index_data['metadata']
+            self.has_shared_ids = index_data.get('has_shared_ids', False)
+            if 'metadata_columns' in index_data:
+                self.chunk_table = ChunkTable(index_data['metadata_columns'], len(self.documents))
+            else:
+                # Indexes saved before the columnar table stored a dict per chunk
+                self.chunk_table = ChunkTable.from_records(index_data.get('metadata', []))
+            self._value_masks = {}
+            self._id_positions = None
+            
+            if not self.has_shared_ids:
+                print("BM25 index has no chunk IDs shared with the vector store; "
+                      "re-run ingestion for ID-based fusion")
             
             # Rebuild BM25 with saved parameters
             if self.documents:
@@ -169,8 +299,12 @@ class BM25Index:
         """Clear the BM25 index"""
         self.bm25 = None
         self.documents = []
+        self.texts = []
         self.doc_ids = []
-        self.metadata = []
+        self.chunk_table = ChunkTable()
+        self.has_shared_ids = False
+        self._value_masks = {}
+        self._id_positions = None
         
         # Remove saved index
         index_file = self.persist_path / "bm25_index.pkl"
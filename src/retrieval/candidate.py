@@ -0,0 +1,221 @@
+"""
+Compact candidate records for the retrieval hot path.
+A Candidate keeps the fields every stage reads (ID, text, scores, ranks) in
+__slots__ instead of a per-candidate dict, and BM25 hits reference their
+metadata as a row of the index's columnar ChunkTable until a consumer asks
+for it. Candidates behave as read/write mappings, so code indexing them like
+dicts keeps working; to_dict() converts them at the API boundary.
+"""
+
+from typing import List, Dict, Any, Optional, Iterator, Sequence
+from collections.abc import MutableMapping
+
+
+class ChunkTable:
+    """Chunk metadata stored column-wise, one list per field"""
+
+    __slots__ = ('columns', 'size')
+
+    def __init__(self, columns: Optional[Dict[str, List[Any]]] = None, size: int = 0):
+        """
+        Initialize the table.
+
+        Args:
+            columns: Field -> values aligned with the chunk positions
+                (None marks a field the chunk does not have)
+            size: Number of chunks
+        """
+        self.columns = columns or {}
+        self.size = size
+
+    @classmethod
+    def from_records(cls, records: List[Dict[str, Any]]) -> "ChunkTable":
+        """
+        Build a table from per-chunk metadata dicts.
+
+        Args:
+            records: Metadata of each chunk
+
+        Returns:
+            Table with one column per field found in any record
+        """
+        fields = list(dict.fromkeys(field for record in records for field in record))
+        columns = {field: [record.get(field) for record in records] for field in fields}
+        return cls(columns, len(records))
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, field: str) -> List[Any]:
+        """Values of a field for every chunk (None where missing)"""
+        return self.columns.get(field) or [None] * self.size
+
+    def row(self, position: int) -> Dict[str, Any]:
+        """Metadata dict of the chunk at a position"""
+        return {
+            field: values[position]
+            for field, values in self.columns.items()
+            if values[position] is not None
+        }
+
+
+# Fields held in slots, in the order they are listed by keys() and to_dict()
+_SLOT_FIELDS = (
+    'id', 'text', 'metadata', 'distance', 'similarity', 'bm25_score',
+    'dense_rank', 'sparse_rank', 'fusion_score', 'rerank_score', 'learned_score',
+    'retrieval_method'
+)
+
+# Marks a slot field the candidate does not have; a stored None stays a key,
+# as in a dict
+_UNSET = object()
+
+
+def _given(value: Any) -> Any:
+    """Constructor argument as a slot value (None means not given)"""
+    return _UNSET if value is None else value
+
+
+class Candidate(MutableMapping):
+    """
+    One retrieval candidate.
+    Slot fields hold a private sentinel until they are set; constructor
+    arguments left as None are not set. Through the mapping interface a
+    candidate behaves like a dict: storing None keeps the key, and deleting a
+    key removes it. Any other key goes to a small dict created on first use.
+    """
+
+    __slots__ = _SLOT_FIELDS + ('_table', '_row', '_extras')
+
+    def __init__(
+        self,
+        id: str,
+        text: Optional[str],
+        metadata: Optional[Dict[str, Any]] = None,
+        table: Optional[ChunkTable] = None,
+        row: int = -1,
+        distance: Optional[float] = None,
+        similarity: Optional[float] = None,
+        bm25_score: Optional[float] = None,
+        retrieval_method: Optional[str] = None
+    ):
+        """
+        Initialize a candidate.
+
+        Args:
+            id: Chunk ID
+            text: Chunk text (None when the vector store query left it out)
+            metadata: Chunk metadata (or None to read it from table)
+            table: Columnar metadata the candidate references by row
+            row: Position of the chunk in table
+            distance: Vector distance of a dense hit
+            similarity: Cosine similarity of a dense hit
+            bm25_score: BM25 score of a sparse hit
+            retrieval_method: Branch that produced the candidate
+        """
+        self.id = id
+        self.text = _given(text)
+        self.metadata = _given(metadata)
+        self._table = table
+        self._row = row
+        self.distance = _given(distance)
+        self.similarity = _given(similarity)
+        self.bm25_score = _given(bm25_score)
+        self.dense_rank = _UNSET
+        self.sparse_rank = _UNSET
+        self.fusion_score = _UNSET
+        self.rerank_score = _UNSET
+        self.learned_score = _UNSET
+        self.retrieval_method = _given(retrieval_method)
+        self._extras = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Candidate":
+        """Candidate with the fields of a result dict"""
+        candidate = cls(data['id'], data['text'])
+        for key, value in data.items():
+            candidate[key] = value
+        return candidate
+
+    def _metadata(self) -> Any:
+        # Table rows become a dict only when metadata is first read
+        if self.metadata is _UNSET and self._table is not None:
+            self.metadata = self._table.row(self._row)
+        return self.metadata
+
+    def __getitem__(self, key: str) -> Any:
+        if key == 'metadata':
+            value = self._metadata()
+        elif key in _SLOT_FIELDS:
+            value = getattr(self, key)
+        elif self._extras is not None and key in self._extras:
+            return self._extras[key]
+        else:
+            raise KeyError(key)
+        if value is _UNSET:
+            raise KeyError(key)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in _SLOT_FIELDS:
+            setattr(self, key, value)
+        else:
+            if self._extras is None:
+                self._extras = {}
+            self._extras[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        if key not in self:
+            raise KeyError(key)
+        if key == 'metadata':
+            self._table = None
+        if key in _SLOT_FIELDS:
+            setattr(self, key, _UNSET)
+        else:
+            del self._extras[key]
+
+    def __contains__(self, key: object) -> bool:
+        if key == 'metadata':
+            return self.metadata is not _UNSET or self._table is not None
+        if key in _SLOT_FIELDS:
+            return getattr(self, key) is not _UNSET
+        return self._extras is not None and key in self._extras
+
+    def __iter__(self) -> Iterator[str]:
+        for key in _SLOT_FIELDS:
+            if key in self:
+                yield key
+        if self._extras is not None:
+            yield from self._extras
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def __repr__(self) -> str:
+        return f"Candidate(id={self.id!r}, method={self.get('retrieval_method')!r})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict of the candidate's fields, for JSON responses"""
+        return {key: self[key] for key in self}
+
+
+def candidates_to_dicts(
+    candidates: List[Any],
+    fields: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    """
+    Convert retrieval results to plain dicts at the API boundary.
+
+    Args:
+        candidates: Candidates or result dicts
+        fields: Keep only these fields (all fields if None)
+
+    Returns:
+        List of dicts
+    """
+    if fields is not None:
+        return [{key: c[key] for key in fields if key in c} for c in candidates]
+    return [
+        c.to_dict() if isinstance(c, Candidate) else dict(c)
+        for c in candidates
+    ]
@@ -0,0 +1,259 @@
+"""
+Token-budgeted packing of retrieved chunks into the LLM context.
+Chunks from the same source that overlap or follow each other are merged,
+sentences already in the context are dropped, and the merged blocks fill a
+token budget in rank order. Tokens are counted with the LLM's tokenizer when
+one is configured, otherwise estimated from the text length.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+import re
+import threading
+
+
+# Sentence boundaries used for duplicate-span removal and truncation; the
+# group keeps each separator so kept spans are re-joined with their layout
+SENTENCE_SPLIT = re.compile(r'((?<=[.!?])\s+|\n+)')
+
+
+class ContextPacker:
+    """Merge, deduplicate and budget retrieved chunks for the prompt"""
+
+    def __init__(
+        self,
+        token_budget: Optional[int] = None,
+        tokenizer_name: Optional[str] = None,
+        chars_per_token: float = 4.0,
+        min_overlap_chars: int = 20,
+        max_overlap_chars: int = 200,
+        min_duplicate_chars: int = 20,
+        min_block_tokens: int = 32
+    ):
+        """
+        Initialize the packer.
+
+        Args:
+            token_budget: Maximum context tokens (None packs without a limit)
+            tokenizer_name: Hugging Face tokenizer matching the LLM; None or a
+                tokenizer that fails to load falls back to a length estimate
+            chars_per_token: Characters per token for the fallback estimate
+            min_overlap_chars: Shortest suffix/prefix match treated as chunk overlap
+            max_overlap_chars: Longest suffix/prefix match searched for
+            min_duplicate_chars: Shortest sentence dropped when it repeats
+            min_block_tokens: Smallest truncated block worth adding at the end of the budget
+        """
+        self.token_budget = token_budget
+        self.chars_per_token = chars_per_token
+        self.min_overlap_chars = min_overlap_chars
+        self.max_overlap_chars = max_overlap_chars
+        self.min_duplicate_chars = min_duplicate_chars
+        self.min_block_tokens = min_block_tokens
+        self.tokenizer = self._load_tokenizer(tokenizer_name) if tokenizer_name else None
+
+        # Fast tokenizers are not safe to call from several threads at once
+        self._tokenizer_lock = threading.Lock()
+
+    @staticmethod
+    def _load_tokenizer(tokenizer_name: str):
+        """Load a Hugging Face tokenizer, or None if it is unavailable"""
+        try:
+            from transformers import AutoTokenizer
+            return AutoTokenizer.from_pretrained(tokenizer_name)
+        except Exception as e:
+            print(f"Context tokenizer unavailable, estimating tokens from length: {e}")
+            return None
+
+    def count_tokens(self, text: str) -> int:
+        """Number of LLM tokens in text"""
+        if not text:
+            return 0
+        if self.tokenizer is None:
+            return max(1, int(round(len(text) / self.chars_per_token)))
+        with self._tokenizer_lock:
+            return len(self.tokenizer.encode(text, add_special_tokens=False))
+
+    def _overlap(self, left: str, right: str) -> int:
+        """Length of the longest suffix of left that is a prefix of right"""
+        longest = min(len(left), len(right), self.max_overlap_chars)
+        for size in range(longest, self.min_overlap_chars - 1, -1):
+            if left.endswith(right[:size]):
+                return size
+        return 0
+
+    @staticmethod
+    def _join(spans: List[Tuple[str, str]]) -> str:
+        """Re-join (span, separator) pairs with their original separators"""
+        return ''.join(span + separator for span, separator in spans).rstrip()
+
+    @staticmethod
+    def _header(number: int, source: str, pages: List[str]) -> str:
+        page = pages[0] if len(set(pages)) == 1 else f"{pages[0]}-{pages[-1]}"
+        return f"[Source {number}: {source}, Page {page}]\n"
+
+    def _merge_blocks(
+        self,
+        chunks: List[Dict[str, Any]],
+        chunk_tokens: List[int]
+    ) -> Tuple[List[Dict[str, Any]], int]:
+        """
+        Merge chunks from the same source that overlap or are linked neighbors.
+
+        Args:
+            chunks: Retrieved chunks in rank order
+            chunk_tokens: Token count of each chunk's text
+
+        Returns:
+            Blocks in rank order of their best chunk (with the token count of
+            blocks that are still a single chunk), and the number of merges
+        """
+        blocks = []
+        merges = 0
+
+        for number, (chunk, tokens) in enumerate(zip(chunks, chunk_tokens), 1):
+            metadata = chunk.get('metadata') or {}
+            source = metadata.get('source_file', 'Unknown')
+            page = str(metadata.get('page_num', 'Unknown'))
+            chunk_ids = chunk.get('expanded_chunk_ids') or [chunk.get('id')]
+            text = chunk['text']
+
+            merged = False
+            for block in blocks:
+                if block['source'] != source:
+                    continue
+
+                # This chunk directly follows the block
+                overlap = self._overlap(block['text'], text)
+                if overlap or metadata.get('prev_chunk_id') in block['last_ids']:
+                    block['text'] = block['text'] + ("" if overlap else "\n") + text[overlap:]
+                    block['pages'].append(page)
+                    block['last_ids'] = set(chunk_ids)
+                    block['tokens'] = None
+                    merged = True
+                    break
+
+                # This chunk directly precedes the block
+                overlap = self._overlap(text, block['text'])
+                if overlap or metadata.get('next_chunk_id') in block['first_ids']:
+                    block['text'] = text + ("" if overlap else "\n") + block['text'][overlap:]
+                    block['pages'].insert(0, page)
+                    block['first_ids'] = set(chunk_ids)
+                    block['tokens'] = None
+                    merged = True
+                    break
+
+                # Already covered by the block
+                if text in block['text']:
+                    merged = True
+                    break
+
+            if merged:
+                merges += 1
+            else:
+                blocks.append({
+                    'number': number,
+                    'source': source,
+                    'pages': [page],
+                    'text': text,
+                    'first_ids': set(chunk_ids),
+                    'last_ids': set(chunk_ids),
+                    'tokens': tokens
+                })
+
+        return blocks, merges
+
+    def pack(self, chunks: List[Dict[str, Any]]) -> Tuple[str, Dict[str, Any]]:
+        """
+        Pack retrieved chunks into a context string within the token budget.
+
+        Args:
+            chunks: Retrieved chunks in rank order
+
+        Returns:
+            Context string with [Source N: file, Page X] headers, where N is the
+            rank of the block's best chunk, and packing statistics
+        """
+        # Each chunk is tokenized once; plain concatenation would cost these
+        # counts plus one header per chunk
+        chunk_tokens = [self.count_tokens(c['text']) for c in chunks]
+        unpacked_tokens = sum(chunk_tokens) + sum(
+            self.count_tokens(
+                self._header(
+                    i,
+                    (c.get('metadata') or {}).get('source_file', 'Unknown'),
+                    [str((c.get('metadata') or {}).get('page_num', 'Unknown'))]
+                )
+            )
+            for i, c in enumerate(chunks, 1)
+        )
+
+        blocks, merges = self._merge_blocks(chunks, chunk_tokens)
+
+        seen_spans = set()
+        duplicate_spans = 0
+        parts = []
+        used_tokens = 0
+        truncated_blocks = 0
+        dropped_blocks = 0
+
+        for block in blocks:
+            # Drop sentences that are already in the context
+            pieces = SENTENCE_SPLIT.split(block['text'].strip())
+            spans = []
+            dropped = False
+            for span, separator in zip(pieces[0::2], pieces[1::2] + ['']):
+                key = ' '.join(span.lower().split())
+                if not key:
+                    continue
+                if len(key) >= self.min_duplicate_chars:
+                    if key in seen_spans:
+                        duplicate_spans += 1
+                        dropped = True
+                        continue
+                    seen_spans.add(key)
+                spans.append((span, separator))
+            if not spans:
+                continue
+
+            header = self._header(block['number'], block['source'], block['pages'])
+            text = self._join(spans)
+            if block['tokens'] is not None and not dropped:
+                # Unchanged single chunk: reuse its count
+                tokens = self.count_tokens(header) + block['tokens']
+            else:
+                tokens = self.count_tokens(header + text)
+
+            # Truncate the last block that fits only partly, sentence by sentence
+            if self.token_budget is not None and used_tokens + tokens > self.token_budget:
+                remaining = self.token_budget - used_tokens
+                if remaining < self.min_block_tokens:
+                    dropped_blocks += 1
+                    continue
+                while spans and self.count_tokens(header + self._join(spans)) > remaining:
+                    spans.pop()
+                if not spans:
+                    dropped_blocks += 1
+                    continue
+                text = self._join(spans)
+                tokens = self.count_tokens(header + text)
+                truncated_blocks += 1
+
+            parts.append(f"{header}{text}\n")
+            used_tokens += tokens
+
+        stats = {
+            'chunks': len(chunks),
+            'blocks': len(parts),
+            'merged_chunks': merges,
+            'duplicate_spans': duplicate_spans,
+            'truncated_blocks': truncated_blocks,
+            'dropped_blocks': dropped_blocks,
+            'token_budget': self.token_budget,
+            'unpacked_tokens': unpacked_tokens,
+            'context_tokens': used_tokens,
+            'tokens_saved': max(unpacked_tokens - used_tokens, 0),
+            'exact_token_counts': self.tokenizer is not None
+        }
+
+        if not parts:
+            return "No relevant context found.", stats
+        return "\n".join(parts), stats
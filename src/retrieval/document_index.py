@@ -0,0 +1,146 @@
+"""
+Hierarchical document-summary index for two-level retrieval.
+Each source document and each of its sections (chapter, or page when the
+chunker found no chapter) is represented by the centroid of its chunk
+embeddings. A query scores these few vectors first, and chunk search then
+runs only within the best-matching documents.
+"""
+
+from typing import List, Dict, Any, Optional
+from pathlib import Path
+import threading
+import numpy as np
+
+
+class DocumentSummaryIndex:
+    """Document and section centroids used to pick the documents to search"""
+
+    def __init__(self, path: Optional[str] = None):
+        """
+        Initialize the index.
+
+        Args:
+            path: .npz file written by build() (empty index when missing)
+        """
+        self.documents: List[str] = []
+        self.document_centroids: Optional[np.ndarray] = None
+        self.section_documents: Optional[np.ndarray] = None
+        self.section_centroids: Optional[np.ndarray] = None
+
+        # Statistics
+        self.lookups = 0
+        self._stats_lock = threading.Lock()
+
+        if path and Path(path).exists():
+            self.load(path)
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    @staticmethod
+    def _section_key(chunk: Dict[str, Any]) -> str:
+        """Chapter of a chunk, or its page when no chapter was found"""
+        chapter = str(chunk.get('chapter', '') or '')
+        return f"chapter:{chapter}" if chapter else f"page:{chunk.get('page_num', '')}"
+
+    @staticmethod
+    def _centroid(vectors: np.ndarray) -> np.ndarray:
+        centroid = vectors.mean(axis=0)
+        return centroid / (np.linalg.norm(centroid) or 1.0)
+
+    @classmethod
+    def build(
+        cls,
+        embeddings: np.ndarray,
+        chunks: List[Dict[str, Any]],
+        path: str
+    ) -> Dict[str, int]:
+        """
+        Compute and save document and section centroids.
+
+        Args:
+            embeddings: Chunk embeddings aligned with chunks
+            chunks: Chunks with 'source_file' (and 'chapter' / 'page_num')
+            path: Output .npz path
+
+        Returns:
+            Number of documents and sections
+        """
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        by_document: Dict[str, Dict[str, List[int]]] = {}
+        for position, chunk in enumerate(chunks):
+            sections = by_document.setdefault(str(chunk.get('source_file', '')), {})
+            sections.setdefault(cls._section_key(chunk), []).append(position)
+
+        documents = sorted(by_document)
+        document_centroids = []
+        section_documents = []
+        section_centroids = []
+        for document_index, document in enumerate(documents):
+            positions = [p for section in by_document[document].values() for p in section]
+            document_centroids.append(cls._centroid(embeddings[positions]))
+            for section_positions in by_document[document].values():
+                section_documents.append(document_index)
+                section_centroids.append(cls._centroid(embeddings[section_positions]))
+
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            documents=np.array(documents),
+            document_centroids=np.array(document_centroids, dtype=np.float32),
+            section_documents=np.array(section_documents, dtype=np.int64),
+            section_centroids=np.array(section_centroids, dtype=np.float32)
+        )
+        return {'documents': len(documents), 'sections': len(section_centroids)}
+
+    def load(self, path: str) -> None:
+        """Load centroids saved by build()"""
+        data = np.load(path)
+        self.documents = [str(d) for d in data['documents']]
+        self.document_centroids = data['document_centroids']
+        self.section_documents = data['section_documents']
+        self.section_centroids = data['section_centroids']
+        print(f"Loaded document summary index with {len(self.documents)} documents "
+              f"and {len(self.section_centroids)} sections")
+
+    def select(self, query_embedding: np.ndarray, top_documents: int = 3) -> Dict[str, Any]:
+        """
+        Pick the documents to search for a query.
+        A document scores the better of its own centroid and its best section,
+        so a document with one highly relevant section is not missed.
+
+        Args:
+            query_embedding: L2-normalized query embedding
+            top_documents: Number of documents chunk search is restricted to
+
+        Returns:
+            Dict with 'documents' (empty when every document would be searched
+            anyway) and per-document 'scores'
+        """
+        with self._stats_lock:
+            self.lookups += 1
+
+        if len(self.documents) <= top_documents:
+            return {'documents': [], 'scores': {}}
+
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        scores = self.document_centroids @ query_embedding
+        section_scores = self.section_centroids @ query_embedding
+        best_sections = np.full(len(self.documents), -np.inf, dtype=np.float32)
+        np.maximum.at(best_sections, self.section_documents, section_scores)
+        scores = np.maximum(scores, best_sections)
+
+        order = np.argsort(-scores, kind='stable')[:top_documents]
+        return {
+            'documents': [self.documents[i] for i in order],
+            'scores': {self.documents[i]: float(scores[i]) for i in order}
+        }
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get index size and lookup count"""
+        with self._stats_lock:
+            return {
+                'documents': len(self.documents),
+                'sections': 0 if self.section_centroids is None else len(self.section_centroids),
+                'lookups': self.lookups
+            }
@@ -0,0 +1,194 @@
+"""
+Entity and location inverted index.
+Maps each entity, location and production term that MetadataExtractor found at
+ingestion to the IDs of the chunks mentioning it. At query time the same
+gazetteer recognizes mentions in the question, and their postings restrict
+(small posting sets) or boost (larger ones) the retrieval candidates.
+"""
+
+from typing import List, Dict, Any, Optional
+from pathlib import Path
+import ast
+import json
+import threading
+
+from ..metadata import MetadataExtractor
+
+
+# Chunk metadata fields indexed, with the extractor method that finds them in a query
+ENTITY_FIELDS = {
+    "entities": "extract_entities",
+    "locations": "extract_locations",
+    "production_terms": "extract_production_terms"
+}
+
+
+def _as_list(value: Any) -> List[str]:
+    """Entity lists arrive as lists at ingestion and as str(list) from ChromaDB"""
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    if isinstance(value, str) and value.startswith('['):
+        try:
+            return [str(v) for v in ast.literal_eval(value)]
+        except (ValueError, SyntaxError):
+            return []
+    return []
+
+
+class EntityIndex:
+    """Inverted index from gazetteer terms to chunk IDs"""
+
+    def __init__(
+        self,
+        persist_path: str = "./entity_index",
+        max_restrict: int = 40,
+        max_df: float = 0.2
+    ):
+        """
+        Initialize the entity index.
+
+        Args:
+            persist_path: Directory of the persisted index
+            max_restrict: Largest posting set used as a hard candidate restriction;
+                larger sets only boost matching candidates
+            max_df: Terms mentioned by more than this share of chunks
+                ("Silverlight Studios", "Production") are ignored as too common
+        """
+        self.persist_path = Path(persist_path)
+        self.max_restrict = max_restrict
+        self.max_df = max_df
+        self.extractor = MetadataExtractor()
+
+        # Chunk IDs, and term -> positions into chunk_ids
+        self.chunk_ids: List[str] = []
+        self.postings: Dict[str, List[int]] = {}
+
+        # Statistics
+        self.lookups = 0
+        self.restricted = 0
+        self.boosted = 0
+        self._stats_lock = threading.Lock()
+
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self.postings)
+
+    def build(self, chunks: List[Dict[str, Any]], ids: List[str]) -> Dict[str, int]:
+        """
+        Build and save the index from enriched chunks.
+
+        Args:
+            chunks: Chunks with the MetadataExtractor fields (entities, locations,
+                production_terms)
+            ids: Chunk IDs shared with the vector store and the BM25 index
+
+        Returns:
+            Number of distinct terms per field
+        """
+        self.chunk_ids = [str(chunk_id) for chunk_id in ids]
+        postings: Dict[str, set] = {}
+        counts = {}
+        for field in ENTITY_FIELDS:
+            terms = set()
+            for position, chunk in enumerate(chunks):
+                for term in _as_list(chunk.get(field)):
+                    postings.setdefault(term.lower(), set()).add(position)
+                    terms.add(term)
+            counts[field] = len(terms)
+
+        self.postings = {term: sorted(positions) for term, positions in postings.items()}
+        self._save_index()
+        print(f"Entity index built with {len(self.postings)} terms over {len(self.chunk_ids)} chunks")
+        return counts
+
+    def match_query(self, query: str) -> List[str]:
+        """
+        Recognize gazetteer terms mentioned in a query.
+
+        Args:
+            query: Query text
+
+        Returns:
+            Lower-cased terms that are in the index
+        """
+        mentions = set()
+        for method in ENTITY_FIELDS.values():
+            mentions.update(term.lower() for term in getattr(self.extractor, method)(query))
+        return sorted(term for term in mentions if term in self.postings)
+
+    def lookup(self, query: str) -> Optional[Dict[str, Any]]:
+        """
+        Candidate chunks for the entities a query mentions.
+
+        Args:
+            query: Query text
+
+        Returns:
+            None when no selective term is mentioned, otherwise a dict with
+            'mentions', 'mode' ('restrict' or 'boost') and 'matches'
+            (chunk ID -> number of mentioned terms in the chunk)
+        """
+        with self._stats_lock:
+            self.lookups += 1
+
+        if not self.chunk_ids:
+            return None
+
+        max_postings = self.max_df * len(self.chunk_ids)
+        mentions = [
+            term for term in self.match_query(query)
+            if len(self.postings[term]) <= max_postings
+        ]
+        if not mentions:
+            return None
+
+        matches: Dict[str, int] = {}
+        for term in mentions:
+            for position in self.postings[term]:
+                chunk_id = self.chunk_ids[position]
+                matches[chunk_id] = matches.get(chunk_id, 0) + 1
+
+        mode = 'restrict' if len(matches) <= self.max_restrict else 'boost'
+        with self._stats_lock:
+            if mode == 'restrict':
+                self.restricted += 1
+            else:
+                self.boosted += 1
+        return {'mentions': mentions, 'mode': mode, 'matches': matches}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lookup counts by outcome"""
+        with self._stats_lock:
+            return {
+                'terms': len(self.postings),
+                'chunks': len(self.chunk_ids),
+                'lookups': self.lookups,
+                'restricted': self.restricted,
+                'boosted': self.boosted
+            }
+
+    def _save_index(self) -> None:
+        """Save chunk IDs and postings to disk"""
+        self.persist_path.mkdir(parents=True, exist_ok=True)
+        with open(self.persist_path / "entity_index.json", 'w') as f:
+            json.dump({'chunk_ids': self.chunk_ids, 'postings': self.postings}, f)
+
+    def _load_index(self) -> bool:
+        """Load the index from disk if it exists"""
+        index_file = self.persist_path / "entity_index.json"
+        if not index_file.exists():
+            return False
+
+        try:
+            with open(index_file, 'r') as f:
+                data = json.load(f)
+            self.chunk_ids = data['chunk_ids']
+            self.postings = data['postings']
+            print(f"Entity index loaded with {len(self.postings)} terms")
+            return True
+        except Exception as e:
+            print(f"Error loading entity index: {e}")
+            self.chunk_ids = []
+            self.postings = {}
+            return False
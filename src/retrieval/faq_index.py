@@ -0,0 +1,209 @@
+"""
+FAQ direct-answer index.
+Question/answer pairs extracted from the FAQ documents are indexed by
+question embedding and BM25 terms. A user question that matches a stored
+question with high confidence is answered with the stored answer and its
+source citation, skipping retrieval, reranking and the LLM.
+"""
+
+from typing import List, Dict, Any, Optional
+from rank_bm25 import BM25Okapi
+from pathlib import Path
+import json
+import re
+import threading
+import numpy as np
+
+
+# "Q: ..." / "**Q: ...**" question lines and "A: ..." answer lines
+QUESTION_LINE = re.compile(r'^\s*(?:\*\*)?\s*Q\s*[:.]\s*(.*?)\s*(?:\*\*)?\s*$')
+ANSWER_LINE = re.compile(r'^\s*(?:\*\*)?\s*A\s*[:.]\s*(?:\*\*)?\s*(.*)$')
+# Markdown headings and horizontal rules end an answer
+HEADING_LINE = re.compile(r'^\s*(?:#{1,6}\s|-{3,}\s*$)')
+
+
+def extract_qa_pairs(pages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Extract question/answer pairs from document pages.
+
+    Args:
+        pages: Page dicts with 'text', 'page_num' and 'source_file'
+            (as returned by extract_text_from_pdf)
+
+    Returns:
+        Pairs with 'question', 'answer', 'source_file' and 'page_num'
+    """
+    pairs = []
+    current = None
+    in_answer = False
+
+    def close(pair):
+        if pair and pair['question'] and pair['answer'].strip():
+            pair['question'] = ' '.join(pair['question'].split())
+            pair['answer'] = pair['answer'].strip()
+            pairs.append(pair)
+
+    for page in pages:
+        for line in page['text'].splitlines():
+            question = QUESTION_LINE.match(line)
+            if question:
+                close(current)
+                current = {
+                    'question': question.group(1).strip('* '),
+                    'answer': '',
+                    'source_file': page.get('source_file', ''),
+                    'page_num': page.get('page_num', '')
+                }
+                in_answer = False
+                continue
+
+            if current is None:
+                continue
+
+            if HEADING_LINE.match(line):
+                close(current)
+                current = None
+                continue
+
+            answer = ANSWER_LINE.match(line)
+            if not in_answer and answer:
+                current['answer'] = answer.group(1) + '\n'
+                in_answer = True
+            elif in_answer:
+                current['answer'] += line + '\n'
+            else:
+                # Question wrapped over several lines
+                current['question'] += ' ' + line.strip('* ')
+
+    close(current)
+    return pairs
+
+
+class FAQIndex:
+    """Question index over FAQ pairs for high-confidence direct answers"""
+
+    def __init__(
+        self,
+        persist_path: str = "./faq_index",
+        match_threshold: float = 0.9,
+        lexical_margin: float = 0.05
+    ):
+        """
+        Initialize the FAQ index.
+
+        Args:
+            persist_path: Directory of the persisted index
+            match_threshold: Question cosine similarity at which a stored answer is used
+            lexical_margin: Lower threshold by this much when BM25 picks the same question
+        """
+        self.persist_path = Path(persist_path)
+        self.match_threshold = match_threshold
+        self.lexical_margin = lexical_margin
+
+        self.pairs: List[Dict[str, Any]] = []
+        self.embeddings: Optional[np.ndarray] = None
+        self.bm25 = None
+
+        # Statistics
+        self.lookups = 0
+        self.matches = 0
+        self._stats_lock = threading.Lock()
+
+        self._load_index()
+
+    def __len__(self) -> int:
+        return len(self.pairs)
+
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        return re.findall(r"[a-z0-9']+", text.lower())
+
+    def build(self, pairs: List[Dict[str, Any]], question_embeddings: np.ndarray) -> None:
+        """
+        Build and save the index.
+
+        Args:
+            pairs: Question/answer pairs (see extract_qa_pairs)
+            question_embeddings: L2-normalized embeddings of the questions
+        """
+        self.pairs = list(pairs)
+        self.embeddings = np.asarray(question_embeddings, dtype=np.float32)
+        self.bm25 = BM25Okapi([self._tokenize(p['question']) for p in self.pairs]) if self.pairs else None
+        self._save_index()
+        print(f"FAQ index built with {len(self.pairs)} question/answer pairs")
+
+    def match(self, query: str, query_embedding: np.ndarray) -> Optional[Dict[str, Any]]:
+        """
+        Find a stored question that is the same as the query.
+
+        Args:
+            query: User question
+            query_embedding: L2-normalized query embedding
+
+        Returns:
+            The matched pair with 'confidence' and 'matched_by', or None
+        """
+        with self._stats_lock:
+            self.lookups += 1
+
+        if not self.pairs:
+            return None
+
+        similarities = self.embeddings @ np.asarray(query_embedding, dtype=np.float32)
+        best = int(np.argmax(similarities))
+        confidence = float(similarities[best])
+
+        matched_by = None
+        if confidence >= self.match_threshold:
+            matched_by = 'embedding'
+        elif confidence >= self.match_threshold - self.lexical_margin and self.bm25 is not None:
+            # Near miss: accept when the keyword ranking agrees
+            bm25_scores = self.bm25.get_scores(self._tokenize(query))
+            if bm25_scores.max() > 0 and int(np.argmax(bm25_scores)) == best:
+                matched_by = 'embedding+bm25'
+
+        if matched_by is None:
+            return None
+
+        with self._stats_lock:
+            self.matches += 1
+        return {**self.pairs[best], 'confidence': confidence, 'matched_by': matched_by}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get lookup and match counts"""
+        with self._stats_lock:
+            return {
+                'pairs': len(self.pairs),
+                'match_threshold': self.match_threshold,
+                'lookups': self.lookups,
+                'matches': self.matches,
+                'match_rate': self.matches / self.lookups if self.lookups else 0.0
+            }
+
+    def _save_index(self) -> None:
+        """Save pairs and question embeddings to disk"""
+        self.persist_path.mkdir(parents=True, exist_ok=True)
+        with open(self.persist_path / "faq_pairs.json", 'w') as f:
+            json.dump(self.pairs, f, indent=2)
+        np.save(self.persist_path / "faq_embeddings.npy", self.embeddings)
+
+    def _load_index(self) -> bool:
+        """Load the index from disk if it exists"""
+        pairs_file = self.persist_path / "faq_pairs.json"
+        embeddings_file = self.persist_path / "faq_embeddings.npy"
+        if not pairs_file.exists() or not embeddings_file.exists():
+            return False
+
+        try:
+            with open(pairs_file, 'r') as f:
+                self.pairs = json.load(f)
+            self.embeddings = np.load(embeddings_file)
+            if self.pairs:
+                self.bm25 = BM25Okapi([self._tokenize(p['question']) for p in self.pairs])
+            print(f"FAQ index loaded with {len(self.pairs)} question/answer pairs")
+            return True
+        except Exception as e:
+            print(f"Error loading FAQ index: {e}")
+            self.pairs = []
+            self.embeddings = None
+            return False
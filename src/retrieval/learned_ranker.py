@@ -0,0 +1,167 @@
+"""
+Lightweight learned ranker distilled from cross-encoder scores.
+Scores fused candidates from cheap first-stage features with a standardized
+ridge regression, for a low-latency rerank mode without the cross-encoder.
+"""
+
+from typing import List, Dict, Any, Set
+from datetime import datetime
+from pathlib import Path
+import json
+import numpy as np
+
+from ..metadata import MetadataExtractor
+
+
+FEATURE_NAMES = [
+    "similarity",
+    "log_bm25_score",
+    "dense_reciprocal_rank",
+    "sparse_reciprocal_rank",
+    "rrf_score",
+    "in_dense",
+    "in_sparse",
+    "log_chunk_length",
+    "entity_matches",
+    "location_matches",
+    "production_term_matches",
+]
+
+
+class LearnedRanker:
+    """Linear ranker over first-stage features, trained on cross-encoder labels"""
+
+    def __init__(self):
+        """Initialize an untrained ranker"""
+        self.feature_names = list(FEATURE_NAMES)
+        self.mean = np.zeros(len(FEATURE_NAMES))
+        self.std = np.ones(len(FEATURE_NAMES))
+        self.weights = np.zeros(len(FEATURE_NAMES))
+        self.bias = 0.0
+        self.metadata: Dict[str, Any] = {}
+        self.metadata_extractor = MetadataExtractor()
+
+    def _query_terms(self, query: str) -> Dict[str, Set[str]]:
+        """Entities, locations and production terms mentioned in the query"""
+        return {
+            'entities': set(self.metadata_extractor.extract_entities(query)),
+            'locations': set(self.metadata_extractor.extract_locations(query)),
+            'production_terms': set(self.metadata_extractor.extract_production_terms(query)),
+        }
+
+    @staticmethod
+    def _count_matches(terms: Set[str], chunk_value: Any) -> int:
+        """Count query terms present in a chunk metadata field (list or stringified list)"""
+        if not terms or not chunk_value:
+            return 0
+        if isinstance(chunk_value, (list, tuple, set)):
+            return len(terms & set(chunk_value))
+        return sum(1 for term in terms if term in str(chunk_value))
+
+    def extract_features(self, query: str, candidates: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Build the feature matrix for a query's candidates.
+
+        Args:
+            query: Query text
+            candidates: Fused candidates from the retriever
+
+        Returns:
+            Array of shape (len(candidates), len(FEATURE_NAMES))
+        """
+        query_terms = self._query_terms(query)
+        rows = []
+
+        for candidate in candidates:
+            metadata = candidate.get('metadata', {}) or {}
+            dense_rank = candidate.get('dense_rank')
+            sparse_rank = candidate.get('sparse_rank')
+
+            rows.append([
+                candidate.get('similarity', 0.0),
+                np.log1p(candidate.get('bm25_score', 0.0)),
+                1.0 / (dense_rank + 1) if dense_rank is not None else 0.0,
+                1.0 / (sparse_rank + 1) if sparse_rank is not None else 0.0,
+                candidate.get('fusion_score', 0.0),
+                float(dense_rank is not None),
+                float(sparse_rank is not None),
+                np.log1p(len(candidate.get('text', ''))),
+                self._count_matches(query_terms['entities'], metadata.get('entities')),
+                self._count_matches(query_terms['locations'], metadata.get('locations')),
+                self._count_matches(
+                    query_terms['production_terms'], metadata.get('production_terms')
+                ),
+            ])
+
+        return np.array(rows, dtype=np.float64).reshape(len(candidates), len(FEATURE_NAMES))
+
+    def fit(self, features: np.ndarray, labels: np.ndarray, l2: float = 1.0) -> None:
+        """
+        Fit a standardized ridge regression to cross-encoder scores.
+
+        Args:
+            features: Feature matrix
+            labels: Cross-encoder scores aligned with the rows
+            l2: Ridge regularization strength
+        """
+        self.mean = features.mean(axis=0)
+        self.std = features.std(axis=0)
+        self.std[self.std == 0] = 1.0
+
+        standardized = (features - self.mean) / self.std
+        self.bias = float(labels.mean())
+        centered = labels - self.bias
+
+        gram = standardized.T @ standardized + l2 * np.eye(standardized.shape[1])
+        self.weights = np.linalg.solve(gram, standardized.T @ centered)
+
+        predictions = standardized @ self.weights + self.bias
+        self.metadata = {
+            'trained_at': datetime.now().isoformat(),
+            'num_samples': int(len(labels)),
+            'l2': l2,
+            'train_rmse': float(np.sqrt(np.mean((predictions - labels) ** 2)))
+        }
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        """Predict cross-encoder-like scores from features"""
+        return ((features - self.mean) / self.std) @ self.weights + self.bias
+
+    def score(self, query: str, candidates: List[Dict[str, Any]]) -> np.ndarray:
+        """Score candidates for a query"""
+        if not candidates:
+            return np.array([])
+        return self.predict(self.extract_features(query, candidates))
+
+    def save(self, path: str) -> None:
+        """Persist the model as JSON"""
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump({
+                'feature_names': self.feature_names,
+                'mean': self.mean.tolist(),
+                'std': self.std.tolist(),
+                'weights': self.weights.tolist(),
+                'bias': self.bias,
+                'metadata': self.metadata
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "LearnedRanker":
+        """Load a model saved with save()"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+
+        if data['feature_names'] != FEATURE_NAMES:
+            raise ValueError(
+                f"Learned ranker at {path} was trained on different features; retrain it"
+            )
+
+        ranker = cls()
+        ranker.mean = np.array(data['mean'])
+        ranker.std = np.array(data['std'])
+        ranker.weights = np.array(data['weights'])
+        ranker.bias = float(data['bias'])
+        ranker.metadata = data.get('metadata', {})
+        return ranker
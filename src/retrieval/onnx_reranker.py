@@ -0,0 +1,138 @@
+"""
+Quantized ONNX cross-encoder backend for CPU reranking.
+Exports the locally cached cross-encoder to ONNX once, applies dynamic int8
+quantization and scores batches through onnxruntime. Tokenization, truncation
+and length bucketing are shared with CrossEncoderReranker.
+"""
+
+from typing import List, Dict, Optional
+from pathlib import Path
+import numpy as np
+import torch
+
+from .reranker import CrossEncoderReranker
+
+
+class _LogitsExportWrapper(torch.nn.Module):
+    """Expose positional inputs and a logits-only output for ONNX export"""
+
+    def __init__(self, model: torch.nn.Module, input_names: List[str]):
+        super().__init__()
+        self.model = model
+        self.input_names = input_names
+
+    def forward(self, *inputs):
+        return self.model(**dict(zip(self.input_names, inputs))).logits
+
+
+class OnnxCrossEncoderReranker(CrossEncoderReranker):
+    """Cross-encoder reranker running an int8 ONNX model on CPU"""
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        max_length: int = 512,
+        max_query_length: Optional[int] = None,
+        batch_size: int = 32,
+        onnx_dir: str = "./models/onnx",
+        quantize: bool = True
+    ):
+        """
+        Initialize the ONNX reranker, exporting the model on first use.
+
+        Args:
+            model_name: Cross-encoder model name
+            max_length: Maximum tokens per (query, chunk) pair, special tokens included
+            max_query_length: Cut queries to this many tokens before pairing (None
+                truncates like CrossEncoder.predict)
+            batch_size: Number of pairs per forward pass
+            onnx_dir: Directory for exported ONNX models
+            quantize: Whether to apply dynamic int8 quantization
+        """
+        try:
+            import onnxruntime as ort
+        except ImportError as e:
+            raise ImportError(
+                "onnxruntime is required for the ONNX reranker backend. "
+                "Install it with: pip install onnx onnxruntime"
+            ) from e
+
+        super().__init__(
+            model_name,
+            max_length=max_length,
+            max_query_length=max_query_length,
+            batch_size=batch_size,
+            device="cpu"
+        )
+
+        self.onnx_path = self._export(Path(onnx_dir), quantize)
+
+        session_options = ort.SessionOptions()
+        session_options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        self.session = ort.InferenceSession(
+            str(self.onnx_path),
+            sess_options=session_options,
+            providers=["CPUExecutionProvider"]
+        )
+        self._session_inputs = {node.name for node in self.session.get_inputs()}
+
+        print(f"ONNX reranker loaded from: {self.onnx_path}")
+
+    def _export(self, onnx_dir: Path, quantize: bool) -> Path:
+        """
+        Export the torch model to ONNX (and quantize it) unless already exported.
+
+        Args:
+            onnx_dir: Base directory for exported models
+            quantize: Whether to produce a dynamic int8 model
+
+        Returns:
+            Path of the model to load
+        """
+        model_dir = onnx_dir / self.model_name.replace('/', '__')
+        fp32_path = model_dir / "model.onnx"
+        int8_path = model_dir / "model-int8.onnx"
+        target_path = int8_path if quantize else fp32_path
+
+        if target_path.exists():
+            return target_path
+
+        model_dir.mkdir(parents=True, exist_ok=True)
+
+        if not fp32_path.exists():
+            print(f"Exporting {self.model_name} to ONNX: {fp32_path}")
+            query_ids = self.tokenizer("example query", add_special_tokens=False)['input_ids']
+            doc_ids = self.tokenizer("example passage text", add_special_tokens=False)['input_ids']
+            dummy = self._collate([self._build_pair(query_ids, doc_ids)])
+            input_names = list(dummy)
+
+            dynamic_axes = {name: {0: 'batch', 1: 'sequence'} for name in input_names}
+            dynamic_axes['logits'] = {0: 'batch'}
+
+            torch.onnx.export(
+                _LogitsExportWrapper(self.model, input_names),
+                tuple(dummy[name] for name in input_names),
+                str(fp32_path),
+                input_names=input_names,
+                output_names=['logits'],
+                dynamic_axes=dynamic_axes,
+                opset_version=14
+            )
+
+        if quantize:
+            from onnxruntime.quantization import quantize_dynamic, QuantType
+
+            print(f"Quantizing ONNX model to int8: {int8_path}")
+            quantize_dynamic(str(fp32_path), str(int8_path), weight_type=QuantType.QInt8)
+
+        return target_path
+
+    def _logits(self, batch: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """Run one padded batch through onnxruntime and return raw logits"""
+        feeds = {
+            name: tensor.numpy().astype(np.int64)
+            for name, tensor in batch.items()
+            if name in self._session_inputs
+        }
+        logits = self.session.run(['logits'], feeds)[0]
+        return torch.from_numpy(logits)
@@ -0,0 +1,112 @@
+"""
+Request-scoped retrieval options.
+A RetrievalOptions instance is passed with each retrieve() call instead of
+mutating flags on the shared RAGRetriever, so concurrent requests with
+different settings cannot interfere with each other.
+"""
+
+from typing import Dict, Any, Optional, Mapping, Tuple
+from dataclasses import dataclass, fields, replace
+from types import MappingProxyType
+import hashlib
+import json
+
+
+@dataclass(frozen=True)
+class RetrievalOptions:
+    """Immutable per-request retrieval settings"""
+
+    use_reranking: bool = True
+    use_hybrid_search: bool = True
+    hybrid_alpha: float = 0.5
+    initial_top_k: int = 25
+    final_top_n: int = 5
+    similarity_threshold: float = 0.3
+    filter_metadata: Optional[Mapping[str, Any]] = None
+    rerank_mode: Optional[str] = None
+    neighbor_window: int = 0
+    adaptive_top_n: bool = False
+    min_top_n: int = 1
+    use_query_router: bool = False
+    mmr_lambda: Optional[float] = None
+    use_entity_index: bool = False
+    index_granularity: str = "chunk"
+    sentence_window: int = 2
+    use_document_routing: bool = False
+    document_top_k: int = 3
+    result_fields: Optional[Tuple[str, ...]] = None
+
+    def __post_init__(self):
+        # Freeze the filter so callers cannot change it after the fact
+        if self.filter_metadata is not None:
+            object.__setattr__(
+                self, 'filter_metadata', MappingProxyType(dict(self.filter_metadata))
+            )
+        if self.result_fields is not None:
+            object.__setattr__(self, 'result_fields', tuple(self.result_fields))
+
+    def replace(self, **changes) -> "RetrievalOptions":
+        """Return a copy with the given fields changed"""
+        return replace(self, **changes)
+
+    def metadata_filter(self) -> Optional[Dict[str, Any]]:
+        """Get the metadata filter as a plain dict for the vector store"""
+        if self.filter_metadata is None:
+            return None
+        return dict(self.filter_metadata)
+
+    def as_dict(self) -> Dict[str, Any]:
+        """Get the options as a plain dict"""
+        values = {f.name: getattr(self, f.name) for f in fields(self)}
+        values['filter_metadata'] = self.metadata_filter()
+        return values
+
+    def settings_hash(self, **extra) -> str:
+        """
+        Hash the options together with retriever-level settings.
+
+        Args:
+            **extra: Settings outside the options that also affect results
+
+        Returns:
+            Stable hex digest
+        """
+        values = self.as_dict()
+        # The projection only changes which fields are returned, not the ranking
+        values.pop('result_fields')
+        payload = json.dumps({**values, **extra}, sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode('utf-8')).hexdigest()
+
+    @classmethod
+    def from_config(cls, retrieval_config: Dict[str, Any], **overrides) -> "RetrievalOptions":
+        """
+        Build options from the retrieval section of config.yaml.
+
+        Args:
+            retrieval_config: The 'retrieval' config section
+            **overrides: Fields to override
+
+        Returns:
+            RetrievalOptions instance
+        """
+        options = cls(
+            use_reranking=retrieval_config.get('use_reranking', True),
+            use_hybrid_search=retrieval_config.get('use_hybrid_search', True),
+            hybrid_alpha=retrieval_config.get('hybrid_alpha', 0.5),
+            initial_top_k=retrieval_config.get('initial_top_k', 25),
+            final_top_n=retrieval_config.get('final_top_n', 5),
+            similarity_threshold=retrieval_config.get('similarity_threshold', 0.3),
+            rerank_mode=retrieval_config.get('rerank_mode'),
+            neighbor_window=retrieval_config.get('neighbor_window', 0),
+            adaptive_top_n=retrieval_config.get('adaptive_top_n', False),
+            min_top_n=retrieval_config.get('min_top_n', 1),
+            use_query_router=retrieval_config.get('use_query_router', False),
+            mmr_lambda=retrieval_config.get('mmr_lambda'),
+            use_entity_index=retrieval_config.get('use_entity_index', False),
+            index_granularity=retrieval_config.get('index_granularity', 'chunk'),
+            sentence_window=retrieval_config.get('sentence_window', 2),
+            use_document_routing=retrieval_config.get('use_document_routing', False),
+            document_top_k=retrieval_config.get('document_top_k', 3),
+            result_fields=retrieval_config.get('result_fields')
+        )
+        return options.replace(**overrides)
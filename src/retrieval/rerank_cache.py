@@ -0,0 +1,112 @@
+"""
+LRU cache for cross-encoder rerank scores.
+Scores are keyed by (normalized query hash, chunk ID, reranker model) so that
+repeated questions over popular chunks skip the cross-encoder.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+import hashlib
+import threading
+
+
+CacheKey = Tuple[str, str, str]
+
+
+class RerankScoreCache:
+    """Bounded, thread-safe LRU cache of cross-encoder scores"""
+
+    def __init__(self, max_size: int = 4096):
+        """
+        Initialize the rerank score cache.
+
+        Args:
+            max_size: Maximum number of (query, chunk, model) scores to keep
+        """
+        self.max_size = max_size
+        self._scores: "OrderedDict[CacheKey, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Statistics for sizing the cache
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """Normalize query text so trivial variations share cache entries"""
+        return ' '.join(query.lower().split())
+
+    @classmethod
+    def hash_query(cls, query: str) -> str:
+        """Hash the normalized query text"""
+        normalized = cls.normalize_query(query)
+        return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def make_key(query_hash: str, chunk_id: str, model_name: str) -> CacheKey:
+        """Build a cache key for one (query, chunk) pair"""
+        return (query_hash, str(chunk_id), model_name)
+
+    def get_many(self, keys: List[CacheKey]) -> List[Optional[float]]:
+        """
+        Look up scores for several keys at once.
+
+        Args:
+            keys: Cache keys to look up
+
+        Returns:
+            List of cached scores, with None for misses
+        """
+        results = []
+        with self._lock:
+            for key in keys:
+                score = self._scores.get(key)
+                if score is None:
+                    self.misses += 1
+                else:
+                    self._scores.move_to_end(key)
+                    self.hits += 1
+                results.append(score)
+        return results
+
+    def put_many(self, keys: List[CacheKey], scores: List[float]) -> None:
+        """
+        Store scores for several keys, evicting least recently used entries.
+
+        Args:
+            keys: Cache keys
+            scores: Scores aligned with keys
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            for key, score in zip(keys, scores):
+                self._scores[key] = float(score)
+                self._scores.move_to_end(key)
+
+            while len(self._scores) > self.max_size:
+                self._scores.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Remove all cached scores and reset statistics"""
+        with self._lock:
+            self._scores.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics for sizing the cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._scores),
+                'max_size': self.max_size,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
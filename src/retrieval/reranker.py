@@ -0,0 +1,231 @@
+"""
+Cross-encoder reranker with cached document tokenization.
+Chunk texts are tokenized once and cached by chunk ID (least recently used
+chunks are evicted past a size bound); at query time only the query is
+tokenized, pairs are truncated to max_length the way CrossEncoder.predict
+truncates them (longest first) and scored in length-sorted batches so padding stays close to each batch's own length.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+from collections import OrderedDict
+from sentence_transformers import CrossEncoder
+import numpy as np
+import threading
+import torch
+
+
+class CrossEncoderReranker:
+    """Cross-encoder scorer with length-bucketed batching"""
+
+    def __init__(
+        self,
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        max_length: int = 512,
+        max_query_length: Optional[int] = None,
+        batch_size: int = 32,
+        device: str = None,
+        max_cached_documents: int = 50000
+    ):
+        """
+        Initialize the reranker.
+
+        Args:
+            model_name: Cross-encoder model name
+            max_length: Maximum tokens per (query, chunk) pair, special tokens included
+            max_query_length: Cut queries to this many tokens before pairing
+                (None leaves truncation to the longest-first rule of predict)
+            batch_size: Number of pairs per forward pass
+            device: Device to use ('cuda', 'cpu', or None for auto-detect)
+            max_cached_documents: Maximum chunks whose token IDs are cached
+        """
+        self.model_name = model_name
+        self.max_length = max_length
+        self.max_query_length = max_query_length
+        self.batch_size = batch_size
+        self.max_cached_documents = max_cached_documents
+
+        self.cross_encoder = CrossEncoder(model_name, max_length=max_length, device=device)
+        self.tokenizer = self.cross_encoder.tokenizer
+        self.model = self.cross_encoder.model
+        self.model.eval()
+        self.device = self.model.device
+
+        self._num_special_tokens = self.tokenizer.num_special_tokens_to_add(pair=True)
+        self._activation = self._resolve_activation(self.cross_encoder)
+
+        # Document-side token IDs keyed by chunk ID, in LRU order
+        self._doc_tokens: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._doc_tokens_lock = threading.Lock()
+
+        # Fast tokenizers reject concurrent calls with different truncation
+        # settings ("Already borrowed"), so tokenization is serialized
+        self._tokenizer_lock = threading.Lock()
+
+    @staticmethod
+    def _resolve_activation(cross_encoder: CrossEncoder):
+        """Find the activation CrossEncoder.predict applies to logits"""
+        for attr in ('activation_fn', 'activation_fct', 'default_activation_function'):
+            activation = getattr(cross_encoder, attr, None)
+            if activation is not None:
+                return activation
+        return torch.nn.Identity()
+
+    def predict(self, pairs: List[Tuple[str, str]]) -> np.ndarray:
+        """Score raw (query, text) pairs with the underlying CrossEncoder"""
+        return self.cross_encoder.predict(pairs)
+
+    def pretokenize(self, chunk_ids: List[str], texts: List[str]) -> Dict[str, List[int]]:
+        """
+        Tokenize chunk texts and cache their token IDs.
+
+        Args:
+            chunk_ids: Stable chunk IDs
+            texts: Chunk texts aligned with chunk_ids
+
+        Returns:
+            Token IDs keyed by chunk ID
+        """
+        if not chunk_ids:
+            return {}
+
+        with self._tokenizer_lock:
+            encoded = self.tokenizer(
+                list(texts),
+                add_special_tokens=False,
+                truncation=True,
+                max_length=self.max_length
+            )['input_ids']
+
+        tokens = {str(chunk_id): token_ids for chunk_id, token_ids in zip(chunk_ids, encoded)}
+        with self._doc_tokens_lock:
+            for chunk_id, token_ids in tokens.items():
+                self._doc_tokens[chunk_id] = token_ids
+                self._doc_tokens.move_to_end(chunk_id)
+            while len(self._doc_tokens) > self.max_cached_documents:
+                self._doc_tokens.popitem(last=False)
+        return tokens
+
+    def _doc_token_ids(self, candidates: List[Dict[str, Any]]) -> List[List[int]]:
+        """Get cached token IDs for candidates, tokenizing unseen chunks once"""
+        found = {}
+        missing = {}
+        with self._doc_tokens_lock:
+            for candidate in candidates:
+                chunk_id = str(candidate['id'])
+                if chunk_id in self._doc_tokens:
+                    self._doc_tokens.move_to_end(chunk_id)
+                    found[chunk_id] = self._doc_tokens[chunk_id]
+                else:
+                    missing[chunk_id] = candidate['text']
+
+        # Kept locally: a small cache may already have evicted some of them
+        if missing:
+            found.update(self.pretokenize(list(missing), list(missing.values())))
+
+        return [found[str(candidate['id'])] for candidate in candidates]
+
+    def _truncated_lengths(self, query_length: int, doc_length: int) -> Tuple[int, int]:
+        """
+        Query and document lengths after longest-first truncation, as the fast
+        tokenizer truncates pairs in CrossEncoder.predict: only the longer side
+        is cut while the shorter one fits in half the budget, otherwise both
+        keep half of it.
+        """
+        budget = max(self.max_length - self._num_special_tokens, 0)
+        if query_length + doc_length <= budget:
+            return query_length, doc_length
+
+        shorter, longer = sorted((query_length, doc_length))
+        longer = shorter if shorter > budget else max(shorter, budget - shorter)
+        if shorter + longer > budget:
+            shorter = budget // 2
+            longer = shorter + budget % 2
+
+        if query_length > doc_length:
+            return longer, shorter
+        return shorter, longer
+
+    def _build_pair(self, query_ids: List[int], doc_ids: List[int]) -> Tuple[List[int], List[int]]:
+        """Concatenate query and document tokens with special tokens, truncating like predict"""
+        query_length, doc_length = self._truncated_lengths(len(query_ids), len(doc_ids))
+        query_ids, doc_ids = query_ids[:query_length], doc_ids[:doc_length]
+
+        input_ids = self.tokenizer.build_inputs_with_special_tokens(query_ids, doc_ids)
+        token_type_ids = self.tokenizer.create_token_type_ids_from_sequences(query_ids, doc_ids)
+        return input_ids, token_type_ids
+
+    def _collate(self, pairs: List[Tuple[List[int], List[int]]]) -> Dict[str, torch.Tensor]:
+        """Pad a bucket of pairs to its own longest length"""
+        batch_length = max(len(input_ids) for input_ids, _ in pairs)
+        pad_id = self.tokenizer.pad_token_id or 0
+
+        input_ids = torch.full((len(pairs), batch_length), pad_id, dtype=torch.long)
+        token_type_ids = torch.zeros((len(pairs), batch_length), dtype=torch.long)
+        attention_mask = torch.zeros((len(pairs), batch_length), dtype=torch.long)
+
+        for row, (ids, types) in enumerate(pairs):
+            input_ids[row, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            token_type_ids[row, :len(types)] = torch.tensor(types, dtype=torch.long)
+            attention_mask[row, :len(ids)] = 1
+
+        batch = {'input_ids': input_ids, 'attention_mask': attention_mask}
+        if 'token_type_ids' in self.tokenizer.model_input_names:
+            batch['token_type_ids'] = token_type_ids
+        return batch
+
+    def _logits(self, batch: Dict[str, torch.Tensor]) -> torch.Tensor:
+        """Run one padded batch through the model and return raw logits"""
+        batch = {name: tensor.to(self.device) for name, tensor in batch.items()}
+        with torch.inference_mode():
+            return self.model(**batch).logits
+
+    def _forward(self, batch: Dict[str, torch.Tensor]) -> np.ndarray:
+        """Score one padded batch, applying the CrossEncoder activation"""
+        logits = self._logits(batch)
+        with torch.inference_mode():
+            scores = self._activation(logits)
+        if scores.shape[-1] == 1:
+            scores = scores.squeeze(-1)
+        return scores.float().cpu().numpy()
+
+    def score(self, query: str, candidates: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Score candidates against a query.
+
+        Args:
+            query: Query text
+            candidates: Candidates with 'id' and 'text'
+
+        Returns:
+            Array of scores aligned with candidates
+        """
+        if not candidates:
+            return np.array([])
+
+        with self._tokenizer_lock:
+            query_ids = self.tokenizer(query, add_special_tokens=False)['input_ids']
+        if self.max_query_length is not None:
+            query_ids = query_ids[:self.max_query_length]
+
+        pairs = [
+            self._build_pair(query_ids, doc_ids)
+            for doc_ids in self._doc_token_ids(candidates)
+        ]
+
+        # Length buckets: sort by pair length and batch neighbours together
+        order = np.argsort([len(input_ids) for input_ids, _ in pairs], kind='stable')
+        scores = np.empty(len(pairs), dtype=np.float32)
+
+        for start in range(0, len(order), self.batch_size):
+            bucket = order[start:start + self.batch_size]
+            scores[bucket] = self._forward(self._collate([pairs[i] for i in bucket]))
+
+        return scores
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get tokenization cache statistics"""
+        with self._doc_tokens_lock:
+            return {
+                'cached_documents': len(self._doc_tokens),
+                'max_cached_documents': self.max_cached_documents
+            }
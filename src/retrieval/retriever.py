@@ -5,9 +5,26 @@ Supports hybrid search combining dense and sparse retrieval.
 """
 
 from typing import List, Dict, Any, Optional, Tuple
-from sentence_transformers import CrossEncoder
+from pathlib import Path
 import numpy as np
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from .bm25_index import BM25Index
+from .candidate import Candidate, candidates_to_dicts
+from .rerank_cache import RerankScoreCache
+from .reranker import CrossEncoderReranker
+from .learned_ranker import LearnedRanker
+from .options import RetrievalOptions
+from .semantic_cache import SemanticQueryCache
+from .trace import RetrievalTrace, NULL_TRACE
+from .context_packer import ContextPacker
+from .session_state import SessionRetrievalState
+from .entity_index import EntityIndex
+from .sentence_window import merge_sentence_windows, sentence_id, window_id
+from .document_index import DocumentSummaryIndex
+from ..query.query_condenser import QueryCondenser
+from ..query.query_router import QueryRouter
 
 
 class RAGRetriever:
@@ -20,7 +37,36 @@ class RAGRetriever:
         reranker_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
         use_reranking: bool = True,
         use_hybrid_search: bool = True,
-        bm25_index_path: str = "./bm25_index"
+        bm25_index_path: str = "./bm25_index",
+        rerank_cache_size: int = 4096,
+        rerank_mode: str = "full",
+        cascade_mass: float = 0.9,
+        cascade_temperature: float = 0.1,
+        cascade_latency_budget_ms: float = 150.0,
+        rerank_skip_threshold: Optional[float] = None,
+        reranker_max_length: int = 512,
+        reranker_batch_size: int = 32,
+        reranker_backend: str = "torch",
+        reranker_onnx_dir: str = "./models/onnx",
+        learned_ranker_path: str = "./models/learned_ranker.json",
+        semantic_cache_size: int = 0,
+        semantic_cache_threshold: float = 0.95,
+        index_manifest_path: Optional[str] = None,
+        condensed_query_max_tokens: int = 48,
+        context_token_budget: Optional[int] = None,
+        context_tokenizer: Optional[str] = None,
+        adaptive_gap_ratio: float = 0.5,
+        adaptive_min_score: Optional[float] = None,
+        router_centroids_path: Optional[str] = None,
+        router_min_confidence: float = 0.6,
+        router_max_types: int = 2,
+        router_min_keyword_votes: int = 2,
+        mmr_pool_factor: int = 3,
+        entity_index_path: Optional[str] = None,
+        entity_max_restrict: int = 40,
+        entity_max_df: float = 0.2,
+        sentence_store=None,
+        document_index_path: Optional[str] = None
     ):
         """
         Initialize the RAG retriever.
@@ -29,104 +75,1163 @@ class RAGRetriever:
             vector_store: ChromaDB client instance
             embedding_service: Embedding service instance
             reranker_model: Cross-encoder model for reranking
-            use_reranking: Whether to use reranking
-            use_hybrid_search: Whether to use hybrid search
+            use_reranking: Whether to load the reranker and rerank by default
+            use_hybrid_search: Whether to load the BM25 index and use hybrid search by default
             bm25_index_path: Path to BM25 index
+            rerank_cache_size: Max cached rerank scores (0 disables the cache)
+            rerank_mode: "full" reranks every candidate, "cascade" reranks an
+                adaptive subset picked by a cheap first stage, "learned" scores
+                candidates with the distilled LearnedRanker instead of the cross-encoder
+            cascade_mass: Share of first-stage score mass the cascade must cover
+            cascade_temperature: Softmax temperature over first-stage scores
+            cascade_latency_budget_ms: Upper bound on cascade rerank time
+            rerank_skip_threshold: First-stage confidence at or above which
+                reranking is skipped (None never skips)
+            reranker_max_length: Maximum tokens per (query, chunk) reranker pair
+            reranker_batch_size: Pairs per reranker forward pass
+            reranker_backend: "torch" or "onnx" (int8-quantized, CPU)
+            reranker_onnx_dir: Directory for exported ONNX reranker models
+            learned_ranker_path: Path of the trained LearnedRanker model; if it is
+                missing or was trained on other features, "learned" falls back to "full"
+            semantic_cache_size: Max cached query results served to near-duplicate
+                queries (0 disables the semantic cache)
+            semantic_cache_threshold: Cosine similarity at which a cached query counts
+                as the same question
+            index_manifest_path: Index manifest written at ingestion; the semantic
+                cache is invalidated whenever it changes
+            condensed_query_max_tokens: Token cap of the standalone query built
+                for follow-up questions in retrieve_with_context()
+            context_token_budget: Maximum tokens of the context built by
+                format_context() (None packs without a limit)
+            context_tokenizer: Hugging Face tokenizer of the LLM used to count
+                context tokens (None estimates from text length)
+            adaptive_gap_ratio: Share of the top-n score range the largest gap
+                must span for the adaptive cut-off to stop there
+            adaptive_min_score: Calibrated rerank score below which the adaptive
+                cut-off drops results (None uses the gap only)
+            router_centroids_path: Per-document-type embedding centroids written
+                at ingestion for the query router (keyword rules only if missing)
+            router_min_confidence: Router confidence needed to narrow the search
+                to the predicted document types
+            router_max_types: Maximum document types a query is routed to
+            router_min_keyword_votes: Keyword hits needed to route without
+                centroid agreement
+            mmr_pool_factor: MMR diversifies among the top final_top_n * factor candidates
+            entity_index_path: Entity/location inverted index written at ingestion
+                (use_entity_index option; disabled if missing)
+            entity_max_restrict: Largest set of entity-matched chunks searched
+                instead of the whole corpus; larger sets only boost the matches
+            entity_max_df: Share of chunks above which a mentioned term is too
+                common to use
+            sentence_store: ChromaDB client of the sentence-level collection used
+                when options.index_granularity is "sentence" (None disables it)
+            document_index_path: Document and section centroids written at
+                ingestion for two-level search (use_document_routing option)
         """
         self.vector_store = vector_store
+        self.sentence_store = sentence_store
         self.embedding_service = embedding_service
-        self.use_reranking = use_reranking
-        self.use_hybrid_search = use_hybrid_search
+        self.reranker_model = reranker_model
         
-        if use_reranking:
-            print(f"Loading reranker model: {reranker_model}")
-            self.reranker = CrossEncoder(reranker_model)
+        # Distilled first-stage ranker for rerank_mode="learned"; without a
+        # usable model the cross-encoder reranks instead
+        self.learned_ranker = self._load_learned_ranker(learned_ranker_path)
+        if rerank_mode == "learned" and self.learned_ranker is None:
+            print("No usable learned ranker, reranking with the cross-encoder")
+            rerank_mode = "full"
+        self.rerank_mode = rerank_mode
+        
+        # Defaults for calls that pass no options; per-request settings never
+        # mutate the retriever, so it can be shared across threads
+        self.default_options = RetrievalOptions(
+            use_reranking=use_reranking,
+            use_hybrid_search=use_hybrid_search,
+            rerank_mode=rerank_mode
+        )
+        self.cascade_mass = cascade_mass
+        self.cascade_temperature = cascade_temperature
+        self.cascade_latency_budget_ms = cascade_latency_budget_ms
+        self.rerank_skip_threshold = rerank_skip_threshold
+        self.adaptive_gap_ratio = adaptive_gap_ratio
+        self.adaptive_min_score = adaptive_min_score
+        self.mmr_pool_factor = mmr_pool_factor
+        
+        # Running estimate of cross-encoder cost, used by the cascade budget
+        self._rerank_ms_per_pair: Optional[float] = None
+        self._rerank_cost_lock = threading.Lock()
+        
+        # The learned tier drops the cross-encoder entirely
+        if use_reranking and rerank_mode != "learned":
+            print(f"Loading reranker model: {reranker_model} ({reranker_backend} backend)")
+            self.reranker = self._load_reranker(
+                reranker_model,
+                reranker_backend,
+                reranker_max_length,
+                reranker_batch_size,
+                reranker_onnx_dir
+            )
         else:
             self.reranker = None
         
+        # Cache of cross-encoder scores keyed by (query, chunk ID, model)
+        if rerank_cache_size > 0:
+            self.rerank_cache = RerankScoreCache(max_size=rerank_cache_size)
+        else:
+            self.rerank_cache = None
+        
+        # Final rankings reused for near-duplicate queries
+        if semantic_cache_size > 0:
+            self.semantic_cache = SemanticQueryCache(
+                max_size=semantic_cache_size,
+                similarity_threshold=semantic_cache_threshold,
+                manifest_path=index_manifest_path
+            )
+        else:
+            self.semantic_cache = None
+        
+        # Standalone queries for follow-ups in retrieve_with_context()
+        self.query_condenser = QueryCondenser(max_query_tokens=condensed_query_max_tokens)
+        
+        # Predicts document_type partitions to search (use_query_router option)
+        self.query_router = QueryRouter(
+            centroids_path=router_centroids_path,
+            min_confidence=router_min_confidence,
+            max_types=router_max_types,
+            min_keyword_votes=router_min_keyword_votes
+        )
+        
+        # Chunks mentioning each entity, location and production term (use_entity_index option)
+        if entity_index_path and Path(entity_index_path).exists():
+            self.entity_index = EntityIndex(
+                persist_path=entity_index_path,
+                max_restrict=entity_max_restrict,
+                max_df=entity_max_df
+            )
+        else:
+            self.entity_index = None
+        
+        # Document/section centroids for two-level search (use_document_routing option)
+        self.document_index = DocumentSummaryIndex(path=document_index_path)
+        
+        # Merges, deduplicates and budgets chunks in format_context()
+        self.context_packer = ContextPacker(
+            token_budget=context_token_budget,
+            tokenizer_name=context_tokenizer
+        )
+        
         # Initialize BM25 index for hybrid search
         if use_hybrid_search:
             self.bm25_index = BM25Index(persist_path=bm25_index_path)
         else:
             self.bm25_index = None
+        
+        # Dense and sparse branches are independent; BM25 runs on this pool
+        # while the calling thread embeds and queries Chroma
+        self._branch_executor = ThreadPoolExecutor(
+            max_workers=2, thread_name_prefix="hybrid-branch"
+        )
+        self._branch_timings: Dict[str, Dict[str, float]] = {}
+        self._branch_timing_lock = threading.Lock()
+    
+    @staticmethod
+    def _load_learned_ranker(path: Optional[str]) -> Optional[LearnedRanker]:
+        """Load the learned ranker, or None if it is missing or was trained on other features"""
+        if not path or not Path(path).exists():
+            return None
+        try:
+            learned_ranker = LearnedRanker.load(path)
+        except (OSError, KeyError, ValueError) as e:
+            print(f"Learned ranker unavailable: {type(e).__name__}: {e}")
+            return None
+        print(f"Loaded learned ranker: {path}")
+        return learned_ranker
+    
+    @staticmethod
+    def _load_reranker(
+        model_name: str,
+        backend: str,
+        max_length: int,
+        batch_size: int,
+        onnx_dir: str
+    ) -> CrossEncoderReranker:
+        """Load the reranker backend, falling back to torch if ONNX fails to load"""
+        if backend == "onnx":
+            try:
+                from .onnx_reranker import OnnxCrossEncoderReranker
+                return OnnxCrossEncoderReranker(
+                    model_name,
+                    max_length=max_length,
+                    batch_size=batch_size,
+                    onnx_dir=onnx_dir
+                )
+            except Exception as e:
+                # Missing onnxruntime, a failed export or a corrupt model file
+                print(f"ONNX reranker unavailable, using torch backend: {type(e).__name__}: {e}")
+        
+        return CrossEncoderReranker(model_name, max_length=max_length, batch_size=batch_size)
     
     def retrieve(
         self,
         query: str,
-        initial_top_k: int = 25,
-        final_top_n: int = 5,
-        similarity_threshold: float = 0.3,
-        filter_metadata: Dict[str, Any] = None,
-        hybrid_alpha: float = 0.5
+        options: Optional[RetrievalOptions] = None,
+        query_variants: Optional[List[str]] = None,
+        trace: Optional[RetrievalTrace] = None,
+        session: Optional[SessionRetrievalState] = None,
+        **overrides
     ) -> List[Dict[str, Any]]:
         """
         Retrieve relevant chunks using hybrid search and two-stage retrieval.
         
+        Args:
+            query: Query text, used for reranking
+            options: Request-scoped retrieval options (defaults to default_options)
+            query_variants: Rewrites of the query searched in parallel and fused
+                with RRF (e.g. QueryEnhancer.get_query_variants); defaults to [query]
+            trace: Optional RetrievalTrace that receives per-stage timings,
+                candidate counts and cache hits for this call
+            session: Optional conversation state; a query close to the session
+                topic reranks the previous turn's candidates plus a small fresh
+                retrieval instead of running a full search
+            **overrides: RetrievalOptions fields to override for this call, e.g.
+                initial_top_k, final_top_n, similarity_threshold, hybrid_alpha
+            
+        Returns:
+            List of retrieved chunks with scores and metadata (plain dicts of
+            just options.result_fields when a projection is set)
+        """
+        trace = trace if trace is not None else NULL_TRACE
+        options = options or self.default_options
+        if overrides:
+            options = options.replace(**overrides)
+        rerank_mode = options.rerank_mode or self.rerank_mode
+        if rerank_mode == "learned" and self.learned_ranker is None and self.reranker is not None:
+            rerank_mode = "full"
+        variants = list(query_variants) if query_variants else [query]
+        trace.note(query_variants=len(variants), rerank_mode=rerank_mode)
+        
+        # Sentence windows have no stored chunk IDs to cache or expand
+        sentence_mode = options.index_granularity == "sentence" and self.sentence_store is not None
+        use_semantic_cache = self.semantic_cache is not None and not sentence_mode
+        
+        # All variants are embedded in one forward pass
+        query_embeddings = None
+        if self.semantic_cache is not None or len(variants) > 1 or session is not None:
+            with trace.stage('query_embedding', queries=len(variants)):
+                query_embeddings = self._embed_queries(variants)
+        
+        # Near-duplicate of a recent query under the same settings: reuse its ranking
+        if use_semantic_cache:
+            with trace.stage('semantic_cache') as stage:
+                settings_hash = self._settings_hash(options, rerank_mode, len(variants) > 1)
+                cached = self.semantic_cache.get(query_embeddings[0], settings_hash)
+                cached_results = None
+                if cached is not None:
+                    cached_results = self._hydrate_cached_results(cached)
+                stage['hit'] = cached_results is not None
+            trace.cache_event(
+                'semantic_cache', hits=int(stage['hit']), misses=int(not stage['hit'])
+            )
+            if cached_results is not None:
+                trace.count('final', len(cached_results))
+                # The cached ranking answers this turn: carry it over as a
+                # fresh search so the next turn's topic check sees this query
+                if session is not None:
+                    session.update(query_embeddings[0], cached_results, False)
+                cached_results = self._expand_neighbors(
+                    cached_results, options.neighbor_window, trace
+                )
+                trace.finish()
+                return self._project(cached_results, options)
+        
+        filter_metadata = options.metadata_filter() or {}
+        
+        # Entities named in the query: search only the chunks mentioning them,
+        # or boost those chunks when too many do
+        entity_match = None
+        chunk_ids = None
+        if (
+            options.use_entity_index
+            and self.entity_index is not None
+            and not filter_metadata
+            and not sentence_mode
+        ):
+            with trace.stage('entity_lookup') as stage:
+                entity_match = self.entity_index.lookup(variants[0])
+                stage['mode'] = entity_match['mode'] if entity_match else None
+            if entity_match is not None:
+                trace.note(entity_match={
+                    'mentions': entity_match['mentions'],
+                    'mode': entity_match['mode'],
+                    'chunks': len(entity_match['matches'])
+                })
+                if entity_match['mode'] == 'restrict':
+                    chunk_ids = list(entity_match['matches'])
+        
+        # Narrow the search to the document types the router predicts
+        # (not needed when the entity index already picked the chunks)
+        document_types = None
+        if (
+            options.use_query_router
+            and 'document_type' not in filter_metadata
+            and chunk_ids is None
+        ):
+            if query_embeddings is None:
+                with trace.stage('query_embedding', queries=len(variants)):
+                    query_embeddings = self._embed_queries(variants)
+            with trace.stage('query_router') as stage:
+                route = self.query_router.route(variants[0], query_embeddings[0])
+                stage['document_types'] = route['document_types']
+            trace.note(route=route)
+            document_types = route['document_types'] or None
+        
+        # Two-level search: score the document and section summaries, then
+        # search only the chunks of the best documents
+        source_files = None
+        if (
+            options.use_document_routing
+            and len(self.document_index)
+            and 'source_file' not in filter_metadata
+            and chunk_ids is None
+        ):
+            if query_embeddings is None:
+                with trace.stage('query_embedding', queries=len(variants)):
+                    query_embeddings = self._embed_queries(variants)
+            with trace.stage('document_selection') as stage:
+                selection = self.document_index.select(query_embeddings[0], options.document_top_k)
+                stage['documents'] = selection['documents']
+            trace.note(document_selection=selection)
+            source_files = selection['documents'] or None
+        
+        # Fetch only the vector store fields this request needs
+        vector_fields = self._vector_fields(options, session is not None)
+        
+        # Follow-up on the same topic: previous pool plus a small fresh retrieval
+        reused_session = False
+        # (not under user filters, which the previous turn's pool may not satisfy)
+        if session is not None and not filter_metadata:
+            on_topic, topic_similarity = session.check_topic(query_embeddings[0])
+            trace.note(session={'reused': on_topic, 'topic_similarity': topic_similarity})
+            if on_topic:
+                reused_session = True
+                fresh = self._first_stage(
+                    query, options.replace(initial_top_k=session.fresh_top_k),
+                    variants, query_embeddings, document_types, trace, chunk_ids, source_files,
+                    vector_fields
+                )
+                fresh_ids = {c['id'] for c in fresh}
+                candidates = fresh + [c for c in session.pool() if c['id'] not in fresh_ids]
+                trace.count('session_pool', len(candidates))
+        
+        if not reused_session:
+            candidates = self._first_stage(
+                query, options, variants, query_embeddings, document_types, trace, chunk_ids,
+                source_files, vector_fields
+            )
+            
+            # Too few hits inside the predicted partitions, documents or entity
+            # chunks: search the whole corpus
+            narrowed = document_types or source_files or chunk_ids is not None
+            if narrowed and len(candidates) < options.final_top_n:
+                if chunk_ids is not None:
+                    # Keep the entity chunks at the front of the global results
+                    trace.note(entity_fallback=True)
+                    entity_match = {**entity_match, 'mode': 'boost'}
+                if document_types:
+                    trace.note(route_fallback=True)
+                if source_files:
+                    trace.note(document_fallback=True)
+                candidates = self._first_stage(
+                    query, options, variants, query_embeddings, None, trace,
+                    vector_fields=vector_fields
+                )
+        
+        if entity_match is not None and entity_match['mode'] == 'boost':
+            candidates = self._entity_boost(candidates, entity_match['matches'])
+        
+        if not candidates:
+            trace.count('final', 0)
+            trace.finish()
+            return []
+        
+        # Stage 2: Reranking (if enabled and the first stage is not decisive)
+        decision = self._rerank_decision(candidates, rerank_mode, options.use_reranking)
+        if reused_session and decision['reason'] == 'confident_first_stage':
+            # The carried-over pool has no first-stage ranks for this query
+            decision = {'reranked': True, 'reason': 'session_pool', 'confidence': decision['confidence']}
+        trace.note(rerank_decision=dict(decision))
+        if decision['reranked']:
+            with trace.stage('rerank', mode=rerank_mode, candidates=len(candidates)):
+                if rerank_mode == "learned":
+                    candidates = self._learned_rerank(query, candidates)
+                elif rerank_mode == "cascade":
+                    candidates = self._cascade_rerank(
+                        query, candidates, options.final_top_n, trace
+                    )
+                else:
+                    candidates = self._rerank(query, candidates, trace)
+        
+        # Carry the ranked pool over to the next turn of the conversation
+        if session is not None:
+            session.update(query_embeddings[0], candidates, reused_session)
+        
+        # Return top N results, fewer when the scores show a clear cut-off
+        top_n = options.final_top_n
+        top_n_decision = None
+        if options.adaptive_top_n:
+            top_n, top_n_decision = self._adaptive_top_n(
+                candidates, options.final_top_n, options.min_top_n
+            )
+            trace.note(top_n_decision=dict(top_n_decision))
+        
+        # Diversify the final set (maximal marginal relevance)
+        if options.mmr_lambda is not None:
+            candidates = self._mmr_select(candidates, top_n, options.mmr_lambda, trace)
+        
+        final_results = candidates[:top_n]
+        for result in final_results:
+            result['rerank_decision'] = dict(decision)
+            if top_n_decision is not None:
+                result['top_n_decision'] = dict(top_n_decision)
+        trace.count('final', len(final_results))
+        
+        # Rankings built from a session pool depend on the conversation, not just the query
+        if use_semantic_cache and not reused_session:
+            self.semantic_cache.put(
+                query_embeddings[0],
+                settings_hash,
+                [result['id'] for result in final_results],
+                [self._result_scores(result) for result in final_results]
+            )
+        
+        # Small-to-big: widen the ranked hits to their neighboring chunks
+        final_results = self._expand_neighbors(final_results, options.neighbor_window, trace)
+        
+        trace.finish()
+        return self._project(final_results, options)
+    
+    def _first_stage(
+        self,
+        query: str,
+        options: RetrievalOptions,
+        variants: List[str],
+        query_embeddings: Optional[np.ndarray],
+        document_types: Optional[List[str]] = None,
+        trace: RetrievalTrace = NULL_TRACE,
+        chunk_ids: Optional[List[str]] = None,
+        source_files: Optional[List[str]] = None,
+        vector_fields: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Dense or hybrid candidate retrieval with fusion and the similarity threshold.
+        
         Args:
             query: Query text
-            initial_top_k: Number of candidates for initial retrieval
-            final_top_n: Final number of results after reranking
-            similarity_threshold: Minimum similarity score to include
-            filter_metadata: Optional metadata filters
-            hybrid_alpha: Weight for dense retrieval (0=pure sparse, 1=pure dense)
+            options: Request-scoped retrieval options
+            variants: Query variants to search and fuse
+            query_embeddings: Precomputed embeddings aligned with variants
+            document_types: Restrict both branches to these document types (None searches all)
+            trace: Trace receiving per-stage timings and candidate counts
+            chunk_ids: Score only these chunks in both branches (None searches all)
+            source_files: Restrict both branches to these documents (None searches all)
+            vector_fields: Fields the dense search fetches (None fetches all)
             
         Returns:
-            List of retrieved chunks with scores and metadata
+            First-stage candidates in fused order
         """
-        if self.use_hybrid_search and self.bm25_index is not None:
+        filter_metadata = options.metadata_filter() or {}
+        if document_types:
+            filter_metadata['document_type'] = {'$in': list(document_types)}
+        if source_files:
+            filter_metadata['source_file'] = {'$in': list(source_files)}
+        filter_metadata = filter_metadata or None
+        
+        if options.index_granularity == "sentence" and self.sentence_store is not None:
+            # Sentence-level index, widened to sentence windows
+            candidates = self._sentence_window_retrieve(
+                variants, options, filter_metadata, query_embeddings, trace
+            )
+        elif options.use_hybrid_search and self.bm25_index is not None:
             # Use hybrid search
             candidates = self._hybrid_retrieve(
-                query, initial_top_k, similarity_threshold, filter_metadata, hybrid_alpha
+                query,
+                options.initial_top_k,
+                options.similarity_threshold,
+                filter_metadata,
+                options.hybrid_alpha,
+                query_embeddings,
+                variants,
+                trace,
+                document_types,
+                chunk_ids,
+                source_files,
+                vector_fields
+            )
+        elif len(variants) > 1:
+            # Dense-only retrieval over several variants, fused by rank
+            dense_lists = self._dense_retrieve_many(
+                variants, options.initial_top_k, filter_metadata, query_embeddings, trace,
+                chunk_ids, vector_fields
             )
+            trace.count('dense', sum(len(results) for results in dense_lists))
+            with trace.stage('fusion'):
+                candidates = self._reciprocal_rank_fusion(dense_lists, [], alpha=1.0)
+            trace.count('fused', len(candidates))
+            with trace.stage('threshold_filter'):
+                candidates = [
+                    c for c in candidates if c['similarity'] >= options.similarity_threshold
+                ]
+            trace.count('after_threshold', len(candidates))
         else:
             # Use dense-only retrieval
             candidates = self._dense_retrieve(
-                query, initial_top_k, similarity_threshold, filter_metadata
+                query,
+                options.initial_top_k,
+                options.similarity_threshold,
+                filter_metadata,
+                query_embeddings[0] if query_embeddings is not None else None,
+                trace,
+                chunk_ids,
+                vector_fields
             )
         
-        if not candidates:
+        return candidates
+    
+    def _sentence_window_retrieve(
+        self,
+        variants: List[str],
+        options: RetrievalOptions,
+        filter_metadata: Optional[Dict[str, Any]],
+        query_embeddings: Optional[np.ndarray],
+        trace: RetrievalTrace = NULL_TRACE
+    ) -> List[Dict[str, Any]]:
+        """
+        Dense retrieval over the sentence index, expanded to sentence windows.
+        Each hit is widened by options.sentence_window sentences on both sides;
+        overlapping or adjacent windows of a page are merged at the rank of
+        their best hit. BM25 is not used at sentence granularity.
+        
+        Args:
+            variants: Query variants (the best similarity per sentence is kept)
+            options: Request-scoped retrieval options
+            filter_metadata: Metadata filter for the sentence collection
+            query_embeddings: Precomputed embeddings aligned with variants
+            trace: Trace receiving per-stage timings and candidate counts
+            
+        Returns:
+            Window candidates with the best hit's similarity, 'hit_text' and
+            'sentence_hits'
+        """
+        if query_embeddings is None:
+            with trace.stage('query_embedding', queries=len(variants)):
+                query_embeddings = self._embed_queries(variants)
+        
+        with trace.stage('sentence_search', queries=len(variants), top_k=options.initial_top_k):
+            results = self.sentence_store.query_collection(
+                query_embeddings=query_embeddings.tolist(),
+                top_k=options.initial_top_k,
+                filter_metadata=filter_metadata
+            )
+        
+        # Best similarity of each sentence over the variants
+        hits: Dict[str, Dict[str, Any]] = {}
+        for ids, documents, metadatas, distances in zip(
+            results['ids'], results['documents'], results['metadatas'], results['distances']
+        ):
+            for hit_id, text, metadata, distance in zip(ids, documents, metadatas, distances):
+                if hit_id not in hits or 1 - distance > hits[hit_id].similarity:
+                    hits[hit_id] = Candidate(hit_id, text, metadata, similarity=1 - distance)
+        ranked_hits = sorted(hits.values(), key=lambda h: -h.similarity)
+        ranked_hits = [h for h in ranked_hits if h.similarity >= options.similarity_threshold]
+        trace.count('sentences', len(ranked_hits))
+        if not ranked_hits:
+            return []
+        
+        with trace.stage('sentence_windows', window=options.sentence_window) as stage:
+            windows = merge_sentence_windows(ranked_hits, options.sentence_window)
+            
+            # Fetch the surrounding sentences of every window in one call
+            texts = {h.id: h.text for h in ranked_hits}
+            missing = [
+                sentence_id(w['source_file'], w['page_num'], i)
+                for w in windows
+                for i in range(w['start'], w['end'] + 1)
+            ]
+            missing = [sid for sid in dict.fromkeys(missing) if sid not in texts]
+            if missing:
+                stored = self.sentence_store.get_by_ids(missing, include=["documents"])
+                texts.update(zip(stored['ids'], stored['documents']))
+            stage['fetched'] = len(missing)
+            
+            candidates = []
+            for w in windows:
+                # Windows are clipped to the sentences that exist on the page
+                present = [
+                    i for i in range(w['start'], w['end'] + 1)
+                    if sentence_id(w['source_file'], w['page_num'], i) in texts
+                ]
+                sentences = [
+                    texts[sentence_id(w['source_file'], w['page_num'], i)] for i in present
+                ]
+                best = w['best']
+                metadata = {
+                    key: value for key, value in best.metadata.items()
+                    if key not in ('sentence_index', 'char_start', 'char_end')
+                }
+                metadata.update(sentence_start=present[0], sentence_end=present[-1])
+                candidate = Candidate(
+                    window_id(w['source_file'], w['page_num'], w['start'], w['end']),
+                    ' '.join(sentences),
+                    metadata,
+                    distance=1 - best.similarity,
+                    similarity=best.similarity,
+                    retrieval_method='sentence_window'
+                )
+                candidate['hit_text'] = best.text
+                candidate['sentence_hits'] = len(w['hits'])
+                candidates.append(candidate)
+        trace.count('windows', len(candidates))
+        
+        return candidates
+    
+    def _vector_fields(
+        self,
+        options: RetrievalOptions,
+        has_session: bool
+    ) -> Optional[List[str]]:
+        """
+        Vector store fields the dense search must fetch for a request.
+        Text and metadata are skipped when the projection leaves them out and
+        no later stage (reranking, neighbor expansion, session pool, text-based
+        fusion with a legacy BM25 index) reads them.
+        
+        Args:
+            options: Request-scoped retrieval options
+            has_session: Whether the candidates are carried over to a session
+            
+        Returns:
+            Fields for query_collection, or None for all of them
+        """
+        if options.result_fields is None:
+            return None
+        
+        needs_chunks = (
+            options.use_reranking
+            or options.neighbor_window > 0
+            or has_session
+            or (options.use_hybrid_search and self.bm25_index is not None
+                and not self.bm25_index.has_shared_ids)
+        )
+        include = ["distances"]
+        if needs_chunks or 'text' in options.result_fields:
+            include.append("documents")
+        if needs_chunks or 'metadata' in options.result_fields:
+            include.append("metadatas")
+        return include
+    
+    @staticmethod
+    def _project(results: List[Dict[str, Any]], options: RetrievalOptions) -> List[Dict[str, Any]]:
+        """Results reduced to options.result_fields (unchanged when None)"""
+        if options.result_fields is None:
+            return results
+        return candidates_to_dicts(results, options.result_fields)
+    
+    def _settings_hash(
+        self,
+        options: RetrievalOptions,
+        rerank_mode: str,
+        multi_variant: bool = False
+    ) -> str:
+        """Hash everything besides the query that determines the final ranking"""
+        return options.settings_hash(
+            rerank_mode=rerank_mode,
+            reranker_model=self.reranker_model,
+            rerank_skip_threshold=self.rerank_skip_threshold,
+            multi_variant=multi_variant
+        )
+    
+    @staticmethod
+    def _result_scores(result: Dict[str, Any]) -> Dict[str, Any]:
+        """Score and provenance fields of a result, without text and metadata"""
+        return {
+            key: dict(value) if isinstance(value, dict) else value
+            for key, value in result.items()
+            if key not in ('id', 'text', 'metadata')
+        }
+    
+    def _hydrate_cached_results(self, cached: Dict[str, Any]) -> Optional[List[Dict[str, Any]]]:
+        """
+        Rebuild cached results from the vector store by chunk ID.
+        
+        Args:
+            cached: Semantic cache hit with chunk IDs and per-chunk scores
+            
+        Returns:
+            Results in retrieve() format, or None if a chunk no longer exists
+        """
+        if not cached['chunk_ids']:
             return []
         
-        # Stage 2: Reranking (if enabled)
-        if self.use_reranking and self.reranker is not None:
-            candidates = self._rerank(query, candidates)
+        stored = self.vector_store.get_by_ids(cached['chunk_ids'])
+        chunks = {
+            chunk_id: (text, metadata)
+            for chunk_id, text, metadata in zip(
+                stored['ids'], stored['documents'], stored['metadatas']
+            )
+        }
+        if any(chunk_id not in chunks for chunk_id in cached['chunk_ids']):
+            return None
         
-        # Return top N results
-        final_results = candidates[:final_top_n]
+        results = []
+        for chunk_id, scores in zip(cached['chunk_ids'], cached['scores']):
+            text, metadata = chunks[chunk_id]
+            result = Candidate(chunk_id, text, metadata)
+            result.update(self._result_scores(scores))
+            result['semantic_cache_similarity'] = cached['similarity']
+            results.append(result)
         
+        return results
+    
+    def _expand_neighbors(
+        self,
+        results: List[Dict[str, Any]],
+        window: int,
+        trace: RetrievalTrace = NULL_TRACE
+    ) -> List[Dict[str, Any]]:
+        """
+        Expand ranked hits to the chunks before and after them.
+        Uses the prev/next links recorded at ingestion, fetching each ring of
+        neighbors with one batched get_by_ids. Hits whose expansions overlap or
+        touch are merged into one result at the rank of the best hit.
+        
+        Args:
+            results: Final ranked results
+            window: Neighbors to add on each side of a hit (0 disables expansion)
+            trace: Trace receiving the expansion timing
+            
+        Returns:
+            Results whose text covers the expanded window; 'hit_text' keeps the
+            matched chunk and 'expanded_chunk_ids' lists the chunks in reading order
+        """
+        if window <= 0 or not results:
+            return results
+        
+        with trace.stage('neighbor_expansion', window=window) as stage:
+            chunks = {r['id']: (r['text'], r.get('metadata') or {}) for r in results}
+            
+            def link(chunk_id: str, direction: str) -> str:
+                metadata = chunks[chunk_id][1] if chunk_id in chunks else {}
+                return metadata.get(f'{direction}_chunk_id') or ''
+            
+            # Fetch one ring of neighbors per hop
+            frontier = list(chunks)
+            fetched = 0
+            for _ in range(window):
+                missing = list(dict.fromkeys(
+                    neighbor
+                    for chunk_id in frontier
+                    for neighbor in (link(chunk_id, 'prev'), link(chunk_id, 'next'))
+                    if neighbor and neighbor not in chunks
+                ))
+                if not missing:
+                    break
+                stored = self.vector_store.get_by_ids(missing)
+                for chunk_id, text, metadata in zip(
+                    stored['ids'], stored['documents'], stored['metadatas']
+                ):
+                    chunks[chunk_id] = (text, metadata or {})
+                fetched += len(stored['ids'])
+                frontier = missing
+            stage['fetched'] = fetched
+            
+            # Window of each hit, in reading order
+            windows = []
+            for result in results:
+                before, after = [], []
+                chunk_id = result['id']
+                for _ in range(window):
+                    chunk_id = link(chunk_id, 'prev')
+                    if chunk_id not in chunks:
+                        break
+                    before.insert(0, chunk_id)
+                chunk_id = result['id']
+                for _ in range(window):
+                    chunk_id = link(chunk_id, 'next')
+                    if chunk_id not in chunks:
+                        break
+                    after.append(chunk_id)
+                windows.append(before + [result['id']] + after)
+            
+            # Merge windows that share or border a chunk into the best-ranked hit
+            expanded = []
+            for result, ids in zip(results, windows):
+                touching = {link(ids[0], 'prev'), link(ids[-1], 'next'), *ids}
+                groups = [g for g in expanded if any(c in g['ids'] for c in touching)]
+                if groups:
+                    # A window bridging several groups joins them all
+                    group = groups[0]
+                    for other in groups[1:]:
+                        group['ids'].update(other['ids'])
+                        group['hit_ids'].extend(other['hit_ids'])
+                        expanded.remove(other)
+                else:
+                    group = {'result': result, 'ids': set(), 'hit_ids': []}
+                    expanded.append(group)
+                group['ids'].update(ids)
+                group['hit_ids'].append(result['id'])
+            
+            final_results = []
+            for group in expanded:
+                # Walk from the first chunk of the merged run to the last
+                first = next(c for c in group['ids'] if link(c, 'prev') not in group['ids'])
+                ordered = [first]
+                while link(ordered[-1], 'next') in group['ids'] and len(ordered) < len(group['ids']):
+                    ordered.append(link(ordered[-1], 'next'))
+                
+                result = group['result']
+                result['hit_text'] = result['text']
+                result['text'] = "\n".join(chunks[chunk_id][0] for chunk_id in ordered)
+                result['expanded_chunk_ids'] = ordered
+                result['merged_hit_ids'] = group['hit_ids']
+                final_results.append(result)
+            stage['merged'] = len(results) - len(final_results)
+        
+        trace.count('expanded', len(final_results))
         return final_results
     
+    @staticmethod
+    def _ranking_score_field(candidates: List[Dict[str, Any]]) -> Optional[str]:
+        """Score field the candidates are ordered by (rerank first, then first-stage)"""
+        for field in ('rerank_score', 'learned_score', 'fusion_score', 'similarity'):
+            if candidates and all(field in c for c in candidates):
+                return field
+        return None
+    
+    def _adaptive_top_n(
+        self,
+        candidates: List[Dict[str, Any]],
+        final_top_n: int,
+        min_top_n: int = 1
+    ) -> Tuple[int, Dict[str, Any]]:
+        """
+        Pick how many of the ranked candidates to keep.
+        Within the first final_top_n, results stop at the largest score gap when
+        it spans at least adaptive_gap_ratio of their score range, and rerank
+        scores below adaptive_min_score are dropped.
+        
+        Args:
+            candidates: Ranked candidates
+            final_top_n: Maximum number of results
+            min_top_n: Minimum number of results
+            
+        Returns:
+            Number of results to keep, and a record of why
+        """
+        head = candidates[:final_top_n]
+        field = self._ranking_score_field(head)
+        decision = {'kept': len(head), 'max': final_top_n, 'score': field, 'reason': 'max_top_n'}
+        if field is None or len(head) <= min_top_n:
+            return len(head), decision
+        
+        scores = np.array([c[field] for c in head], dtype=float)
+        keep = len(head)
+        
+        # Calibrated absolute floor, only meaningful on cross-encoder scores
+        if field == 'rerank_score' and self.adaptive_min_score is not None:
+            above = int(np.sum(scores >= self.adaptive_min_score))
+            if above < keep:
+                keep = above
+                decision['reason'] = 'below_min_score'
+        
+        # Largest drop between consecutive scores
+        gaps = scores[:-1] - scores[1:]
+        spread = scores[0] - scores[-1]
+        if spread > 0:
+            cut = int(np.argmax(gaps))
+            if gaps[cut] >= self.adaptive_gap_ratio * spread and cut + 1 < keep:
+                keep = cut + 1
+                decision['reason'] = 'score_gap'
+                decision['gap'] = float(gaps[cut])
+        
+        keep = max(min(keep, len(head)), min(min_top_n, len(head)))
+        decision['kept'] = keep
+        return keep, decision
+    
+    def _mmr_select(
+        self,
+        candidates: List[Dict[str, Any]],
+        top_n: int,
+        mmr_lambda: float,
+        trace: RetrievalTrace = NULL_TRACE
+    ) -> List[Dict[str, Any]]:
+        """
+        Reorder the head of the ranking with maximal marginal relevance.
+        Stored chunk embeddings are fetched in one batch; each pick maximizes
+        lambda * relevance - (1 - lambda) * max similarity to the chunks already picked.
+        
+        Args:
+            candidates: Ranked candidates
+            top_n: Number of results to pick
+            mmr_lambda: Relevance weight in [0, 1] (1 keeps the ranking order)
+            trace: Trace receiving the MMR timing
+            
+        Returns:
+            Candidates with the picked top_n first, then the rest in ranking order
+        """
+        pool = candidates[:max(top_n * self.mmr_pool_factor, top_n)]
+        if len(pool) <= 1 or top_n <= 0:
+            return candidates
+        
+        with trace.stage('mmr', pool=len(pool), mmr_lambda=mmr_lambda):
+            stored = self.vector_store.get_embeddings([c['id'] for c in pool])
+            embeddings_by_id = dict(zip(stored['ids'], stored['embeddings']))
+            if any(c['id'] not in embeddings_by_id for c in pool):
+                # Chunks without stored embeddings (legacy BM25 IDs): keep the ranking
+                return candidates
+            
+            embeddings = np.array([embeddings_by_id[c['id']] for c in pool], dtype=np.float32)
+            embeddings /= np.maximum(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12)
+            similarity = embeddings @ embeddings.T
+            
+            # Relevance from the ranking scores, min-max scaled to [0, 1]
+            field = self._ranking_score_field(pool)
+            if field is not None:
+                scores = np.array([c[field] for c in pool], dtype=float)
+                spread = scores.max() - scores.min()
+                relevance = (scores - scores.min()) / spread if spread > 0 else np.ones(len(pool))
+            else:
+                relevance = np.linspace(1.0, 0.0, len(pool))
+            
+            remaining = np.ones(len(pool), dtype=bool)
+            max_similarity = np.zeros(len(pool))
+            picked = []
+            for _ in range(min(top_n, len(pool))):
+                mmr_scores = mmr_lambda * relevance - (1 - mmr_lambda) * max_similarity
+                mmr_scores[~remaining] = -np.inf
+                best = int(np.argmax(mmr_scores))
+                picked.append(best)
+                remaining[best] = False
+                max_similarity = np.maximum(max_similarity, similarity[best])
+        
+        for rank, i in enumerate(picked):
+            pool[i]['mmr_rank'] = rank
+        rest = [pool[i] for i in np.flatnonzero(remaining)]
+        return [pool[i] for i in picked] + rest + candidates[len(pool):]
+    
+    def first_stage_confidence(self, candidates: List[Dict[str, Any]]) -> float:
+        """
+        Confidence that the first-stage ranking already has the best chunk on top.
+        Non-zero only when dense and sparse retrieval agree on the top chunk; it is
+        then the smaller of the relative dense and BM25 score gaps to the runner-up.
+        Each branch is ordered by a chunk's best rank over the query variants (so
+        several variants' top hits tie at rank 0), then by its score.
+        
+        Args:
+            candidates: Fused candidates carrying dense/sparse ranks and scores
+            
+        Returns:
+            Confidence in [0, 1]
+        """
+        dense_order = sorted(
+            (c for c in candidates if 'dense_rank' in c),
+            key=lambda c: (c['dense_rank'], -c.get('similarity', 0.0))
+        )
+        sparse_order = sorted(
+            (c for c in candidates if 'sparse_rank' in c),
+            key=lambda c: (c['sparse_rank'], -c.get('bm25_score', 0.0))
+        )
+        
+        if not dense_order or not sparse_order or dense_order[0]['id'] != sparse_order[0]['id']:
+            return 0.0
+        top = dense_order[0]
+        
+        def relative_gap(first: float, second: float) -> float:
+            if first <= 0:
+                return 0.0
+            return max(0.0, (first - second) / first)
+        
+        dense_runner_up = dense_order[1].get('similarity', 0.0) if len(dense_order) > 1 else 0.0
+        sparse_runner_up = sparse_order[1].get('bm25_score', 0.0) if len(sparse_order) > 1 else 0.0
+        
+        return min(
+            relative_gap(top.get('similarity', 0.0), dense_runner_up),
+            relative_gap(top.get('bm25_score', 0.0), sparse_runner_up)
+        )
+    
+    def _rerank_decision(
+        self,
+        candidates: List[Dict[str, Any]],
+        rerank_mode: str = "full",
+        use_reranking: bool = True
+    ) -> Dict[str, Any]:
+        """Decide whether to run the reranking stage, and record why"""
+        scorer = self.learned_ranker if rerank_mode == "learned" else self.reranker
+        if not use_reranking or scorer is None:
+            return {'reranked': False, 'reason': 'reranking_disabled', 'confidence': None}
+        
+        confidence = self.first_stage_confidence(candidates)
+        if self.rerank_skip_threshold is not None and confidence >= self.rerank_skip_threshold:
+            return {'reranked': False, 'reason': 'confident_first_stage', 'confidence': confidence}
+        
+        return {'reranked': True, 'reason': 'low_first_stage_confidence', 'confidence': confidence}
+    
+    def _embed_queries(self, queries: List[str]) -> np.ndarray:
+        """Embed one or more query strings in a single forward pass"""
+        if len(queries) == 1:
+            return self.embedding_service.embed_query(queries[0])[np.newaxis, :]
+        return self.embedding_service.embed_texts(queries)
+    
+    def _dense_retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int,
+        filter_metadata: Dict[str, Any] = None,
+        query_embeddings: np.ndarray = None,
+        trace: RetrievalTrace = NULL_TRACE,
+        chunk_ids: List[str] = None,
+        include: List[str] = None
+    ) -> List[List[Candidate]]:
+        """
+        Dense retrieval for several query variants with one vector store query.
+        
+        Args:
+            queries: Query variants
+            top_k: Number of results per variant
+            filter_metadata: Optional metadata filters
+            query_embeddings: Precomputed embeddings aligned with queries
+            trace: Trace receiving embedding and search timings
+            chunk_ids: Rank only these chunks by their stored embeddings instead
+                of searching the collection (filter_metadata is not applied)
+            include: Vector store fields to fetch (None fetches documents,
+                metadatas and distances)
+            
+        Returns:
+            One ranked candidate list per variant (no similarity threshold applied)
+        """
+        if query_embeddings is None:
+            with trace.stage('query_embedding', queries=len(queries)):
+                query_embeddings = self._embed_queries(queries)
+        
+        if chunk_ids is not None:
+            return self._dense_rank_chunks(chunk_ids, top_k, query_embeddings, trace, include)
+        
+        with trace.stage('dense_search', queries=len(queries), top_k=top_k):
+            search_kwargs = {'include': include} if include is not None else {}
+            results = self.vector_store.query_collection(
+                query_embeddings=query_embeddings.tolist(),
+                top_k=top_k,
+                filter_metadata=filter_metadata,
+                **search_kwargs
+            )
+        
+        # Extract results, one list per query embedding
+        ranked_lists = []
+        for ids, documents, metadatas, distances in zip(
+            results['ids'], results['documents'], results['metadatas'], results['distances']
+        ):
+            ranked_lists.append([
+                Candidate(
+                    chunk_id, text, metadata,
+                    distance=distance,
+                    similarity=1 - distance,  # Convert distance to similarity
+                    retrieval_method='dense'
+                )
+                for chunk_id, text, metadata, distance in zip(ids, documents, metadatas, distances)
+            ])
+        
+        return ranked_lists
+    
+    def _dense_rank_chunks(
+        self,
+        chunk_ids: List[str],
+        top_k: int,
+        query_embeddings: np.ndarray,
+        trace: RetrievalTrace = NULL_TRACE,
+        include: List[str] = None
+    ) -> List[List[Candidate]]:
+        """
+        Rank a small set of chunks by cosine similarity of their stored embeddings.
+        
+        Args:
+            chunk_ids: Chunks to rank
+            top_k: Number of results per query embedding
+            query_embeddings: L2-normalized query embeddings
+            trace: Trace receiving the lookup timing
+            include: Vector store fields to fetch besides the embeddings
+                (None fetches documents and metadatas)
+            
+        Returns:
+            One ranked candidate list per query embedding
+        """
+        with trace.stage('dense_subset', chunks=len(chunk_ids), top_k=top_k):
+            if include is not None:
+                fields = [f for f in include if f != "distances"]
+            else:
+                fields = ["documents", "metadatas"]
+            stored = self.vector_store.get_by_ids(list(chunk_ids), include=fields + ["embeddings"])
+            if not len(stored['ids']):
+                return [[] for _ in range(len(query_embeddings))]
+            documents = stored.get('documents') or [None] * len(stored['ids'])
+            metadatas = stored.get('metadatas') or [None] * len(stored['ids'])
+            
+            chunk_embeddings = np.asarray(stored['embeddings'], dtype=np.float32)
+            similarities = np.asarray(query_embeddings, dtype=np.float32) @ chunk_embeddings.T
+        
+        ranked_lists = []
+        for row in similarities:
+            order = np.argsort(-row, kind='stable')[:top_k]
+            ranked_lists.append([
+                Candidate(
+                    stored['ids'][i], documents[i], metadatas[i],
+                    distance=float(1 - row[i]),
+                    similarity=float(row[i]),
+                    retrieval_method='dense'
+                )
+                for i in order
+            ])
+        
+        return ranked_lists
+    
+    @staticmethod
+    def _entity_boost(
+        candidates: List[Dict[str, Any]],
+        matches: Dict[str, int]
+    ) -> List[Dict[str, Any]]:
+        """
+        Move candidates mentioning more of the query's entities to the front.
+        
+        Args:
+            candidates: First-stage candidates in fused order
+            matches: Chunk ID -> number of query entities the chunk mentions
+            
+        Returns:
+            Candidates stably reordered by entity matches, each with 'entity_matches'
+        """
+        for candidate in candidates:
+            candidate['entity_matches'] = matches.get(candidate['id'], 0)
+        return sorted(candidates, key=lambda c: -c['entity_matches'])
+    
     def _dense_retrieve(
         self,
         query: str,
         top_k: int,
         similarity_threshold: float,
-        filter_metadata: Dict[str, Any] = None
+        filter_metadata: Dict[str, Any] = None,
+        query_embedding: np.ndarray = None,
+        trace: RetrievalTrace = NULL_TRACE,
+        chunk_ids: List[str] = None,
+        include: List[str] = None
     ) -> List[Dict[str, Any]]:
         """Dense retrieval using vector similarity"""
-        query_embedding = self.embedding_service.embed_query(query)
-        
-        results = self.vector_store.query_collection(
-            query_embedding=query_embedding.tolist(),
-            top_k=top_k,
-            filter_metadata=filter_metadata
-        )
-        
-        # Extract results
-        candidates = []
-        for i in range(len(results['ids'][0])):
-            candidate = {
-                'id': results['ids'][0][i],
-                'text': results['documents'][0][i],
-                'metadata': results['metadatas'][0][i],
-                'distance': results['distances'][0][i],
-                'similarity': 1 - results['distances'][0][i],  # Convert distance to similarity
-                'retrieval_method': 'dense'
-            }
-            candidates.append(candidate)
+        query_embeddings = query_embedding[np.newaxis, :] if query_embedding is not None else None
+        candidates = self._dense_retrieve_many(
+            [query], top_k, filter_metadata, query_embeddings, trace, chunk_ids, include
+        )[0]
+        trace.count('dense', len(candidates))
         
         # Filter by threshold
-        candidates = [c for c in candidates if c['similarity'] >= similarity_threshold]
+        with trace.stage('threshold_filter'):
+            candidates = [c for c in candidates if c['similarity'] >= similarity_threshold]
+        trace.count('after_threshold', len(candidates))
         
         return candidates
     
@@ -136,7 +1241,14 @@ class RAGRetriever:
         top_k: int,
         similarity_threshold: float,
         filter_metadata: Dict[str, Any] = None,
-        alpha: float = 0.5
+        alpha: float = 0.5,
+        query_embeddings: np.ndarray = None,
+        query_variants: List[str] = None,
+        trace: RetrievalTrace = NULL_TRACE,
+        document_types: List[str] = None,
+        chunk_ids: List[str] = None,
+        source_files: List[str] = None,
+        include: List[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Hybrid retrieval combining dense and sparse search.
@@ -147,124 +1259,284 @@ class RAGRetriever:
             similarity_threshold: Minimum similarity threshold
             filter_metadata: Optional metadata filters
             alpha: Weight for dense retrieval (0=pure sparse, 1=pure dense)
+            query_embeddings: Precomputed embeddings aligned with the query variants
+            query_variants: Query rewrites to search and fuse (defaults to [query])
+            trace: Trace receiving per-stage timings and candidate counts
+            document_types: Restrict BM25 to these document types (the dense
+                branch is restricted through filter_metadata)
+            chunk_ids: Score only these chunks in both branches (None searches all)
+            source_files: Restrict BM25 to these documents (the dense branch is
+                restricted through filter_metadata)
+            include: Vector store fields the dense branch fetches (None fetches all)
             
         Returns:
             Combined and reranked results
         """
-        # Get dense results
-        dense_results = self._dense_retrieve(query, top_k, 0.0, filter_metadata)  # No threshold yet
-        
-        # Get sparse results from BM25
-        sparse_results = []
-        bm25_results = self.bm25_index.search(query, top_k)
-        
-        if bm25_results:
-            # Get document details for BM25 results
-            indices = [idx for idx, _ in bm25_results]
-            bm25_docs = self.bm25_index.get_documents_by_indices(indices)
-            
-            # Create candidate format for BM25 results
-            for (idx, score), doc in zip(bm25_results, bm25_docs):
-                # Try to find corresponding document in vector store
-                # This assumes the BM25 index was built from the same documents
-                sparse_results.append({
-                    'id': doc.get('doc_id', str(idx)),
-                    'text': doc['text'],
-                    'metadata': {k: v for k, v in doc.items() if k not in ['text', 'doc_id']},
-                    'bm25_score': score,
-                    'retrieval_method': 'sparse'
-                })
+        start = time.perf_counter()
+        variants = query_variants or [query]
         
-        # Combine results using reciprocal rank fusion
-        combined_results = self._reciprocal_rank_fusion(
-            dense_results, sparse_results, alpha
+        # Run BM25 on the shared executor while this thread runs the dense branch
+        sparse_future = self._branch_executor.submit(
+            self._timed_branch, 'sparse', self._sparse_retrieve_many,
+            variants, top_k, trace, document_types, chunk_ids, source_files
+        )
+        dense_lists = self._timed_branch(
+            'dense', self._dense_retrieve_many,
+            variants, top_k, filter_metadata, query_embeddings, trace, chunk_ids,  # No threshold yet
+            include
         )
+        sparse_lists = sparse_future.result()
+        trace.count('dense', sum(len(results) for results in dense_lists))
+        trace.count('sparse', sum(len(results) for results in sparse_lists))
+        
+        self._record_branch_time('hybrid', time.perf_counter() - start)
+        
+        # Legacy BM25 indexes use positional IDs; map hits onto dense IDs by text
+        if not self.bm25_index.has_shared_ids:
+            dense_ids = {
+                self._fusion_key(r['text']): r['id'] for results in dense_lists for r in results
+            }
+            for results in sparse_lists:
+                for result in results:
+                    result['id'] = dense_ids.get(self._fusion_key(result['text']), result['id'])
+        
+        # Combine results using reciprocal rank fusion
+        with trace.stage('fusion'):
+            combined_results = self._reciprocal_rank_fusion(
+                dense_lists, sparse_lists, alpha
+            )
+        trace.count('fused', len(combined_results))
         
         # Apply similarity threshold after fusion
         # Note: fusion scores are typically much smaller than similarity scores
         # So we apply threshold only to documents that have a similarity score
-        if similarity_threshold > 0:
-            combined_results = [
-                r for r in combined_results 
-                if r.get('similarity', 0) >= similarity_threshold or r.get('retrieval_method') == 'sparse'
-            ]
+        # (BM25-only hits have no dense rank or similarity and are kept)
+        with trace.stage('threshold_filter'):
+            if similarity_threshold > 0:
+                combined_results = [
+                    r for r in combined_results 
+                    if 'dense_rank' not in r or r['similarity'] >= similarity_threshold
+                ]
+        trace.count('after_threshold', len(combined_results))
         
         return combined_results
     
+    def _sparse_retrieve(
+        self,
+        query: str,
+        top_k: int,
+        document_types: List[str] = None,
+        chunk_ids: List[str] = None,
+        source_files: List[str] = None
+    ) -> List[Candidate]:
+        """
+        Sparse retrieval from the BM25 index.
+        
+        Args:
+            query: Query text
+            top_k: Number of results to retrieve
+            document_types: Only return chunks of these document types (all if None)
+            chunk_ids: Only score these chunks (all if None)
+            source_files: Only return chunks of these documents (all if None)
+            
+        Returns:
+            List of BM25 candidates referencing the index's metadata rows
+        """
+        search_kwargs = {'document_types': document_types}
+        if chunk_ids is not None:
+            search_kwargs['chunk_ids'] = chunk_ids
+        if source_files:
+            search_kwargs['source_files'] = source_files
+        bm25_results = self.bm25_index.search(query, top_k, **search_kwargs)
+        
+        # Metadata stays in the index's chunk table until a consumer reads it
+        index = self.bm25_index
+        return [
+            Candidate(
+                index.doc_ids[idx], index.text_at(idx),
+                table=index.chunk_table, row=idx,
+                bm25_score=score,
+                retrieval_method='sparse'
+            )
+            for idx, score in bm25_results
+        ]
+    
+    def _sparse_retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int,
+        trace: RetrievalTrace = NULL_TRACE,
+        document_types: List[str] = None,
+        chunk_ids: List[str] = None,
+        source_files: List[str] = None
+    ) -> List[List[Candidate]]:
+        """BM25 retrieval for each query variant"""
+        with trace.stage('bm25', queries=len(queries), top_k=top_k):
+            return [
+                self._sparse_retrieve(query, top_k, document_types, chunk_ids, source_files)
+                for query in queries
+            ]
+    
+    def _timed_branch(self, name: str, fn, *args) -> Any:
+        """Run one retrieval branch and record its wall time"""
+        start = time.perf_counter()
+        try:
+            return fn(*args)
+        finally:
+            self._record_branch_time(name, time.perf_counter() - start)
+    
+    def _record_branch_time(self, name: str, elapsed_seconds: float) -> None:
+        """Accumulate wall time for a retrieval branch"""
+        elapsed_ms = elapsed_seconds * 1000
+        with self._branch_timing_lock:
+            stats = self._branch_timings.setdefault(
+                name, {'calls': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'last_ms': 0.0}
+            )
+            stats['calls'] += 1
+            stats['total_ms'] += elapsed_ms
+            stats['max_ms'] = max(stats['max_ms'], elapsed_ms)
+            stats['last_ms'] = elapsed_ms
+    
+    def get_branch_timing_stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Get wall-time statistics of the dense, sparse and joined hybrid branches.
+        
+        Returns:
+            Per-branch calls, mean, max and last latency in milliseconds
+        """
+        with self._branch_timing_lock:
+            return {
+                name: {
+                    'calls': int(stats['calls']),
+                    'mean_ms': stats['total_ms'] / stats['calls'],
+                    'max_ms': stats['max_ms'],
+                    'last_ms': stats['last_ms']
+                }
+                for name, stats in self._branch_timings.items()
+            }
+    
     def _reciprocal_rank_fusion(
         self,
-        dense_results: List[Dict[str, Any]],
-        sparse_results: List[Dict[str, Any]],
+        dense_lists: List[List[Candidate]],
+        sparse_lists: List[List[Candidate]],
         alpha: float = 0.5,
         k: int = 60
-    ) -> List[Dict[str, Any]]:
+    ) -> List[Candidate]:
         """
-        Combine dense and sparse results using Reciprocal Rank Fusion.
+        Combine dense and sparse ranked lists using Reciprocal Rank Fusion.
+        Results are merged on chunk ID; ranks and scores are fused as NumPy arrays.
+        With several query variants, each branch's weight is split evenly
+        across its per-variant lists.
         
         Args:
-            dense_results: Results from dense retrieval
-            sparse_results: Results from sparse retrieval
+            dense_lists: Ranked results from dense retrieval, one list per variant
+            sparse_lists: Ranked results from sparse retrieval, one list per variant
             alpha: Weight for dense retrieval
             k: Constant for RRF formula
             
         Returns:
             Combined and reranked results
         """
-        # Create dictionaries to store scores by document text
-        doc_scores = {}
-        doc_data = {}
-        
-        # Process dense results
-        for rank, result in enumerate(dense_results):
-            doc_key = result['text'][:100]  # Use first 100 chars as key
-            score = alpha / (k + rank + 1)
-            
-            if doc_key not in doc_scores:
-                doc_scores[doc_key] = 0
-                doc_data[doc_key] = result
-            
-            doc_scores[doc_key] += score
-            # Store the best similarity score
-            if 'similarity' in result:
-                doc_data[doc_key]['similarity'] = max(
-                    doc_data[doc_key].get('similarity', 0),
-                    result['similarity']
-                )
+        dense_results = [r for results in dense_lists for r in results]
+        sparse_results = [r for results in sparse_lists for r in results]
+        num_dense = len(dense_results)
+        num_sparse = len(sparse_results)
+        if num_dense + num_sparse == 0:
+            return []
         
-        # Process sparse results
-        for rank, result in enumerate(sparse_results):
-            doc_key = result['text'][:100]  # Use first 100 chars as key
-            score = (1 - alpha) / (k + rank + 1)
-            
-            if doc_key not in doc_scores:
-                doc_scores[doc_key] = 0
-                doc_data[doc_key] = result
-            
-            doc_scores[doc_key] += score
-            # Store BM25 score
-            if 'bm25_score' in result:
-                doc_data[doc_key]['bm25_score'] = result['bm25_score']
+        # Rank of every entry within its own list
+        dense_positions = np.concatenate(
+            [np.arange(len(results)) for results in dense_lists] or [np.zeros(0, dtype=int)]
+        )
+        sparse_positions = np.concatenate(
+            [np.arange(len(results)) for results in sparse_lists] or [np.zeros(0, dtype=int)]
+        )
+        dense_weight = alpha / max(len(dense_lists), 1)
+        sparse_weight = (1 - alpha) / max(len(sparse_lists), 1)
+        
+        # Parallel arrays: chunk IDs and their RRF contributions
+        ids = np.array(
+            [r.id for r in dense_results] + [r.id for r in sparse_results],
+            dtype=object
+        )
+        contributions = np.concatenate([
+            dense_weight / (k + dense_positions + 1),
+            sparse_weight / (k + sparse_positions + 1)
+        ])
         
-        # Create final results
+        unique_ids, inverse = np.unique(ids.astype(str), return_inverse=True)
+        fusion_scores = np.zeros(len(unique_ids))
+        np.add.at(fusion_scores, inverse, contributions)
+        
+        # Best-ranked entry of each unique chunk in the dense and sparse lists (-1 if absent)
+        dense_entry = self._best_entries(inverse[:num_dense], dense_positions, len(unique_ids))
+        sparse_entry = self._best_entries(inverse[num_dense:], sparse_positions, len(unique_ids))
+        
+        # Highest similarity of each chunk across variants
+        max_similarity = np.full(len(unique_ids), -np.inf)
+        if num_dense:
+            np.maximum.at(
+                max_similarity,
+                inverse[:num_dense],
+                np.array([r.similarity for r in dense_results])
+            )
+        
+        method = 'hybrid' if sparse_lists else 'dense'
+        
+        # Materialize one candidate per chunk, best fusion score first
         final_results = []
-        for doc_key, fusion_score in doc_scores.items():
-            result = doc_data[doc_key].copy()
-            result['fusion_score'] = fusion_score
-            result['retrieval_method'] = 'hybrid'
+        for position in np.argsort(-fusion_scores, kind='stable'):
+            d_entry = int(dense_entry[position])
+            s_entry = int(sparse_entry[position])
+            
+            if d_entry >= 0:
+                result = dense_results[d_entry]
+                result.dense_rank = int(dense_positions[d_entry])
+                result.similarity = float(max_similarity[position])
+                if s_entry >= 0:
+                    result.bm25_score = sparse_results[s_entry].bm25_score
+                    result.sparse_rank = int(sparse_positions[s_entry])
+            else:
+                result = sparse_results[s_entry]
+                result.sparse_rank = int(sparse_positions[s_entry])
+            
+            result.fusion_score = float(fusion_scores[position])
+            result.retrieval_method = method
             final_results.append(result)
         
-        # Sort by fusion score
-        final_results.sort(key=lambda x: x['fusion_score'], reverse=True)
-        
         return final_results
     
-    def _rerank(self, query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    @staticmethod
+    def _best_entries(inverse: np.ndarray, positions: np.ndarray, num_unique: int) -> np.ndarray:
+        """For each unique chunk, the index of its best-ranked entry (-1 if absent)"""
+        best = np.full(num_unique, -1)
+        if len(positions):
+            # Assign worst-to-best so the best-ranked entry is written last
+            order = np.argsort(positions, kind='stable')[::-1]
+            best[inverse[order]] = order
+        return best
+    
+    @staticmethod
+    def _fusion_key(text: str) -> str:
+        """
+        Text key used to match hits from a legacy BM25 index to dense hits.
+        Legacy BM25 hits carry lowercased, whitespace-joined text, so normalize both sides.
+        """
+        return ' '.join(text.lower().split())[:100]
+    
+    def _rerank(
+        self,
+        query: str,
+        candidates: List[Dict[str, Any]],
+        trace: RetrievalTrace = NULL_TRACE
+    ) -> List[Dict[str, Any]]:
         """
         Rerank candidates using cross-encoder.
         
         Args:
             query: Query text
             candidates: List of candidate documents
+            trace: Trace receiving cache hits and cross-encoder timing
             
         Returns:
             Reranked list of candidates
@@ -272,11 +1544,44 @@ class RAGRetriever:
         if not candidates:
             return candidates
         
-        # Prepare pairs for reranking
-        pairs = [(query, candidate['text']) for candidate in candidates]
+        # Look up cached scores; only misses go to the cross-encoder
+        query_hash = RerankScoreCache.hash_query(query)
+        keys = [
+            RerankScoreCache.make_key(query_hash, candidate['id'], self.reranker_model)
+            for candidate in candidates
+        ]
+        if self.rerank_cache is not None:
+            rerank_scores = self.rerank_cache.get_many(keys)
+        else:
+            rerank_scores = [None] * len(candidates)
+        
+        # Score each missing chunk once, in a single batch
+        miss_positions = {}
+        for i, (key, score) in enumerate(zip(keys, rerank_scores)):
+            if score is None:
+                miss_positions.setdefault(key, []).append(i)
         
-        # Get reranking scores
-        rerank_scores = self.reranker.predict(pairs)
+        if self.rerank_cache is not None:
+            num_misses = sum(len(positions) for positions in miss_positions.values())
+            trace.cache_event(
+                'rerank_cache', hits=len(candidates) - num_misses, misses=num_misses
+            )
+        trace.count('reranked', len(candidates))
+        
+        if miss_positions:
+            miss_keys = list(miss_positions)
+            miss_candidates = [candidates[miss_positions[key][0]] for key in miss_keys]
+            start_time = time.perf_counter()
+            with trace.stage('cross_encoder', pairs=len(miss_candidates)):
+                miss_scores = self.reranker.score(query, miss_candidates)
+            self._record_rerank_cost(time.perf_counter() - start_time, len(miss_candidates))
+            
+            for key, score in zip(miss_keys, miss_scores):
+                for i in miss_positions[key]:
+                    rerank_scores[i] = float(score)
+            
+            if self.rerank_cache is not None:
+                self.rerank_cache.put_many(miss_keys, [float(s) for s in miss_scores])
         
         # Add rerank scores to candidates
         for candidate, score in zip(candidates, rerank_scores):
@@ -287,36 +1592,216 @@ class RAGRetriever:
         
         return candidates
     
+    def _learned_rerank(self, query: str, candidates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Rerank candidates with the distilled learned ranker.
+        
+        Args:
+            query: Query text
+            candidates: List of candidate documents
+            
+        Returns:
+            Reranked list of candidates
+        """
+        if not candidates:
+            return candidates
+        
+        scores = self.learned_ranker.score(query, candidates)
+        for candidate, score in zip(candidates, scores):
+            candidate['learned_score'] = float(score)
+        
+        candidates.sort(key=lambda x: x['learned_score'], reverse=True)
+        
+        return candidates
+    
+    def _record_rerank_cost(self, elapsed_seconds: float, num_pairs: int) -> None:
+        """Update the running per-pair cross-encoder cost (EWMA)"""
+        ms_per_pair = elapsed_seconds * 1000 / max(num_pairs, 1)
+        with self._rerank_cost_lock:
+            if self._rerank_ms_per_pair is None:
+                self._rerank_ms_per_pair = ms_per_pair
+            else:
+                self._rerank_ms_per_pair = 0.8 * self._rerank_ms_per_pair + 0.2 * ms_per_pair
+    
+    def _first_stage_scores(self, candidates: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        Cheap first-stage score for cascade reranking.
+        Averages the min-max scaled fusion, dense similarity and BM25 scores
+        that are available on the candidates.
+        
+        Args:
+            candidates: List of candidate documents
+            
+        Returns:
+            Array of scores in [0, 1], aligned with candidates
+        """
+        columns = []
+        for field in ('fusion_score', 'similarity', 'bm25_score'):
+            values = np.array([c.get(field, np.nan) for c in candidates], dtype=float)
+            present = ~np.isnan(values)
+            if not present.any():
+                continue
+            
+            scaled = np.zeros(len(candidates))
+            low, high = values[present].min(), values[present].max()
+            if high > low:
+                scaled[present] = (values[present] - low) / (high - low)
+            else:
+                scaled[present] = 1.0
+            columns.append(scaled)
+        
+        if not columns:
+            return np.zeros(len(candidates))
+        return np.mean(columns, axis=0)
+    
+    def _cascade_budget(self, first_stage_scores: np.ndarray, final_top_n: int) -> int:
+        """
+        Pick how many candidates to send to the cross-encoder.
+        Peaked first-stage scores need few candidates, flat ones need many.
+        The budget is bounded below by final_top_n and above by the latency budget.
+        
+        Args:
+            first_stage_scores: Cheap scores of the candidates
+            final_top_n: Number of results the caller needs
+            
+        Returns:
+            Candidate budget M
+        """
+        num_candidates = len(first_stage_scores)
+        if num_candidates <= final_top_n:
+            return num_candidates
+        
+        # Number of candidates covering cascade_mass of the softmax mass
+        ordered = np.sort(first_stage_scores)[::-1]
+        weights = np.exp((ordered - ordered[0]) / self.cascade_temperature)
+        cumulative = np.cumsum(weights) / weights.sum()
+        budget = int(np.searchsorted(cumulative, self.cascade_mass)) + 1
+        
+        # Cap by how many pairs fit in the latency budget
+        with self._rerank_cost_lock:
+            ms_per_pair = self._rerank_ms_per_pair
+        if self.cascade_latency_budget_ms and ms_per_pair:
+            budget = min(budget, int(self.cascade_latency_budget_ms // ms_per_pair))
+        
+        return min(num_candidates, max(final_top_n, budget))
+    
+    def _cascade_rerank(
+        self,
+        query: str,
+        candidates: List[Dict[str, Any]],
+        final_top_n: int,
+        trace: RetrievalTrace = NULL_TRACE
+    ) -> List[Dict[str, Any]]:
+        """
+        Cascade reranking: only an adaptive head of the candidates is cross-encoded.
+        
+        Args:
+            query: Query text
+            candidates: List of candidate documents
+            final_top_n: Number of results the caller needs
+            trace: Trace receiving cache hits and cross-encoder timing
+            
+        Returns:
+            Reranked head followed by the remaining candidates in first-stage order
+        """
+        if not candidates:
+            return candidates
+        
+        first_stage_scores = self._first_stage_scores(candidates)
+        order = np.argsort(-first_stage_scores, kind='stable')
+        ordered = [candidates[i] for i in order]
+        
+        budget = self._cascade_budget(first_stage_scores, final_top_n)
+        head = self._rerank(query, ordered[:budget], trace)
+        
+        return head + ordered[budget:]
+    
+    def get_rerank_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics of the rerank score cache"""
+        if self.rerank_cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.rerank_cache.get_stats()}
+    
+    def get_document_index_stats(self) -> Dict[str, Any]:
+        """Get size and lookup statistics of the document summary index"""
+        if not len(self.document_index):
+            return {'enabled': False}
+        return {'enabled': True, **self.document_index.get_stats()}
+    
+    def get_entity_index_stats(self) -> Dict[str, Any]:
+        """Get lookup statistics of the entity index"""
+        if self.entity_index is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.entity_index.get_stats()}
+    
+    def get_semantic_cache_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics of the semantic query cache"""
+        if self.semantic_cache is None:
+            return {'enabled': False}
+        return {'enabled': True, **self.semantic_cache.get_stats()}
+    
+    def condense_query(
+        self,
+        query: str,
+        conversation_history: List[Dict[str, str]] = None
+    ) -> str:
+        """
+        Turn a follow-up question into a short standalone retrieval query.
+        
+        Args:
+            query: Current query
+            conversation_history: List of previous messages
+            
+        Returns:
+            Condensed query
+        """
+        return self.query_condenser.condense(query, conversation_history)
+    
     def retrieve_with_context(
         self,
         query: str,
         conversation_history: List[Dict[str, str]] = None,
-        **kwargs
+        options: Optional[RetrievalOptions] = None,
+        **overrides
     ) -> List[Dict[str, Any]]:
         """
         Retrieve with conversation context.
-        Combines current query with recent conversation for better retrieval.
+        Key entities from the previous user turn are carried over to the
+        current query, so the retrieval input stays short as the
+        conversation grows.
         
         Args:
             query: Current query
             conversation_history: List of previous messages
-            **kwargs: Additional arguments for retrieve()
+            options: Request-scoped retrieval options
+            **overrides: RetrievalOptions fields to override for this call
             
         Returns:
             List of retrieved chunks
         """
-        # Enhance query with conversation context
-        if conversation_history:
-            # Take last few messages for context
-            recent_messages = conversation_history[-3:]
-            context_parts = [msg.get('content', '') for msg in recent_messages]
-            context_parts.append(query)
-            enhanced_query = ' '.join(context_parts)
-        else:
-            enhanced_query = query
+        condensed_query = self.condense_query(query, conversation_history)
+        return self.retrieve(condensed_query, options, **overrides)
+    
+    def pack_context(
+        self,
+        retrieved_chunks: List[Dict[str, Any]]
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Pack retrieved chunks into a context string within the token budget.
+        Overlapping or adjacent chunks from the same source are merged and
+        repeated sentences dropped before the budget is filled in rank order.
         
-        # Use original query for user-facing purposes but enhanced for retrieval
-        return self.retrieve(enhanced_query, **kwargs)
+        Args:
+            retrieved_chunks: List of retrieved chunk dictionaries
+            
+        Returns:
+            Formatted context string and packing statistics (tokens before and
+            after packing, tokens saved, merged chunks, dropped spans)
+        """
+        if not retrieved_chunks:
+            return "No relevant context found.", {}
+        
+        return self.context_packer.pack(retrieved_chunks)
     
     def format_context(self, retrieved_chunks: List[Dict[str, Any]]) -> str:
         """
@@ -328,18 +1813,4 @@ class RAGRetriever:
         Returns:
             Formatted context string
         """
-        if not retrieved_chunks:
-            return "No relevant context found."
-        
-        context_parts = []
-        for i, chunk in enumerate(retrieved_chunks, 1):
-            metadata = chunk.get('metadata', {})
-            source = metadata.get('source_file', 'Unknown')
-            page = metadata.get('page_num', 'Unknown')
-            
-            context_parts.append(
-                f"[Source {i}: {source}, Page {page}]\n{chunk['text']}\n"
-            )
-        
-        return "\n".join(context_parts)
-
+        return self.pack_context(retrieved_chunks)[0]
@@ -0,0 +1,162 @@
+"""
+Semantic cache of final retrieval results.
+Stores recent query embeddings with their final ranked chunk IDs under a
+hash of the retrieval settings. A new query whose embedding is within a
+cosine threshold of a cached one, under the same settings, reuses the cached
+ranking and skips BM25, fusion and reranking.
+"""
+
+from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+import threading
+import numpy as np
+
+from ..vector_store.index_manifest import IndexManifestWatcher
+
+
+class SemanticQueryCache:
+    """Bounded, thread-safe LRU cache keyed by query embedding similarity"""
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        similarity_threshold: float = 0.95,
+        manifest_path: Optional[str] = None
+    ):
+        """
+        Initialize the semantic cache.
+
+        Args:
+            max_size: Maximum number of cached queries
+            similarity_threshold: Minimum cosine similarity to count as the same question
+            manifest_path: Index manifest; the cache is cleared whenever it changes
+        """
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self._watcher = IndexManifestWatcher(manifest_path) if manifest_path else None
+
+        # Embeddings live in a preallocated matrix; entries map slot -> result
+        self._embeddings: Optional[np.ndarray] = None
+        self._settings: List[Optional[str]] = [None] * max_size
+        self._entries: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._free_slots = list(range(max_size - 1, -1, -1))
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def _check_manifest(self) -> None:
+        """Drop every entry if the index was rebuilt (caller holds the lock)"""
+        if self._watcher is not None and self._watcher.check():
+            if self._entries:
+                self.invalidations += 1
+            self._reset_entries()
+
+    def _reset_entries(self) -> None:
+        self._entries.clear()
+        self._settings = [None] * self.max_size
+        self._free_slots = list(range(self.max_size - 1, -1, -1))
+
+    def get(self, query_embedding: np.ndarray, settings_hash: str) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached result of the most similar query under the same settings.
+
+        Args:
+            query_embedding: L2-normalized query embedding
+            settings_hash: Hash of the retrieval settings
+
+        Returns:
+            Dict with 'chunk_ids', 'scores' and 'similarity', or None on a miss
+        """
+        with self._lock:
+            self._check_manifest()
+
+            if self._entries:
+                slots = np.fromiter(self._entries.keys(), dtype=np.int64)
+                same_settings = np.array(
+                    [self._settings[slot] == settings_hash for slot in slots]
+                )
+                slots = slots[same_settings]
+            else:
+                slots = np.array([], dtype=np.int64)
+
+            if len(slots):
+                similarities = self._embeddings[slots] @ query_embedding
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    slot = int(slots[best])
+                    self._entries.move_to_end(slot)
+                    self.hits += 1
+                    entry = self._entries[slot]
+                    return {
+                        'chunk_ids': list(entry['chunk_ids']),
+                        'scores': [dict(scores) for scores in entry['scores']],
+                        'similarity': float(similarities[best])
+                    }
+
+            self.misses += 1
+            return None
+
+    def put(
+        self,
+        query_embedding: np.ndarray,
+        settings_hash: str,
+        chunk_ids: List[str],
+        scores: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Cache the final ranking for a query, evicting the least recently used entry.
+
+        Args:
+            query_embedding: L2-normalized query embedding
+            settings_hash: Hash of the retrieval settings
+            chunk_ids: Final ranked chunk IDs
+            scores: Per-chunk score fields aligned with chunk_ids
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._check_manifest()
+
+            if self._embeddings is None:
+                self._embeddings = np.zeros(
+                    (self.max_size, len(query_embedding)), dtype=np.float32
+                )
+
+            if not self._free_slots:
+                slot, _ = self._entries.popitem(last=False)
+                self._free_slots.append(slot)
+                self.evictions += 1
+
+            slot = self._free_slots.pop()
+            self._embeddings[slot] = query_embedding
+            self._settings[slot] = settings_hash
+            self._entries[slot] = {'chunk_ids': list(chunk_ids), 'scores': scores}
+
+    def clear(self) -> None:
+        """Remove all cached results and reset statistics"""
+        with self._lock:
+            self._reset_entries()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+            self.invalidations = 0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get hit/miss statistics for tuning the threshold and size"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'similarity_threshold': self.similarity_threshold,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+                'hit_rate': self.hits / lookups if lookups else 0.0
+            }
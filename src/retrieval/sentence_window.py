@@ -0,0 +1,96 @@
+"""
+Sentence-window expansion for the sentence-level index.
+Sentence hits are widened to the sentences around them in the same page;
+windows that overlap or touch are merged into one, ranked by their best hit.
+"""
+
+from typing import List, Dict, Any
+import hashlib
+
+
+def sentence_id(source_file: str, page_num: Any, sentence_index: int) -> str:
+    """
+    Deterministic ID of a sentence, so its neighbors can be fetched by position.
+
+    Args:
+        source_file: Source file name
+        page_num: Page number
+        sentence_index: Position of the sentence within its page
+
+    Returns:
+        Sentence ID
+    """
+    page_hash = hashlib.sha1(f"{source_file}|{page_num}".encode("utf-8")).hexdigest()[:16]
+    return f"s-{page_hash}-{int(sentence_index)}"
+
+
+def window_id(source_file: str, page_num: Any, start: int, end: int) -> str:
+    """ID of a sentence window (stable for the same page and sentence range)"""
+    page_hash = hashlib.sha1(f"{source_file}|{page_num}".encode("utf-8")).hexdigest()[:16]
+    return f"w-{page_hash}-{start}-{end}"
+
+
+def merge_sentence_windows(hits: List[Dict[str, Any]], window: int) -> List[Dict[str, Any]]:
+    """
+    Widen ranked sentence hits to windows and merge overlapping windows.
+
+    Args:
+        hits: Ranked sentence hits with 'id', 'similarity' and metadata
+            'source_file', 'page_num' and 'sentence_index'
+        window: Sentences added on each side of a hit
+
+    Returns:
+        Windows in order of their best hit, each with 'source_file', 'page_num',
+        'start', 'end' (inclusive sentence indices), 'rank' of the best hit,
+        'best' hit and 'hits' (sentence indices of the merged hits)
+    """
+    pages: Dict[tuple, List[Dict[str, Any]]] = {}
+    for rank, hit in enumerate(hits):
+        metadata = hit['metadata']
+        index = int(metadata['sentence_index'])
+        key = (metadata['source_file'], metadata['page_num'])
+        pages.setdefault(key, []).append({
+            'source_file': metadata['source_file'],
+            'page_num': metadata['page_num'],
+            'start': max(index - window, 0),
+            'end': index + window,
+            'rank': rank,
+            'best': hit,
+            'hits': [index]
+        })
+
+    windows = []
+    for ranges in pages.values():
+        ranges.sort(key=lambda r: r['start'])
+        merged = [ranges[0]]
+        for current in ranges[1:]:
+            previous = merged[-1]
+            if current['start'] <= previous['end'] + 1:
+                # Overlapping or adjacent: one window at the better rank
+                previous['end'] = max(previous['end'], current['end'])
+                previous['hits'].extend(current['hits'])
+                if current['rank'] < previous['rank']:
+                    previous['rank'] = current['rank']
+                    previous['best'] = current['best']
+            else:
+                merged.append(current)
+        windows.extend(merged)
+
+    windows.sort(key=lambda w: w['rank'])
+    return windows
+
+
+def window_sentence_ids(window: str) -> List[str]:
+    """
+    Sentence IDs covered by a window ID from window_id().
+
+    Args:
+        window: Window ID ('w-<page hash>-<start>-<end>')
+
+    Returns:
+        Sentence IDs in reading order (empty if the ID is not a window ID)
+    """
+    parts = window.split('-')
+    if len(parts) != 4 or parts[0] != 'w' or not (parts[2].isdigit() and parts[3].isdigit()):
+        return []
+    return [f"s-{parts[1]}-{i}" for i in range(int(parts[2]), int(parts[3]) + 1)]
@@ -0,0 +1,117 @@
+"""
+Per-conversation retrieval state for follow-up questions.
+Keeps the previous turn's candidate pool and a running topic embedding, so a
+follow-up that stays on topic can rerank that pool plus a small fresh
+retrieval instead of running the full hybrid, fusion and rerank pipeline.
+"""
+
+from typing import List, Dict, Any, Optional, Tuple
+import threading
+import numpy as np
+
+from .candidate import Candidate
+
+
+class SessionRetrievalState:
+    """Candidate pool and topic of one conversation"""
+
+    def __init__(
+        self,
+        topic_threshold: float = 0.7,
+        fresh_top_k: int = 6,
+        pool_size: int = 12,
+        topic_decay: float = 0.5
+    ):
+        """
+        Initialize an empty session state.
+
+        Args:
+            topic_threshold: Cosine similarity to the session topic at which a
+                query counts as a follow-up on the same topic
+            fresh_top_k: Candidates retrieved fresh on a follow-up, added to the pool
+            pool_size: Maximum candidates carried over to the next turn
+            topic_decay: Weight of the previous topic when a follow-up updates it
+        """
+        self.topic_threshold = topic_threshold
+        self.fresh_top_k = fresh_top_k
+        self.pool_size = pool_size
+        self.topic_decay = topic_decay
+
+        self.topic: Optional[np.ndarray] = None
+        self.candidates: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+        # Statistics
+        self.reuses = 0
+        self.full_searches = 0
+
+    def check_topic(self, query_embedding: np.ndarray) -> Tuple[bool, float]:
+        """
+        Whether a query stays on the session topic.
+
+        Args:
+            query_embedding: L2-normalized query embedding
+
+        Returns:
+            (on_topic, similarity to the topic; 0.0 without a previous turn)
+        """
+        with self._lock:
+            if self.topic is None or not self.candidates:
+                return False, 0.0
+            similarity = float(self.topic @ query_embedding)
+            return similarity >= self.topic_threshold, similarity
+
+    def pool(self) -> List[Dict[str, Any]]:
+        """Copies of the previous turn's candidates (ID, text and metadata only)"""
+        with self._lock:
+            return [
+                Candidate(c['id'], c['text'], c['metadata'], retrieval_method='session')
+                for c in self.candidates
+            ]
+
+    def update(
+        self,
+        query_embedding: np.ndarray,
+        candidates: List[Dict[str, Any]],
+        reused: bool
+    ) -> None:
+        """
+        Store this turn's ranked candidates and move the topic.
+
+        Args:
+            query_embedding: L2-normalized query embedding
+            candidates: Ranked candidates of this turn
+            reused: Whether this turn reused the previous pool
+        """
+        query_embedding = np.asarray(query_embedding, dtype=np.float32)
+        with self._lock:
+            if reused and self.topic is not None:
+                topic = self.topic_decay * self.topic + (1 - self.topic_decay) * query_embedding
+                self.topic = topic / (np.linalg.norm(topic) or 1.0)
+                self.reuses += 1
+            else:
+                # New topic
+                self.topic = query_embedding
+                self.full_searches += 1
+
+            self.candidates = [
+                {'id': c['id'], 'text': c['text'], 'metadata': c.get('metadata') or {}}
+                for c in candidates[:self.pool_size]
+            ]
+
+    def reset(self) -> None:
+        """Forget the topic and the candidate pool"""
+        with self._lock:
+            self.topic = None
+            self.candidates = []
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get reuse counts of this session"""
+        with self._lock:
+            turns = self.reuses + self.full_searches
+            return {
+                'reuses': self.reuses,
+                'full_searches': self.full_searches,
+                'reuse_rate': self.reuses / turns if turns else 0.0,
+                'pool_size': len(self.candidates)
+            }
@@ -0,0 +1,108 @@
+"""
+Per-request retrieval trace.
+Collects high-resolution stage timings, candidate counts and cache hits for
+a single retrieve() call, so production latency can be broken down without
+re-running the pipeline piece by piece.
+"""
+
+from typing import Dict, Any, Iterator
+from contextlib import contextmanager
+import threading
+import time
+
+
+class RetrievalTrace:
+    """Thread-safe collector of stage timings, candidate counts and cache events"""
+
+    def __init__(self):
+        """Start a new trace"""
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        self.stages: list = []
+        self.candidate_counts: Dict[str, int] = {}
+        self.cache: Dict[str, Dict[str, int]] = {}
+        self.info: Dict[str, Any] = {}
+        self.total_ms = None
+
+    @contextmanager
+    def stage(self, name: str, **details) -> Iterator[Dict[str, Any]]:
+        """
+        Time a pipeline stage.
+
+        Args:
+            name: Stage name
+            **details: Extra fields recorded with the stage
+
+        Yields:
+            Dict the caller can add details to while the stage runs
+        """
+        start = time.perf_counter()
+        try:
+            yield details
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.stages.append({
+                    'name': name,
+                    'start_ms': (start - self._start) * 1000,
+                    'duration_ms': (end - start) * 1000,
+                    **details
+                })
+
+    def count(self, name: str, value: int) -> None:
+        """Record the number of candidates at a point in the pipeline"""
+        with self._lock:
+            self.candidate_counts[name] = int(value)
+
+    def cache_event(self, cache: str, hits: int = 0, misses: int = 0) -> None:
+        """Record hits and misses of a cache"""
+        with self._lock:
+            stats = self.cache.setdefault(cache, {'hits': 0, 'misses': 0})
+            stats['hits'] += int(hits)
+            stats['misses'] += int(misses)
+
+    def note(self, **info) -> None:
+        """Record request-level details (rerank mode, decision, ...)"""
+        with self._lock:
+            self.info.update(info)
+
+    def finish(self) -> None:
+        """Stop the trace clock"""
+        self.total_ms = (time.perf_counter() - self._start) * 1000
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the trace as a JSON-serializable dict"""
+        with self._lock:
+            total_ms = self.total_ms
+            if total_ms is None:
+                total_ms = (time.perf_counter() - self._start) * 1000
+            return {
+                'total_ms': total_ms,
+                'stages': sorted((dict(s) for s in self.stages), key=lambda s: s['start_ms']),
+                'candidate_counts': dict(self.candidate_counts),
+                'cache': {name: dict(stats) for name, stats in self.cache.items()},
+                **self.info
+            }
+
+
+class NullRetrievalTrace(RetrievalTrace):
+    """Trace that records nothing, used when the caller did not ask for one"""
+
+    @contextmanager
+    def stage(self, name: str, **details) -> Iterator[Dict[str, Any]]:
+        yield details
+
+    def count(self, name: str, value: int) -> None:
+        pass
+
+    def cache_event(self, cache: str, hits: int = 0, misses: int = 0) -> None:
+        pass
+
+    def note(self, **info) -> None:
+        pass
+
+    def finish(self) -> None:
+        pass
+
+
+NULL_TRACE = NullRetrievalTrace()
@@ -1,4 +1,12 @@
-from .chroma_client import ChromaDBClient
+from .index_manifest import write_index_manifest, read_index_manifest
 
-__all__ = ["ChromaDBClient"]
+__all__ = ["ChromaDBClient", "write_index_manifest", "read_index_manifest"]
 
+
+def __getattr__(name):
+    # The Chroma client is imported on first use, so the manifest helpers
+    # (used by the retrieval caches) load without chromadb
+    if name == "ChromaDBClient":
+        from .chroma_client import ChromaDBClient
+        return ChromaDBClient
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
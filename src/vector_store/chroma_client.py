@@ -9,6 +9,10 @@ from chromadb.config import Settings
 import uuid
 
 
+# Fields returned by query_collection when no projection is given
+QUERY_FIELDS = ("documents", "metadatas", "distances")
+
+
 class ChromaDBClient:
     """Client for interacting with ChromaDB vector database"""
     
@@ -48,7 +52,8 @@ class ChromaDBClient:
     def ingest_chunks(
         self,
         chunks: List[Dict[str, Any]],
-        embeddings: List[List[float]] = None
+        embeddings: List[List[float]] = None,
+        ids: List[str] = None
     ) -> None:
         """
         Ingest chunks into ChromaDB with metadata.
@@ -57,6 +62,7 @@ class ChromaDBClient:
         Args:
             chunks: List of chunk dictionaries with text and metadata
             embeddings: Optional pre-computed embeddings (if None, ChromaDB will generate)
+            ids: Optional stable chunk IDs shared with other indexes (if None, random UUIDs)
         """
         if not chunks:
             print("No chunks to ingest")
@@ -73,15 +79,18 @@ class ChromaDBClient:
             batch_chunks = chunks[batch_start:batch_end]
             
             # Prepare data for ChromaDB
-            ids = []
+            batch_ids = []
             documents = []
             metadatas = []
             batch_embeddings = None
             
             for i, chunk in enumerate(batch_chunks):
-                # Generate unique ID
-                chunk_id = str(uuid.uuid4())
-                ids.append(chunk_id)
+                # Use the shared chunk ID, or generate a unique one
+                if ids is not None:
+                    chunk_id = str(ids[batch_start + i])
+                else:
+                    chunk_id = str(uuid.uuid4())
+                batch_ids.append(chunk_id)
                 
                 # Extract text
                 documents.append(chunk["text"])
@@ -100,14 +109,14 @@ class ChromaDBClient:
             try:
                 if batch_embeddings is not None:
                     self.collection.add(
-                        ids=ids,
+                        ids=batch_ids,
                         documents=documents,
                         metadatas=metadatas,
                         embeddings=batch_embeddings
                     )
                 else:
                     self.collection.add(
-                        ids=ids,
+                        ids=batch_ids,
                         documents=documents,
                         metadatas=metadatas
                     )
@@ -126,21 +135,27 @@ class ChromaDBClient:
         query_text: str = None,
         query_embedding: List[float] = None,
         top_k: int = 10,
-        filter_metadata: Dict[str, Any] = None
+        filter_metadata: Dict[str, Any] = None,
+        query_embeddings: List[List[float]] = None,
+        include: List[str] = None
     ) -> Dict[str, Any]:
         """
         Query the collection for similar documents.
         
         Args:
-            query_text: Query text (used if query_embedding is None)
+            query_text: Query text (used if no embedding is given)
             query_embedding: Query embedding vector
             top_k: Number of results to return
             filter_metadata: Optional metadata filters
+            query_embeddings: Several query embeddings searched in one call;
+                results hold one list per embedding
+            include: Fields to fetch besides ids (default: documents, metadatas
+                and distances); fields left out come back as lists of None
             
         Returns:
             Dictionary with ids, documents, metadatas, and distances
         """
-        if query_embedding is None and query_text is None:
+        if query_embedding is None and query_embeddings is None and query_text is None:
             raise ValueError("Either query_text or query_embedding must be provided")
         
         query_kwargs = {
@@ -148,31 +163,82 @@ class ChromaDBClient:
         }
         
         if filter_metadata:
-            # Convert filter values to strings for ChromaDB
-            filter_metadata = {k: str(v) for k, v in filter_metadata.items()}
-            query_kwargs["where"] = filter_metadata
+            query_kwargs["where"] = self._build_where(filter_metadata)
         
-        if query_embedding is not None:
+        if query_embeddings is not None:
+            query_kwargs["query_embeddings"] = query_embeddings
+        elif query_embedding is not None:
             query_kwargs["query_embeddings"] = [query_embedding]
         else:
             query_kwargs["query_texts"] = [query_text]
         
+        if include is not None:
+            query_kwargs["include"] = list(include)
+        
         results = self.collection.query(**query_kwargs)
         
+        # Keep the result shape stable for callers that zip all fields
+        if include is not None:
+            for field in QUERY_FIELDS:
+                if field not in include:
+                    results[field] = [[None] * len(ids) for ids in results['ids']]
+        
         return results
     
-    def get_by_ids(self, ids: List[str]) -> Dict[str, Any]:
+    @staticmethod
+    def _build_where(filter_metadata: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a ChromaDB where clause from metadata filters.
+        Values are converted to strings to match the stored metadata; operator
+        filters such as {"document_type": {"$in": ["faq", "tour"]}} are supported
+        and several keys are combined with $and.
+        
+        Args:
+            filter_metadata: Field -> value or {operator: operand}
+            
+        Returns:
+            ChromaDB where clause
+        """
+        clauses = []
+        for key, value in filter_metadata.items():
+            if isinstance(value, dict):
+                value = {
+                    op: [str(v) for v in operand] if isinstance(operand, (list, tuple)) else str(operand)
+                    for op, operand in value.items()
+                }
+            else:
+                value = str(value)
+            clauses.append({key: value})
+        
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+    
+    def get_by_ids(self, ids: List[str], include: List[str] = None) -> Dict[str, Any]:
         """
         Retrieve documents by their IDs.
         
         Args:
             ids: List of document IDs
+            include: Fields to return (ChromaDB default: documents and metadatas)
             
         Returns:
             Dictionary with documents and metadata
         """
+        if include is not None:
+            return self.collection.get(ids=ids, include=include)
         return self.collection.get(ids=ids)
     
+    def get_embeddings(self, ids: List[str]) -> Dict[str, Any]:
+        """
+        Retrieve stored embeddings by document ID in one call.
+        
+        Args:
+            ids: List of document IDs
+            
+        Returns:
+            Dictionary with ids and embeddings (order may differ from ids)
+        """
+        return self.collection.get(ids=ids, include=["embeddings"])
+    
     def reset_collection(self) -> None:
         """Delete and recreate the collection"""
         try:
@@ -0,0 +1,92 @@
+"""
+Index manifest written at the end of ingestion.
+Records a fresh version for every (re)build of the vector store and BM25
+index, so caches derived from the index can tell when they are stale.
+"""
+
+from typing import Dict, Any, Optional, Tuple
+from datetime import datetime
+from pathlib import Path
+import json
+import os
+import uuid
+
+
+def write_index_manifest(path: str, **info) -> Dict[str, Any]:
+    """
+    Write a new index manifest with a fresh version.
+
+    Args:
+        path: Manifest file path
+        **info: Extra fields to record (chunk count, models, ...)
+
+    Returns:
+        The manifest that was written
+    """
+    manifest = {
+        'version': uuid.uuid4().hex,
+        'built_at': datetime.now().isoformat(),
+        **info
+    }
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+
+    # Write atomically so readers never see a partial manifest
+    tmp_path = path.with_suffix(path.suffix + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+    return manifest
+
+
+def read_index_manifest(path: str) -> Optional[Dict[str, Any]]:
+    """Read the index manifest, or None if it does not exist"""
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+class IndexManifestWatcher:
+    """Cheaply detects manifest changes by file stat, reading it only when it changed"""
+
+    def __init__(self, path: str):
+        """
+        Initialize the watcher.
+
+        Args:
+            path: Manifest file path
+        """
+        self.path = path
+        self._stat: Optional[Tuple[int, int]] = None
+        self.version: Optional[str] = None
+        self.check()
+
+    def _current_stat(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def check(self) -> bool:
+        """
+        Check whether the manifest version changed since the last check.
+
+        Returns:
+            True if the index was rebuilt (or the manifest appeared/disappeared)
+        """
+        stat = self._current_stat()
+        if stat == self._stat:
+            return False
+
+        self._stat = stat
+        manifest = read_index_manifest(self.path) if stat is not None else None
+        version = manifest.get('version') if manifest else None
+
+        changed = version != self.version
+        self.version = version
+        return changed
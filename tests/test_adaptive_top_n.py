@@ -0,0 +1,68 @@
+"""
+Tests for the adaptive top-n cut-off at the largest score gap.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import RAGRetriever
+
+
+def scored(*scores, field='rerank_score'):
+    return [{'id': f'chunk-{i}', 'text': '', field: s} for i, s in enumerate(scores)]
+
+
+def retriever(**kwargs):
+    return RAGRetriever(vector_store=None, embedding_service=None, use_reranking=False, **kwargs)
+
+
+def test_cuts_at_the_largest_gap():
+    # Range 0.9, largest gap 0.6 between the second and third chunk
+    keep, decision = retriever(adaptive_gap_ratio=0.5)._adaptive_top_n(
+        scored(0.95, 0.9, 0.3, 0.2, 0.05), final_top_n=5
+    )
+    assert keep == 2
+    assert decision['reason'] == 'score_gap' and decision['gap'] == pytest.approx(0.6)
+
+
+def test_keeps_all_when_no_gap_dominates():
+    keep, decision = retriever(adaptive_gap_ratio=0.5)._adaptive_top_n(
+        scored(0.9, 0.7, 0.5, 0.3, 0.1), final_top_n=5
+    )
+    assert keep == 5 and decision['reason'] == 'max_top_n'
+
+
+def test_min_top_n_is_kept():
+    keep, decision = retriever()._adaptive_top_n(scored(0.95, 0.1, 0.05), final_top_n=3, min_top_n=2)
+    assert keep == 2 and decision['kept'] == 2
+
+
+def test_gap_only_within_final_top_n():
+    # Even steps of 0.1 inside final_top_n = 4; the drop to the fifth chunk is outside
+    keep, _ = retriever()._adaptive_top_n(scored(0.9, 0.8, 0.7, 0.6, 0.0), final_top_n=4)
+    assert keep == 4
+
+
+def test_min_score_applies_to_rerank_scores_only():
+    model = retriever(adaptive_min_score=0.5, adaptive_gap_ratio=1.0)
+
+    keep, decision = model._adaptive_top_n(scored(0.9, 0.7, 0.45, 0.4), final_top_n=4)
+    assert keep == 2 and decision['reason'] == 'below_min_score'
+
+    keep, _ = model._adaptive_top_n(scored(0.9, 0.7, 0.45, 0.4, field='fusion_score'), final_top_n=4)
+    assert keep == 4
+
+
+def test_unscored_candidates_are_kept():
+    keep, decision = retriever()._adaptive_top_n([{'id': 'a', 'text': ''}] * 3, final_top_n=2)
+    assert keep == 2 and decision['score'] is None
@@ -0,0 +1,88 @@
+"""
+Tests for the slotted Candidate record and the columnar ChunkTable.
+A Candidate must behave like the result dict it replaces.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval import Candidate, ChunkTable, candidates_to_dicts
+
+
+RECORDS = [
+    {'source_file': 'a.pdf', 'page_num': 1},
+    {'source_file': 'b.pdf', 'page_num': 2, 'document_type': 'faq'},
+    {'source_file': 'c.pdf'},
+]
+
+
+def test_chunk_table_round_trip():
+    table = ChunkTable.from_records(RECORDS)
+
+    assert len(table) == 3
+    assert [table.row(i) for i in range(3)] == RECORDS
+    assert table.column('page_num') == [1, 2, None]
+    assert table.column('missing') == [None, None, None]
+
+
+def test_table_metadata_is_read_lazily():
+    table = ChunkTable.from_records(RECORDS)
+    candidate = Candidate('chunk-1', 'text', table=table, row=1, bm25_score=2.5)
+
+    assert 'metadata' in candidate
+    assert candidate['metadata'] == RECORDS[1]
+    assert candidate.metadata == RECORDS[1]
+    assert candidate['bm25_score'] == 2.5
+
+
+def test_unset_fields_are_absent():
+    candidate = Candidate('chunk-1', 'text', {'page_num': 1})
+
+    assert 'rerank_score' not in candidate
+    assert candidate.get('rerank_score') is None
+    with pytest.raises(KeyError):
+        candidate['rerank_score']
+    assert list(candidate) == ['id', 'text', 'metadata']
+
+
+def test_none_values_are_kept_like_a_dict():
+    data = {'id': 'chunk-1', 'text': 'text', 'metadata': {}, 'rerank_score': None, 'note': None}
+    candidate = Candidate.from_dict(data)
+
+    assert 'rerank_score' in candidate
+    assert candidate['rerank_score'] is None
+    assert candidate.to_dict() == data
+    assert len(candidate) == len(data)
+
+
+def test_delete_removes_slot_and_extra_keys():
+    table = ChunkTable.from_records(RECORDS)
+    candidate = Candidate('chunk-1', 'text', table=table, row=0)
+    candidate['hit_text'] = 'hit'
+
+    del candidate['metadata']
+    del candidate['hit_text']
+
+    assert 'metadata' not in candidate
+    assert 'hit_text' not in candidate
+    with pytest.raises(KeyError):
+        del candidate['hit_text']
+
+
+def test_candidates_to_dicts_projects_fields():
+    candidate = Candidate('chunk-1', 'text', {'page_num': 1}, similarity=0.9)
+    plain = {'id': 'chunk-2', 'text': 'other', 'similarity': 0.5}
+
+    assert candidates_to_dicts([candidate, plain], fields=['id', 'similarity', 'rerank_score']) == [
+        {'id': 'chunk-1', 'similarity': 0.9},
+        {'id': 'chunk-2', 'similarity': 0.5},
+    ]
+    assert candidates_to_dicts([candidate]) == [
+        {'id': 'chunk-1', 'text': 'text', 'metadata': {'page_num': 1}, 'similarity': 0.9}
+    ]
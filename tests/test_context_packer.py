@@ -0,0 +1,95 @@
+"""
+Tests for token-budgeted context packing: merging, duplicate removal,
+layout and budget behaviour (with the length-based token estimate).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval import ContextPacker
+
+
+CHUNKS = [
+    {
+        'id': 'a1',
+        'text': "Alpha sentence one is here. Beta sentence two is here. Gamma sentence three is here.",
+        'metadata': {'source_file': 'a.pdf', 'page_num': 1}
+    },
+    {
+        # Overlaps the end of a1
+        'id': 'a2',
+        'text': "Gamma sentence three is here. Delta sentence four is here.",
+        'metadata': {'source_file': 'a.pdf', 'page_num': 2}
+    },
+    {
+        # Repeats a1's first sentence
+        'id': 'b1',
+        'text': "Line one\nLine two\n\nAlpha sentence one is here.",
+        'metadata': {'source_file': 'b.pdf', 'page_num': 5}
+    },
+]
+
+MERGED = (
+    "Alpha sentence one is here. Beta sentence two is here. "
+    "Gamma sentence three is here. Delta sentence four is here."
+)
+
+
+def test_packs_merged_deduplicated_blocks():
+    context, stats = ContextPacker(token_budget=None).pack(CHUNKS)
+
+    assert context == (
+        f"[Source 1: a.pdf, Page 1-2]\n{MERGED}\n\n"
+        "[Source 3: b.pdf, Page 5]\nLine one\nLine two\n"
+    )
+    assert (stats['blocks'], stats['merged_chunks'], stats['duplicate_spans']) == (2, 1, 1)
+
+
+def test_token_statistics():
+    packer = ContextPacker(token_budget=None)
+    _, stats = packer.pack(CHUNKS)
+
+    unpacked = sum(
+        packer.count_tokens(
+            packer._header(i, c['metadata']['source_file'], [str(c['metadata']['page_num'])])
+        ) + packer.count_tokens(c['text'])
+        for i, c in enumerate(CHUNKS, 1)
+    )
+    assert stats['unpacked_tokens'] == unpacked
+    assert stats['tokens_saved'] == stats['unpacked_tokens'] - stats['context_tokens']
+    assert not stats['exact_token_counts']
+
+
+@pytest.mark.parametrize("budget", [40, 30, 25, 10])
+def test_context_stays_within_budget(budget):
+    _, stats = ContextPacker(token_budget=budget, min_block_tokens=8).pack(CHUNKS)
+
+    assert 0 < stats['context_tokens'] <= budget
+
+
+def test_last_block_is_truncated_by_sentence():
+    context, stats = ContextPacker(token_budget=25, min_block_tokens=8).pack(CHUNKS)
+
+    assert context == "[Source 1: a.pdf, Page 1-2]\nAlpha sentence one is here. Beta sentence two is here.\n"
+    assert (stats['truncated_blocks'], stats['dropped_blocks']) == (1, 1)
+
+
+def test_small_remainder_drops_the_block():
+    # After the 35-token merged block, 5 tokens are left: below min_block_tokens
+    context, stats = ContextPacker(token_budget=40, min_block_tokens=8).pack(CHUNKS)
+
+    assert context == f"[Source 1: a.pdf, Page 1-2]\n{MERGED}\n"
+    assert stats['context_tokens'] == 35
+    assert (stats['truncated_blocks'], stats['dropped_blocks']) == (0, 1)
+
+
+def test_empty_input():
+    context, stats = ContextPacker(token_budget=100).pack([])
+    assert context == "No relevant context found."
+    assert stats['context_tokens'] == 0
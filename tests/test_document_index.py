@@ -0,0 +1,70 @@
+"""
+Tests for the document/section summary index used for two-level search.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval import DocumentSummaryIndex
+
+
+CHUNKS = [
+    {'source_file': 'a.pdf', 'chapter': 'One', 'page_num': 1},
+    {'source_file': 'a.pdf', 'chapter': 'One', 'page_num': 2},
+    {'source_file': 'b.pdf', 'chapter': '', 'page_num': 1},
+    {'source_file': 'b.pdf', 'chapter': '', 'page_num': 1},
+    {'source_file': 'b.pdf', 'chapter': '', 'page_num': 2},
+    {'source_file': 'c.pdf', 'page_num': 1},
+    {'source_file': 'd.pdf', 'page_num': 1},
+]
+EMBEDDINGS = np.array([
+    [1, 0, 0],
+    [1, 0, 0],
+    [0, 1, 0],
+    [0, 1, 0],
+    [0, 0, 1],  # b.pdf page 2: one relevant section in a mostly unrelated document
+    [0.6, 0.8, 0],
+    [0.5, 0, 0.866],
+])
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "document_index.npz")
+    counts = DocumentSummaryIndex.build(EMBEDDINGS, CHUNKS, path)
+    assert counts == {'documents': 4, 'sections': 5}
+    return DocumentSummaryIndex(path)
+
+
+def test_best_section_lifts_its_document(index):
+    # By document centroid d.pdf (0.87) beats b.pdf (0.45); b.pdf's page 2 scores 1.0
+    selection = index.select(np.array([0, 0, 1.0]), top_documents=1)
+    assert selection['documents'] == ['b.pdf']
+    assert selection['scores']['b.pdf'] == pytest.approx(1.0)
+
+
+def test_selects_top_documents_in_score_order(index):
+    selection = index.select(np.array([0, 0, 1.0]), top_documents=2)
+    assert selection['documents'] == ['b.pdf', 'd.pdf']
+    assert selection['scores']['d.pdf'] == pytest.approx(0.866, abs=1e-3)
+
+    selection = index.select(np.array([1.0, 0, 0]), top_documents=2)
+    assert selection['documents'] == ['a.pdf', 'c.pdf']
+
+
+def test_no_restriction_when_all_documents_fit(index):
+    assert index.select(np.array([1.0, 0, 0]), top_documents=4) == {'documents': [], 'scores': {}}
+    assert index.get_stats()['lookups'] == 1
+
+
+def test_missing_index_is_empty(tmp_path):
+    index = DocumentSummaryIndex(str(tmp_path / "missing.npz"))
+    assert len(index) == 0
+    assert index.select(np.array([1.0, 0, 0]))['documents'] == []
@@ -0,0 +1,77 @@
+"""
+Tests for the entity/location inverted index used to restrict or boost
+retrieval candidates.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval import EntityIndex
+
+
+# Every chunk names the studio; chunk-1 arrives with ChromaDB's str(list) form
+CHUNKS = [{'entities': ['Silverlight Studios']} for _ in range(10)]
+CHUNKS[0] = {'entities': ['Silverlight Studios', 'Mystwood Academy']}
+CHUNKS[1] = {'entities': "['Silverlight Studios', 'Mystwood Academy', 'Alexis Ravencroft']"}
+CHUNKS[2] = {'entities': ['Silverlight Studios'], 'locations': ['Western Town']}
+IDS = [f'chunk-{i}' for i in range(10)]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = EntityIndex(persist_path=str(tmp_path / "entity_index"), max_restrict=40, max_df=0.2)
+    index.build(CHUNKS, IDS)
+    return index
+
+
+def test_build_indexes_every_field(index):
+    assert index.postings['mystwood academy'] == [0, 1]
+    assert index.postings['western town'] == [2]
+    assert len(index.postings['silverlight studios']) == 10
+
+
+def test_lookup_restricts_to_mentioned_chunks(index):
+    match = index.lookup("Did Alexis Ravencroft film at Mystwood Academy?")
+
+    assert match['mentions'] == ['alexis ravencroft', 'mystwood academy']
+    assert match['mode'] == 'restrict'
+    assert match['matches'] == {'chunk-0': 1, 'chunk-1': 2}
+
+
+def test_common_terms_are_ignored(index):
+    # "Silverlight Studios" is in every chunk, above max_df
+    assert index.lookup("Tours of Silverlight Studios") is None
+    assert index.lookup("Where is the cafeteria?") is None
+
+
+def test_large_posting_sets_only_boost(tmp_path):
+    index = EntityIndex(persist_path=str(tmp_path / "entity_index"), max_restrict=1)
+    index.build(CHUNKS, IDS)
+
+    match = index.lookup("Mystwood Academy")
+    assert match['mode'] == 'boost'
+    assert index.get_stats()['boosted'] == 1
+
+
+def test_index_reloads_from_disk(index):
+    reloaded = EntityIndex(persist_path=str(index.persist_path))
+    assert reloaded.lookup("Western Town")['matches'] == {'chunk-2': 1}
+
+
+def test_entity_boost_is_stable():
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("chromadb")
+    pytest.importorskip("rank_bm25")
+    from src.retrieval import RAGRetriever
+
+    candidates = [{'id': f'chunk-{i}'} for i in range(4)]
+    boosted = RAGRetriever._entity_boost(candidates, {'chunk-2': 1, 'chunk-3': 2})
+
+    assert [c['id'] for c in boosted] == ['chunk-3', 'chunk-2', 'chunk-0', 'chunk-1']
+    assert [c['entity_matches'] for c in boosted] == [2, 1, 0, 0]
@@ -0,0 +1,100 @@
+"""
+Tests for FAQ pair extraction and direct-answer matching.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import FAQIndex, extract_qa_pairs
+
+
+PAGES = [
+    {
+        'source_file': 'faq.pdf',
+        'page_num': 1,
+        'text': (
+            "# Visiting\n"
+            "Intro text before any question.\n"
+            "**Q: What are the opening hours?**\n"
+            "A: 9am to 6pm daily.\n"
+            "Holiday hours may differ.\n"
+            "Q: Is parking\n"
+            "available on site?\n"
+            "A. Yes, in lot B.\n"
+            "## Tickets\n"
+            "Q: Can I get a refund?\n"
+        )
+    },
+    {
+        'source_file': 'faq.pdf',
+        'page_num': 2,
+        'text': "A: Refunds are given up to 24 hours before the tour.\n---\nQ: Dangling question?\n"
+    },
+]
+
+
+def test_extract_qa_pairs():
+    pairs = extract_qa_pairs(PAGES)
+
+    assert [(p['question'], p['answer']) for p in pairs] == [
+        ("What are the opening hours?", "9am to 6pm daily.\nHoliday hours may differ."),
+        ("Is parking available on site?", "Yes, in lot B."),
+        ("Can I get a refund?", "Refunds are given up to 24 hours before the tour."),
+    ]
+    # A pair keeps the page its question is on
+    assert [(p['source_file'], p['page_num']) for p in pairs] == [
+        ('faq.pdf', 1), ('faq.pdf', 1), ('faq.pdf', 1)
+    ]
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = FAQIndex(persist_path=str(tmp_path / "faq_index"), match_threshold=0.9, lexical_margin=0.05)
+    index.build(extract_qa_pairs(PAGES), np.eye(3))
+    return index
+
+
+def near(axis, similarity):
+    """Unit vector with the given cosine similarity to a basis axis"""
+    vector = np.zeros(3)
+    vector[axis] = similarity
+    vector[(axis + 1) % 3] = np.sqrt(1 - similarity ** 2)
+    return vector
+
+
+def test_match_by_embedding(index):
+    match = index.match("When do you open?", np.eye(3)[0])
+    assert match['answer'].startswith("9am to 6pm")
+    assert match['matched_by'] == 'embedding'
+    assert match['confidence'] == pytest.approx(1.0)
+
+
+def test_near_miss_needs_keyword_agreement(index):
+    query_embedding = near(1, 0.87)
+
+    match = index.match("is there parking on site", query_embedding)
+    assert match is not None and match['matched_by'] == 'embedding+bm25'
+    assert match['question'] == "Is parking available on site?"
+
+    # BM25 points at another question
+    assert index.match("refund", query_embedding) is None
+
+
+def test_no_match_below_threshold(index):
+    assert index.match("is there parking on site", near(1, 0.7)) is None
+    assert index.get_stats()['lookups'] == 1 and index.get_stats()['matches'] == 0
+
+
+def test_index_reloads_from_disk(index):
+    reloaded = FAQIndex(persist_path=str(index.persist_path))
+    assert len(reloaded) == 3
+    assert reloaded.match("Refund?", np.eye(3)[2])['question'] == "Can I get a refund?"
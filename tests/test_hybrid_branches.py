@@ -0,0 +1,121 @@
+"""
+Tests for the concurrent dense and sparse branches of hybrid retrieval:
+per-branch timings, BM25 running on the branch executor, and the same fused
+ranking as running the branches one after the other.
+"""
+
+import sys
+import threading
+import time
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import RAGRetriever, ChunkTable
+
+
+BRANCH_SECONDS = 0.1
+CORPUS = [f'chunk-{i}' for i in range(12)]
+
+
+class FakeEmbeddingService:
+    def embed_query(self, query):
+        return np.array([float(len(query))])
+
+    def embed_texts(self, texts):
+        return np.array([[float(len(text))] for text in texts])
+
+
+class SlowVectorStore:
+    """Ranks the corpus by a query-dependent stride after a fixed delay"""
+
+    def query_collection(self, query_embeddings=None, top_k=25, filter_metadata=None, **kwargs):
+        time.sleep(BRANCH_SECONDS)
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        for embedding in query_embeddings:
+            stride = int(embedding[0]) % 5 + 1
+            ids = sorted(CORPUS, key=lambda i: (int(i.split('-')[1]) * stride) % 13)[:top_k]
+            results['ids'].append(ids)
+            results['documents'].append(ids)
+            results['metadatas'].append([{} for _ in ids])
+            results['distances'].append([0.05 * rank for rank in range(len(ids))])
+        return results
+
+
+class SlowBM25Index:
+    """BM25 stand-in sharing chunk IDs with the vector store; records its thread"""
+
+    has_shared_ids = True
+    doc_ids = CORPUS
+    chunk_table = ChunkTable.from_records([{} for _ in CORPUS])
+
+    def __init__(self):
+        self.threads = []
+
+    def search(self, query, top_k=25, **kwargs):
+        self.threads.append(threading.current_thread().name)
+        time.sleep(BRANCH_SECONDS)
+        offset = len(query) % len(CORPUS)
+        order = [(offset + 3 * i) % len(CORPUS) for i in range(min(top_k, len(CORPUS)))]
+        return [(idx, float(len(order) - rank)) for rank, idx in enumerate(order)]
+
+    def text_at(self, idx):
+        return CORPUS[idx]
+
+
+@pytest.fixture
+def retriever():
+    retriever = RAGRetriever(
+        vector_store=SlowVectorStore(),
+        embedding_service=FakeEmbeddingService(),
+        use_reranking=False
+    )
+    retriever.bm25_index = SlowBM25Index()
+    return retriever
+
+
+def test_branches_run_concurrently(retriever):
+    retriever._hybrid_retrieve("where is the saloon", top_k=8, similarity_threshold=0.0)
+
+    assert all(name.startswith("hybrid-branch") for name in retriever.bm25_index.threads)
+    timings = retriever.get_branch_timing_stats()
+    assert timings['dense']['last_ms'] >= BRANCH_SECONDS * 1000
+    assert timings['sparse']['last_ms'] >= BRANCH_SECONDS * 1000
+    # Close to the slower branch, well below the sum of both
+    assert timings['hybrid']['last_ms'] < 0.75 * (timings['dense']['last_ms'] + timings['sparse']['last_ms'])
+
+
+def test_branch_timing_stats_accumulate(retriever):
+    for query in ("saloon", "parking"):
+        retriever._hybrid_retrieve(query, top_k=4, similarity_threshold=0.0)
+
+    timings = retriever.get_branch_timing_stats()
+    assert set(timings) == {'dense', 'sparse', 'hybrid'}
+    for stats in timings.values():
+        assert stats['calls'] == 2
+        assert stats['max_ms'] >= stats['mean_ms'] > 0
+
+
+def test_parallel_matches_serial_fusion(retriever):
+    variants = ["where is the saloon", "saloon location on the backlot"]
+    parallel = retriever._hybrid_retrieve(
+        variants[0], top_k=8, similarity_threshold=0.0, alpha=0.6, query_variants=variants
+    )
+
+    serial = retriever._reciprocal_rank_fusion(
+        retriever._dense_retrieve_many(variants, 8),
+        retriever._sparse_retrieve_many(variants, 8),
+        alpha=0.6
+    )
+
+    assert [r['id'] for r in parallel] == [r['id'] for r in serial]
+    assert [r['fusion_score'] for r in parallel] == [r['fusion_score'] for r in serial]
@@ -0,0 +1,143 @@
+"""
+Tests for the learned ranker distilled from cross-encoder scores: feature
+extraction, fitting, the saved model, and the cross-encoder fallback when a
+saved model no longer matches the feature set.
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval.learned_ranker import LearnedRanker, FEATURE_NAMES
+
+
+def training_data(num_samples=200):
+    rng = np.random.default_rng(0)
+    features = rng.normal(size=(num_samples, len(FEATURE_NAMES)))
+    features[:, FEATURE_NAMES.index('in_dense')] = 1.0  # Constant column
+    weights = rng.normal(size=len(FEATURE_NAMES))
+    return features, features @ weights + 0.5
+
+
+@pytest.fixture
+def model_path(tmp_path):
+    ranker = LearnedRanker()
+    ranker.fit(*training_data(), l2=1e-6)
+    path = tmp_path / "learned_ranker.json"
+    ranker.save(str(path))
+    return path
+
+
+def test_extract_features():
+    candidates = [
+        {'id': 'a', 'text': 'abc', 'similarity': 0.8, 'dense_rank': 0, 'sparse_rank': 1,
+         'bm25_score': np.e - 1, 'fusion_score': 0.03,
+         'metadata': {'entities': "['Mystwood Academy']", 'locations': ['Backlot']}},
+        {'id': 'b', 'text': '', 'metadata': None},
+    ]
+    features = LearnedRanker().extract_features("Was Mystwood Academy shot on the backlot?", candidates)
+
+    assert features.shape == (2, len(FEATURE_NAMES))
+    row = dict(zip(FEATURE_NAMES, features[0]))
+    assert row['similarity'] == 0.8
+    assert row['log_bm25_score'] == pytest.approx(1.0)
+    assert (row['dense_reciprocal_rank'], row['sparse_reciprocal_rank']) == (1.0, 0.5)
+    assert (row['in_dense'], row['in_sparse']) == (1.0, 1.0)
+    assert (row['entity_matches'], row['location_matches']) == (1, 1)
+    assert not features[1].any()
+
+
+def test_fit_recovers_a_linear_target():
+    features, labels = training_data()
+    ranker = LearnedRanker()
+    ranker.fit(features, labels, l2=1e-6)
+
+    np.testing.assert_allclose(ranker.predict(features), labels, atol=1e-3)
+    assert ranker.std[FEATURE_NAMES.index('in_dense')] == 1.0
+    assert ranker.metadata['num_samples'] == 200
+    assert ranker.metadata['train_rmse'] < 1e-3
+
+
+def test_save_load_round_trip(model_path):
+    features, _ = training_data(20)
+    saved = json.loads(model_path.read_text())
+    loaded = LearnedRanker.load(str(model_path))
+
+    assert loaded.metadata == saved['metadata']
+    np.testing.assert_allclose(
+        loaded.predict(features),
+        ((features - saved['mean']) / saved['std']) @ np.array(saved['weights']) + saved['bias']
+    )
+
+
+def test_load_rejects_other_features(model_path):
+    saved = json.loads(model_path.read_text())
+    saved['feature_names'] = saved['feature_names'][:-1]
+    model_path.write_text(json.dumps(saved))
+
+    with pytest.raises(ValueError):
+        LearnedRanker.load(str(model_path))
+
+
+class FakeReranker:
+    """Cross-encoder stand-in preferring the last chunk"""
+
+    def score(self, query, candidates):
+        return np.array([float(c['id'].split('-')[1]) for c in candidates])
+
+
+class FakeEmbeddingService:
+    def embed_query(self, query):
+        return np.array([1.0, 0.0])
+
+    def embed_texts(self, texts):
+        return np.array([[1.0, 0.0] for _ in texts])
+
+
+class FakeVectorStore:
+    def query_collection(self, query_embedding=None, top_k=25, filter_metadata=None,
+                         query_embeddings=None, **kwargs):
+        ids = [f'chunk-{i}' for i in range(3)]
+        return {
+            'ids': [ids],
+            'documents': [[f'text {i}' for i in ids]],
+            'metadatas': [[{} for _ in ids]],
+            'distances': [[0.1, 0.2, 0.3]]
+        }
+
+
+def test_stale_model_falls_back_to_the_cross_encoder(model_path, monkeypatch):
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("chromadb")
+    pytest.importorskip("rank_bm25")
+    from src.retrieval import RAGRetriever, RetrievalOptions
+
+    saved = json.loads(model_path.read_text())
+    saved['feature_names'] = list(reversed(saved['feature_names']))
+    model_path.write_text(json.dumps(saved))
+    monkeypatch.setattr(RAGRetriever, '_load_reranker', staticmethod(lambda *args: FakeReranker()))
+
+    retriever = RAGRetriever(
+        vector_store=FakeVectorStore(),
+        embedding_service=FakeEmbeddingService(),
+        use_reranking=True,
+        rerank_mode="learned",
+        learned_ranker_path=str(model_path),
+        rerank_cache_size=0
+    )
+    assert retriever.learned_ranker is None
+    assert retriever.rerank_mode == "full"
+
+    options = RetrievalOptions(
+        use_hybrid_search=False, similarity_threshold=0.0, final_top_n=3, rerank_mode="learned"
+    )
+    results = retriever.retrieve("who built the saloon", options)
+    assert [r['id'] for r in results] == ['chunk-2', 'chunk-1', 'chunk-0']
+    assert all('rerank_score' in r and 'learned_score' not in r for r in results)
@@ -0,0 +1,81 @@
+"""
+Tests for maximal marginal relevance selection of the final results.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import RAGRetriever
+
+
+EMBEDDINGS = {
+    'a': [1.0, 0.0],
+    'b': [0.99, 0.14],  # Near-duplicate of a
+    'c': [0.0, 1.0],
+    'd': [0.7, 0.7],
+}
+
+
+class FakeVectorStore:
+    """Returns stored embeddings for the chunks it knows"""
+
+    def get_embeddings(self, ids):
+        known = [i for i in ids if i in EMBEDDINGS]
+        return {'ids': known, 'embeddings': [EMBEDDINGS[i] for i in known]}
+
+
+@pytest.fixture
+def retriever():
+    return RAGRetriever(
+        vector_store=FakeVectorStore(),
+        embedding_service=None,
+        use_reranking=False,
+        mmr_pool_factor=2
+    )
+
+
+def ranked(*scores):
+    return [
+        {'id': chunk_id, 'text': chunk_id, 'rerank_score': score}
+        for chunk_id, score in scores
+    ]
+
+
+def ids(results):
+    return [r['id'] for r in results]
+
+
+def test_lambda_one_keeps_relevance_order(retriever):
+    candidates = ranked(('a', 1.0), ('b', 0.95), ('c', 0.7), ('d', 0.6))
+    assert ids(retriever._mmr_select(candidates, 2, 1.0)) == ['a', 'b', 'c', 'd']
+
+
+def test_lambda_below_one_drops_near_duplicate(retriever):
+    candidates = ranked(('a', 1.0), ('b', 0.95), ('c', 0.7))
+
+    # After a, b scores 0.5 * 0.83 - 0.5 * 0.99 < 0, c scores 0.5 * 0 - 0
+    results = retriever._mmr_select(candidates, 2, 0.5)
+    assert ids(results) == ['a', 'c', 'b']
+    assert [r.get('mmr_rank') for r in results] == [0, 1, None]
+
+
+def test_only_the_pool_is_diversified(retriever):
+    # pool = top_n * mmr_pool_factor = 2: c is outside it and cannot replace b
+    retriever.mmr_pool_factor = 1
+    candidates = ranked(('a', 1.0), ('b', 0.95), ('c', 0.7))
+    assert ids(retriever._mmr_select(candidates, 2, 0.5)) == ['a', 'b', 'c']
+
+
+def test_missing_embeddings_keep_the_ranking(retriever):
+    candidates = ranked(('a', 1.0), ('legacy', 0.95), ('c', 0.7))
+    assert ids(retriever._mmr_select(candidates, 2, 0.5)) == ['a', 'legacy', 'c']
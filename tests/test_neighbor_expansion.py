@@ -0,0 +1,91 @@
+"""
+Tests for small-to-big expansion of ranked hits to their neighboring chunks.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import RAGRetriever
+
+
+def linked_chunks(prefix, count):
+    """Chunks of one document linked by prev/next IDs, as written at ingestion"""
+    return {
+        f'{prefix}{i}': {
+            'text': f'{prefix}{i} text',
+            'metadata': {
+                'prev_chunk_id': f'{prefix}{i - 1}' if i > 0 else '',
+                'next_chunk_id': f'{prefix}{i + 1}' if i < count - 1 else ''
+            }
+        }
+        for i in range(count)
+    }
+
+
+STORE = {**linked_chunks('c', 10), **linked_chunks('d', 3)}
+
+
+class FakeVectorStore:
+    """Looks chunks up by ID and records each batched call"""
+
+    def __init__(self):
+        self.calls = []
+
+    def get_by_ids(self, ids, include=None):
+        self.calls.append(list(ids))
+        known = [i for i in ids if i in STORE]
+        return {
+            'ids': known,
+            'documents': [STORE[i]['text'] for i in known],
+            'metadatas': [dict(STORE[i]['metadata']) for i in known]
+        }
+
+
+@pytest.fixture
+def retriever():
+    return RAGRetriever(vector_store=FakeVectorStore(), embedding_service=None, use_reranking=False)
+
+
+def hits(*chunk_ids):
+    return [
+        {'id': i, 'text': STORE[i]['text'], 'metadata': dict(STORE[i]['metadata'])}
+        for i in chunk_ids
+    ]
+
+
+def test_window_zero_is_a_no_op(retriever):
+    results = hits('c5')
+    assert retriever._expand_neighbors(results, 0) is results
+    assert retriever.vector_store.calls == []
+
+
+def test_touching_windows_merge_into_the_best_hit(retriever):
+    results = retriever._expand_neighbors(hits('c5', 'c2', 'c3', 'd1'), 1)
+
+    assert [r['id'] for r in results] == ['c5', 'd1']
+    assert results[0]['expanded_chunk_ids'] == ['c1', 'c2', 'c3', 'c4', 'c5', 'c6']
+    assert results[0]['merged_hit_ids'] == ['c5', 'c2', 'c3']
+    assert results[0]['text'] == "\n".join(f'c{i} text' for i in range(1, 7))
+    assert results[0]['hit_text'] == 'c5 text'
+    assert results[1]['expanded_chunk_ids'] == ['d0', 'd1', 'd2']
+
+    # One batched fetch for the single ring, without duplicates or known hits
+    assert len(retriever.vector_store.calls) == 1
+    assert sorted(retriever.vector_store.calls[0]) == ['c1', 'c4', 'c6', 'd0', 'd2']
+
+
+def test_wider_window_fetches_one_ring_per_hop(retriever):
+    results = retriever._expand_neighbors(hits('c0', 'c9'), 2)
+
+    assert [r['expanded_chunk_ids'] for r in results] == [['c0', 'c1', 'c2'], ['c7', 'c8', 'c9']]
+    assert [sorted(call) for call in retriever.vector_store.calls] == [['c1', 'c8'], ['c2', 'c7']]
@@ -0,0 +1,81 @@
+"""
+Tests for the follow-up query condenser's carry-over rules.
+"""
+
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.query import QueryCondenser
+
+
+def history(*user_turns):
+    messages = []
+    for turn in user_turns:
+        messages.append({'role': 'user', 'content': turn})
+        messages.append({'role': 'assistant', 'content': 'Michael Bay Jr. directed it.'})
+    return messages
+
+
+FIRST_TURN = "Who directed Maximum Velocity on the Western Town set?"
+
+
+def test_key_terms_prefer_longest_names():
+    condenser = QueryCondenser()
+    assert condenser.key_terms(FIRST_TURN) == ['Maximum Velocity', 'Western Town']
+    # "Silverlight" is contained in "Silverlight Studios" and dropped
+    assert condenser.key_terms("Tours of Silverlight Studios") == ['Silverlight Studios']
+
+
+def test_anaphoric_follow_up_carries_previous_entities():
+    condenser = QueryCondenser()
+    assert condenser.condense("When was it filmed?", history(FIRST_TURN)) == (
+        "When was it filmed? Maximum Velocity Western Town"
+    )
+
+
+def test_self_contained_question_is_unchanged():
+    condenser = QueryCondenser()
+    query = "Tell me about Mystwood Academy"
+    assert condenser.condense(query, history(FIRST_TURN)) == query
+    assert condenser.condense("When was it filmed?", []) == "When was it filmed?"
+
+
+def test_topic_change_without_anaphor_is_unchanged():
+    condenser = QueryCondenser()
+    query = "what time does the park open?"
+    assert condenser.condense(query, history(FIRST_TURN)) == query
+
+
+def test_terms_already_in_the_query_are_not_repeated():
+    condenser = QueryCondenser()
+    assert condenser.condense("Is it near Western Town?", history(FIRST_TURN)) == (
+        "Is it near Western Town? Maximum Velocity"
+    )
+
+
+def test_current_question_in_history_is_skipped():
+    condenser = QueryCondenser(max_lookback_turns=1)
+    query = "When was it filmed?"
+    messages = history(FIRST_TURN) + [{'role': 'user', 'content': query}]
+    assert condenser.condense(query, messages).endswith("Maximum Velocity Western Town")
+
+
+def test_lookback_stops_at_the_newest_turn_with_terms():
+    condenser = QueryCondenser(max_lookback_turns=2)
+    messages = history("Tell me about Mystwood Academy", "What happened next?")
+    assert condenser.condense("Who starred in it?", messages) == "Who starred in it? Mystwood Academy"
+
+    # One turn back only sees the turn without key terms
+    condenser = QueryCondenser(max_lookback_turns=1)
+    assert condenser.condense("Who starred in it?", messages) == "Who starred in it?"
+
+
+def test_condensed_query_is_capped():
+    condenser = QueryCondenser(max_query_tokens=4, max_carryover_terms=1)
+    assert condenser.condense("When was it filmed there?", history(FIRST_TURN)) == (
+        "When was Maximum Velocity"
+    )
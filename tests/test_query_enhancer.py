@@ -0,0 +1,107 @@
+"""
+Tests for query variants: each variant is a full rewrite of the question,
+so fusing their rankings keeps the original query's best hit on top.
+"""
+
+import re
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.query import QueryEnhancer
+
+
+QUERY = "When does the backlot tour start?"
+
+
+def test_variants_rewrite_the_whole_query():
+    assert QueryEnhancer().get_query_variants(QUERY) == [
+        "When does the backlot tour start?",
+        "When does the studio tour start?",
+        "When does the backlot sets tour start?",
+    ]
+
+
+def test_expansion_replaces_the_phrase_in_use():
+    enhancer = QueryEnhancer()
+    assert enhancer.get_query_variants("Can I visit a sound stage?") == [
+        "Can I visit a sound stage?", "Can I visit a soundstage?"
+    ]
+    assert enhancer.get_query_variants("What did SS film?") == ["What did silverlight studios film?"]
+
+
+# The answer, and a generic chunk that matches both expansion phrases best
+CORPUS = {
+    'answer': "when does the backlot tour start it starts at nine",
+    'overview': "studio tour and backlot sets",
+    'parking': "parking is free for visitors",
+}
+
+
+def words(text):
+    return re.findall(r"[a-z]+", text.lower())
+
+
+VOCABULARY = sorted({w for text in CORPUS.values() for w in words(text)} | set(words(QUERY)))
+
+
+def embed(text):
+    vector = np.array([words(text).count(w) for w in VOCABULARY], dtype=np.float32)
+    return vector / max(np.linalg.norm(vector), 1e-12)
+
+
+class BagOfWordsEmbeddingService:
+    def embed_query(self, query):
+        return embed(query)
+
+    def embed_texts(self, texts):
+        return np.array([embed(text) for text in texts])
+
+
+class BagOfWordsVectorStore:
+    """Ranks the corpus by cosine similarity of word counts"""
+
+    def query_collection(self, query_embeddings=None, top_k=25, filter_metadata=None, **kwargs):
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        for query_embedding in query_embeddings:
+            similarity = {i: float(embed(text) @ np.array(query_embedding)) for i, text in CORPUS.items()}
+            ids = sorted(CORPUS, key=lambda i: -similarity[i])[:top_k]
+            results['ids'].append(ids)
+            results['documents'].append([CORPUS[i] for i in ids])
+            results['metadatas'].append([{} for _ in ids])
+            results['distances'].append([1 - similarity[i] for i in ids])
+        return results
+
+
+def test_original_top_hit_survives_fusion():
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("chromadb")
+    pytest.importorskip("rank_bm25")
+    from src.retrieval import RAGRetriever, RetrievalOptions
+
+    retriever = RAGRetriever(
+        vector_store=BagOfWordsVectorStore(),
+        embedding_service=BagOfWordsEmbeddingService(),
+        use_reranking=False
+    )
+    options = RetrievalOptions(
+        use_reranking=False, use_hybrid_search=False, similarity_threshold=0.0, final_top_n=2
+    )
+
+    alone = retriever.retrieve(QUERY, options)
+    assert alone[0]['id'] == 'answer'
+
+    fused = retriever.retrieve(
+        QUERY, options, query_variants=QueryEnhancer().get_query_variants(QUERY)
+    )
+    assert fused[0]['id'] == 'answer'
+
+    # Bare expansion phrases each rank the generic chunk first and outvote the question
+    bare = retriever.retrieve(QUERY, options, query_variants=[QUERY, "studio tour", "backlot sets"])
+    assert bare[0]['id'] == 'overview'
@@ -0,0 +1,84 @@
+"""
+Tests for QueryRouter.route: abstaining, keyword-only routing and routing
+with nearest-centroid probabilities.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.query import QueryRouter
+
+
+FAQ, PRODUCTION, TOUR = np.eye(3)
+
+
+@pytest.fixture
+def centroids_path(tmp_path):
+    path = str(tmp_path / "router_centroids.npz")
+    QueryRouter.build_centroids(
+        np.array([FAQ, FAQ, PRODUCTION, TOUR]), ['faq', 'faq', 'production', 'tour'], path
+    )
+    return path
+
+
+def test_abstains_without_signal():
+    route = QueryRouter().route("hello there")
+    assert route['document_types'] == [] and route['reason'] == 'no_signal'
+
+
+def test_single_keyword_does_not_route_alone():
+    # One 'sheriff' hit for backlot is below min_keyword_votes
+    route = QueryRouter().route("who is the sheriff")
+    assert route['document_types'] == [] and route['reason'] == 'no_signal'
+
+    route = QueryRouter(min_keyword_votes=1).route("who is the sheriff")
+    assert route['document_types'] == ['backlot'] and route['confidence'] == 1.0
+
+
+def test_keyword_only_routing():
+    # 'guided' and 'tour' both vote for tour
+    route = QueryRouter().route("guided tour")
+    assert route == {
+        'document_types': ['tour'], 'confidence': 1.0, 'scores': {'tour': 1.0}, 'reason': 'routed'
+    }
+
+
+def test_centroid_routing(centroids_path):
+    router = QueryRouter(centroids_path=centroids_path)
+    route = router.route("hello there", FAQ)
+    assert route['document_types'] == ['faq']
+    assert route['confidence'] == pytest.approx(1.0)
+
+
+def test_centroids_abstain_when_unsure(centroids_path):
+    router = QueryRouter(centroids_path=centroids_path, min_confidence=0.8)
+    route = router.route("hello there", np.ones(3) / np.sqrt(3))
+    assert route['document_types'] == [] and route['reason'] == 'unsure'
+    assert route['confidence'] == pytest.approx(2 / 3)
+
+
+def test_weak_vote_needs_centroid_agreement(centroids_path):
+    router = QueryRouter(centroids_path=centroids_path)
+
+    # One 'film' hit counts when the centroids also point to production...
+    route = router.route("tell me about the film", PRODUCTION)
+    assert route['document_types'] == ['production']
+
+    # ...and is ignored when they do not
+    route = router.route("tell me about the film", FAQ)
+    assert route['document_types'] == ['faq']
+    assert route['scores']['production'] < 1e-6
+
+
+def test_strong_vote_combines_with_centroids(centroids_path):
+    router = QueryRouter(centroids_path=centroids_path, keyword_weight=0.5)
+    route = router.route("guided tour", FAQ)
+    assert sorted(route['document_types']) == ['faq', 'tour']
+    assert route['scores']['tour'] == pytest.approx(0.5)
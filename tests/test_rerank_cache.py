@@ -0,0 +1,107 @@
+"""
+Tests for the cross-encoder rerank score cache: LRU eviction, hit/miss
+statistics and key isolation across queries and reranker models.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval import RerankScoreCache
+
+
+MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+
+
+def keys(query, chunk_ids, model=MODEL):
+    query_hash = RerankScoreCache.hash_query(query)
+    return [RerankScoreCache.make_key(query_hash, chunk_id, model) for chunk_id in chunk_ids]
+
+
+def test_evicts_least_recently_used():
+    cache = RerankScoreCache(max_size=2)
+    a, b, c = keys("query", ['a', 'b', 'c'])
+
+    cache.put_many([a, b], [1.0, 2.0])
+    cache.get_many([a])  # a is now more recent than b
+    cache.put_many([c], [3.0])
+
+    assert cache.get_many([a, b, c]) == [1.0, None, 3.0]
+    assert cache.get_stats()['evictions'] == 1
+    assert cache.get_stats()['size'] == 2
+
+
+def test_hit_and_miss_stats():
+    cache = RerankScoreCache(max_size=8)
+    a, b = keys("query", ['a', 'b'])
+    cache.put_many([a], [0.5])
+
+    assert cache.get_many([a, b, a]) == [0.5, None, 0.5]
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses']) == (2, 1)
+    assert stats['hit_rate'] == pytest.approx(2 / 3)
+
+    cache.clear()
+    assert cache.get_stats()['hits'] == 0 and cache.get_stats()['size'] == 0
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = RerankScoreCache(max_size=0)
+    cache.put_many(keys("query", ['a']), [1.0])
+    assert cache.get_stats()['size'] == 0
+
+
+def test_keys_are_isolated_by_model_and_query():
+    cache = RerankScoreCache(max_size=8)
+    cache.put_many(keys("Who directed  it?", ['a']), [1.0])
+
+    # Normalized query text shares the entry; another model or query does not
+    assert cache.get_many(keys("who directed it?", ['a'])) == [1.0]
+    assert cache.get_many(keys("who directed it?", ['a'], model="other-model")) == [None]
+    assert cache.get_many(keys("who produced it?", ['a'])) == [None]
+
+
+class CountingReranker:
+    """Cross-encoder stand-in recording which chunks it scored"""
+
+    def __init__(self, scale):
+        self.scale = scale
+        self.scored = []
+
+    def score(self, query, candidates):
+        self.scored.extend(c['id'] for c in candidates)
+        return np.array([self.scale * (i + 1) for i in range(len(candidates))], dtype=float)
+
+
+def test_retriever_scores_only_cache_misses_per_model():
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("chromadb")
+    pytest.importorskip("rank_bm25")
+    from src.retrieval import RAGRetriever
+
+    retriever = RAGRetriever(
+        vector_store=None,
+        embedding_service=None,
+        use_reranking=False,
+        rerank_cache_size=16
+    )
+    candidates = [{'id': f'chunk-{i}', 'text': f'chunk {i}'} for i in range(3)]
+
+    retriever.reranker = first = CountingReranker(1.0)
+    retriever._rerank("query", [dict(c) for c in candidates])
+    retriever._rerank("query", [dict(c) for c in candidates])
+    assert first.scored == ['chunk-0', 'chunk-1', 'chunk-2']
+
+    # Scores of another model are not reused
+    retriever.reranker_model = "other-model"
+    retriever.reranker = second = CountingReranker(10.0)
+    results = retriever._rerank("query", [dict(c) for c in candidates])
+    assert second.scored == ['chunk-0', 'chunk-1', 'chunk-2']
+    assert [r['rerank_score'] for r in results] == [30.0, 20.0, 10.0]
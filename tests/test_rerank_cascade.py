@@ -0,0 +1,86 @@
+"""
+Tests for the cascade rerank budget: how many candidates go to the
+cross-encoder for a given first-stage score shape and latency budget.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import RAGRetriever
+
+
+class FakeReranker:
+    """Cross-encoder stand-in scoring chunks by their index"""
+
+    def __init__(self):
+        self.scored = []
+
+    def score(self, query, candidates):
+        self.scored.append([c['id'] for c in candidates])
+        return np.array([float(c['id'].split('-')[1]) for c in candidates])
+
+
+@pytest.fixture
+def retriever():
+    retriever = RAGRetriever(
+        vector_store=None,
+        embedding_service=None,
+        use_reranking=False,
+        rerank_cache_size=0,
+        cascade_mass=0.9,
+        cascade_temperature=0.1,
+        cascade_latency_budget_ms=150.0
+    )
+    retriever.reranker = FakeReranker()
+    return retriever
+
+
+def test_peaked_scores_need_few_candidates(retriever):
+    # Softmax mass of [1.0, 0.9, 0.5, 0, 0, 0] at T=0.1 passes 0.9 at the second score
+    scores = np.array([1.0, 0.9, 0.5, 0.0, 0.0, 0.0])
+    assert retriever._cascade_budget(scores, final_top_n=1) == 2
+
+    # Never fewer than the caller needs
+    assert retriever._cascade_budget(scores, final_top_n=4) == 4
+
+
+def test_flat_scores_need_many_candidates(retriever):
+    # Equal weights: 9 of 10 candidates cover 0.9 of the mass
+    assert retriever._cascade_budget(np.full(10, 0.5), final_top_n=2) == 9
+
+
+def test_latency_budget_caps_the_head(retriever):
+    # 300 ms for 10 pairs: 30 ms per pair, so 150 ms fits 5 pairs
+    retriever._record_rerank_cost(0.3, 10)
+    assert retriever._cascade_budget(np.full(10, 0.5), final_top_n=2) == 5
+
+    # The cap never drops below final_top_n
+    assert retriever._cascade_budget(np.full(10, 0.5), final_top_n=7) == 7
+
+
+def test_short_lists_are_reranked_whole(retriever):
+    assert retriever._cascade_budget(np.array([1.0, 0.0]), final_top_n=5) == 2
+
+
+def test_cascade_reranks_only_the_head(retriever):
+    candidates = [
+        {'id': f'chunk-{i}', 'text': f'chunk {i}', 'fusion_score': score}
+        for i, score in enumerate([0.1, 1.0, 0.9, 0.5, 0.0, 0.0])
+    ]
+
+    results = retriever._cascade_rerank("query", candidates, final_top_n=1)
+
+    # Head of two by first-stage score, reranked; the tail keeps first-stage order
+    assert retriever.reranker.scored == [['chunk-1', 'chunk-2']]
+    assert [r['id'] for r in results] == ['chunk-2', 'chunk-1', 'chunk-3', 'chunk-0', 'chunk-4', 'chunk-5']
@@ -0,0 +1,114 @@
+"""
+Tests for skipping the reranker on confident first-stage rankings: the
+first-stage confidence, the skip decision at the calibrated threshold, and
+the threshold chosen by scripts/calibrate_rerank_skip.py.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import RAGRetriever
+from scripts.calibrate_rerank_skip import choose_threshold, write_threshold
+
+
+def candidate(chunk_id, dense_rank=None, similarity=None, sparse_rank=None, bm25_score=None):
+    result = {'id': chunk_id, 'text': chunk_id}
+    if dense_rank is not None:
+        result.update(dense_rank=dense_rank, similarity=similarity)
+    if sparse_rank is not None:
+        result.update(sparse_rank=sparse_rank, bm25_score=bm25_score)
+    return result
+
+
+# Both branches agree on chunk a: dense gap (0.8 - 0.6) / 0.8 = 0.25,
+# BM25 gap (10 - 5) / 10 = 0.5, so the confidence is 0.25
+AGREEING = [
+    candidate('a', 0, 0.8, 0, 10.0),
+    candidate('b', 1, 0.6, 1, 5.0),
+    candidate('c', 2, 0.5),
+]
+
+
+@pytest.fixture
+def retriever():
+    retriever = RAGRetriever(vector_store=None, embedding_service=None, use_reranking=False)
+    retriever.reranker = object()
+    return retriever
+
+
+def test_confidence_is_the_smaller_relative_gap(retriever):
+    assert retriever.first_stage_confidence(AGREEING) == pytest.approx(0.25)
+
+
+def test_no_confidence_when_branches_disagree(retriever):
+    candidates = [candidate('a', 0, 0.8, 1, 5.0), candidate('b', 1, 0.6, 0, 10.0)]
+    assert retriever.first_stage_confidence(candidates) == 0.0
+
+
+def test_variant_top_hits_do_not_collide(retriever):
+    # Chunk c tops a second query variant: it is the dense runner-up of a,
+    # whatever its position in the list
+    candidates = [candidate('c', 0, 0.79)] + AGREEING[:2]
+    assert retriever.first_stage_confidence(candidates) == pytest.approx(0.01 / 0.8)
+
+    # With the higher similarity, c is the dense top, which BM25 does not share
+    candidates = AGREEING[:2] + [candidate('c', 0, 0.85)]
+    assert retriever.first_stage_confidence(candidates) == 0.0
+
+
+def test_skip_decision_flips_at_the_threshold(retriever):
+    retriever.rerank_skip_threshold = 0.25
+    decision = retriever._rerank_decision(AGREEING)
+    assert not decision['reranked'] and decision['reason'] == 'confident_first_stage'
+
+    retriever.rerank_skip_threshold = 0.2501
+    decision = retriever._rerank_decision(AGREEING)
+    assert decision['reranked'] and decision['reason'] == 'low_first_stage_confidence'
+
+    retriever.rerank_skip_threshold = None
+    assert retriever._rerank_decision(AGREEING)['reranked']
+    assert not retriever._rerank_decision(AGREEING, use_reranking=False)['reranked']
+
+
+# (first-stage confidence, top chunk unchanged by reranking) per query
+OBSERVATIONS = [(0.9, True), (0.8, True), (0.6, False), (0.5, True), (0.0, False)]
+
+
+def test_choose_threshold_picks_lowest_qualifying_threshold():
+    # At 0.5 three of four skipped queries agree; at 0.8 both do
+    assert choose_threshold(OBSERVATIONS, target_agreement=0.9, min_support=2) == (0.8, 1.0, 0.4)
+    assert choose_threshold(OBSERVATIONS, target_agreement=0.7, min_support=2) == (0.5, 0.75, 0.8)
+
+
+def test_choose_threshold_requires_support():
+    assert choose_threshold(OBSERVATIONS, target_agreement=0.9, min_support=3) == (None, 0.0, 0.0)
+    assert choose_threshold([(0.0, True)], target_agreement=0.5, min_support=1) == (None, 0.0, 0.0)
+
+
+def test_write_threshold_keeps_comments(tmp_path):
+    config_path = tmp_path / "config.yaml"
+    config_path.write_text(
+        "retrieval:\n"
+        "  rerank_skip_threshold: null  # Set by calibration\n"
+        "  other: 1\n"
+    )
+    write_threshold(str(config_path), 0.25)
+    assert config_path.read_text() == (
+        "retrieval:\n"
+        "  rerank_skip_threshold: 0.2500  # Set by calibration\n"
+        "  other: 1\n"
+    )
+
+    config_path.write_text("rerank_skip_threshold: 0.1\n")
+    write_threshold(str(config_path), 0.5)
+    assert config_path.read_text() == "rerank_skip_threshold: 0.5000\n"
@@ -0,0 +1,103 @@
+"""
+Tests for the cross-encoder reranker: pairs built from cached token IDs must
+be truncated and scored exactly as CrossEncoder.predict scores raw texts,
+including across length buckets.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("torch")
+pytest.importorskip("transformers")
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import CrossEncoderReranker
+
+
+WORDS = "the backlot tour starts at nine and western town has a saloon parking is free".split()
+
+
+def text(num_words, offset=0):
+    return ' '.join(WORDS[(offset + i) % len(WORDS)] for i in range(num_words))
+
+
+# Shorter and longer than the 24-token pair limit, so several buckets are padded
+CANDIDATES = [{'id': f'chunk-{i}', 'text': text(n, i)} for i, n in enumerate([3, 30, 1, 12, 50, 7])]
+
+
+@pytest.fixture(scope="module")
+def model_dir(tmp_path_factory):
+    """A tiny randomly initialized BERT cross-encoder, built offline"""
+    import torch
+    from transformers import BertConfig, BertForSequenceClassification, BertTokenizerFast
+
+    path = tmp_path_factory.mktemp("tiny_cross_encoder")
+    vocab_file = path / "vocab.txt"
+    vocab_file.write_text("\n".join(["[PAD]", "[UNK]", "[CLS]", "[SEP]", "[MASK]"] + WORDS) + "\n")
+    BertTokenizerFast(vocab_file=str(vocab_file)).save_pretrained(str(path))
+
+    torch.manual_seed(0)
+    config = BertConfig(
+        vocab_size=5 + len(WORDS), hidden_size=16, num_hidden_layers=1, num_attention_heads=2,
+        intermediate_size=32, max_position_embeddings=64, num_labels=1
+    )
+    BertForSequenceClassification(config).save_pretrained(str(path))
+    return str(path)
+
+
+@pytest.fixture
+def reranker(model_dir):
+    return CrossEncoderReranker(model_dir, max_length=24, batch_size=2, device='cpu')
+
+
+@pytest.mark.parametrize('query', [text(4), text(15, 3)])
+def test_scores_match_predict(reranker, query):
+    # The long query is truncated together with the long chunks
+    expected = reranker.predict([(query, c['text']) for c in CANDIDATES])
+    np.testing.assert_allclose(reranker.score(query, CANDIDATES), expected, rtol=1e-4, atol=1e-5)
+
+
+def test_pairs_are_truncated_like_the_tokenizer(reranker):
+    tokenizer = reranker.tokenizer
+    for query_words in (1, 5, 15, 30):
+        for doc_words in (1, 10, 30):
+            query, doc = text(query_words), text(doc_words, 7)
+            expected = tokenizer(query, doc, truncation='longest_first', max_length=reranker.max_length)
+
+            input_ids, token_type_ids = reranker._build_pair(
+                tokenizer(query, add_special_tokens=False)['input_ids'],
+                tokenizer(doc, add_special_tokens=False)['input_ids']
+            )
+            assert input_ids == expected['input_ids']
+            assert token_type_ids == expected['token_type_ids']
+
+
+def test_cached_token_ids_are_reused(reranker, monkeypatch):
+    first = reranker._doc_token_ids(CANDIDATES)
+
+    calls = []
+    tokenizer = reranker.tokenizer
+    monkeypatch.setattr(reranker, 'tokenizer', lambda *args, **kwargs: calls.append(args) or tokenizer(*args, **kwargs))
+    second = reranker._doc_token_ids(CANDIDATES[::-1])
+
+    assert second == first[::-1]
+    assert calls == []
+    assert reranker.get_stats()['cached_documents'] == len(CANDIDATES)
+
+
+def test_token_cache_is_bounded(model_dir):
+    reranker = CrossEncoderReranker(model_dir, max_length=24, max_cached_documents=2, device='cpu')
+
+    # All IDs are returned even though the first chunk is evicted at once
+    token_ids = reranker._doc_token_ids(CANDIDATES[:3])
+    assert [len(ids) for ids in token_ids] == [3, 24, 1]
+    assert list(reranker._doc_tokens) == ['chunk-1', 'chunk-2']
@@ -0,0 +1,147 @@
+"""
+Tests for the per-request retrieval trace: stage records, candidate counts
+and cache events, the no-op NULL_TRACE, and the trace of a full retrieve().
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval.trace import RetrievalTrace, NULL_TRACE
+
+
+def test_stage_records_timing_and_details():
+    trace = RetrievalTrace()
+    with trace.stage('dense_search', top_k=5) as stage:
+        stage['hits'] = 3
+    with pytest.raises(RuntimeError):
+        with trace.stage('bm25'):
+            raise RuntimeError("index missing")
+
+    first, second = trace.to_dict()['stages']
+    assert (first['name'], first['top_k'], first['hits']) == ('dense_search', 5, 3)
+    assert first['duration_ms'] >= 0
+    # Failed stages are still recorded, in start order
+    assert second['name'] == 'bm25' and second['start_ms'] >= first['start_ms']
+
+
+def test_counts_cache_events_and_notes():
+    trace = RetrievalTrace()
+    trace.count('dense', 25)
+    trace.count('dense', 20)
+    trace.cache_event('rerank_cache', hits=3, misses=1)
+    trace.cache_event('rerank_cache', hits=2)
+    trace.note(rerank_mode='full')
+    trace.finish()
+
+    result = trace.to_dict()
+    assert result['candidate_counts'] == {'dense': 20}
+    assert result['cache'] == {'rerank_cache': {'hits': 5, 'misses': 1}}
+    assert result['rerank_mode'] == 'full'
+    assert result['total_ms'] == trace.total_ms >= 0
+
+
+def test_null_trace_records_nothing():
+    with NULL_TRACE.stage('fusion', candidates=3) as stage:
+        stage['kept'] = 2
+    NULL_TRACE.count('fused', 3)
+    NULL_TRACE.cache_event('rerank_cache', hits=1)
+    NULL_TRACE.note(rerank_mode='full')
+    NULL_TRACE.finish()
+
+    assert stage == {'candidates': 3, 'kept': 2}
+    result = NULL_TRACE.to_dict()
+    assert (result['stages'], result['candidate_counts'], result['cache']) == ([], {}, {})
+    assert 'rerank_mode' not in result and NULL_TRACE.total_ms is None
+
+
+CORPUS = [f'chunk-{i}' for i in range(6)]
+
+
+class FakeEmbeddingService:
+    def embed_query(self, query):
+        return np.array([1.0, 0.0])
+
+    def embed_texts(self, texts):
+        return np.array([[1.0, 0.0] for _ in texts])
+
+
+class FakeVectorStore:
+    def query_collection(self, query_embeddings=None, top_k=25, filter_metadata=None, **kwargs):
+        ids = CORPUS[:top_k]
+        return {
+            'ids': [ids] * len(query_embeddings),
+            'documents': [ids] * len(query_embeddings),
+            'metadatas': [[{} for _ in ids]] * len(query_embeddings),
+            'distances': [[0.05 * rank for rank in range(len(ids))]] * len(query_embeddings)
+        }
+
+
+class FakeBM25Index:
+    has_shared_ids = True
+    doc_ids = CORPUS
+
+    def __init__(self, chunk_table):
+        self.chunk_table = chunk_table
+
+    def search(self, query, top_k=25, **kwargs):
+        return [(idx, float(10 - idx)) for idx in reversed(range(min(top_k, len(CORPUS))))]
+
+    def text_at(self, idx):
+        return CORPUS[idx]
+
+
+class FakeReranker:
+    def score(self, query, candidates):
+        return np.array([float(c['id'].split('-')[1]) for c in candidates])
+
+
+def test_retrieve_fills_the_trace():
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("chromadb")
+    pytest.importorskip("rank_bm25")
+    from src.retrieval import RAGRetriever, RetrievalOptions, ChunkTable
+
+    retriever = RAGRetriever(
+        vector_store=FakeVectorStore(),
+        embedding_service=FakeEmbeddingService(),
+        use_reranking=False,
+        rerank_cache_size=64
+    )
+    retriever.reranker = FakeReranker()
+    retriever.bm25_index = FakeBM25Index(ChunkTable.from_records([{} for _ in CORPUS]))
+    options = RetrievalOptions(
+        use_reranking=True, use_hybrid_search=True, similarity_threshold=0.0,
+        initial_top_k=6, final_top_n=3
+    )
+
+    first = RetrievalTrace()
+    results = retriever.retrieve("where is the saloon", options, trace=first)
+    first = first.to_dict()
+
+    stages = {stage['name'] for stage in first['stages']}
+    assert {'query_embedding', 'dense_search', 'bm25', 'fusion', 'threshold_filter',
+            'rerank', 'cross_encoder'} <= stages
+    assert first['candidate_counts'] == {
+        'dense': 6, 'sparse': 6, 'fused': 6, 'after_threshold': 6, 'reranked': 6, 'final': 3
+    }
+    assert first['cache'] == {'rerank_cache': {'hits': 0, 'misses': 6}}
+    assert first['rerank_decision']['reranked'] is True
+    assert [r['id'] for r in results] == ['chunk-5', 'chunk-4', 'chunk-3']
+
+    # The same query again is served from the rerank cache
+    second = RetrievalTrace()
+    retriever.retrieve("where is the saloon", options, trace=second)
+    second = second.to_dict()
+    assert second['cache'] == {'rerank_cache': {'hits': 6, 'misses': 0}}
+    assert 'cross_encoder' not in {stage['name'] for stage in second['stages']}
+
+    # Calls without a trace leave the shared NULL_TRACE empty
+    retriever.retrieve("where is the saloon", options)
+    assert NULL_TRACE.to_dict()['stages'] == []
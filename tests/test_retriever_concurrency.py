@@ -0,0 +1,160 @@
+"""
+Concurrency test for RAGRetriever with request-scoped RetrievalOptions.
+Many threads share one retriever, each with different options, and every
+result must match what the same call returns when run alone.
+"""
+
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import RAGRetriever, RetrievalOptions, ChunkTable
+
+
+CORPUS = [
+    {'id': f'chunk-{i}', 'text': f'chunk {i} about topic {i % 4}', 'metadata': {'topic': i % 4}}
+    for i in range(20)
+]
+
+
+class FakeEmbeddingService:
+    """Embeds a query as a seed for the fake vector store"""
+
+    def embed_query(self, query: str) -> np.ndarray:
+        time.sleep(0.001)
+        return np.array([float(sum(map(ord, query)) % 97)])
+
+    def embed_texts(self, texts):
+        time.sleep(0.001)
+        return np.array([[float(sum(map(ord, text)) % 97)] for text in texts])
+
+
+class FakeVectorStore:
+    """Deterministic Chroma stand-in ranking the corpus by the query seed"""
+
+    def query_collection(self, query_embedding=None, top_k=25, filter_metadata=None,
+                         query_embeddings=None):
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        for embedding in query_embeddings or [query_embedding]:
+            seed = int(embedding[0])
+            docs = [
+                doc for doc in CORPUS
+                if not filter_metadata
+                or all(doc['metadata'].get(k) == v for k, v in filter_metadata.items())
+            ]
+            docs = sorted(docs, key=lambda doc: (int(doc['id'].split('-')[1]) * seed) % 23)[:top_k]
+            results['ids'].append([doc['id'] for doc in docs])
+            results['documents'].append([doc['text'] for doc in docs])
+            results['metadatas'].append([dict(doc['metadata']) for doc in docs])
+            results['distances'].append([0.05 * rank for rank in range(len(docs))])
+        return results
+
+
+class FakeBM25Index:
+    """BM25 stand-in sharing chunk IDs with the vector store"""
+
+    has_shared_ids = True
+    doc_ids = [doc['id'] for doc in CORPUS]
+    chunk_table = ChunkTable.from_records([doc['metadata'] for doc in CORPUS])
+
+    def search(self, query, top_k=25, document_types=None):
+        offset = len(query) % len(CORPUS)
+        order = [(offset + i) % len(CORPUS) for i in range(min(top_k, len(CORPUS)))]
+        return [(idx, float(len(order) - rank)) for rank, idx in enumerate(order)]
+
+    def text_at(self, idx):
+        return CORPUS[idx]['text']
+
+
+class FakeReranker:
+    """Cross-encoder stand-in that favours chunks with a high index"""
+
+    def score(self, query, candidates):
+        time.sleep(0.001)
+        return np.array([float(c['id'].split('-')[1]) for c in candidates])
+
+
+@pytest.fixture
+def retriever():
+    retriever = RAGRetriever(
+        vector_store=FakeVectorStore(),
+        embedding_service=FakeEmbeddingService(),
+        use_reranking=False,
+        use_hybrid_search=False,
+        rerank_cache_size=64
+    )
+    retriever.reranker = FakeReranker()
+    retriever.bm25_index = FakeBM25Index()
+    return retriever
+
+
+def option_grid():
+    """Options that each change the result of the same query"""
+    return [
+        RetrievalOptions(use_reranking=True, use_hybrid_search=True, similarity_threshold=0.0),
+        RetrievalOptions(use_reranking=False, use_hybrid_search=True, similarity_threshold=0.0),
+        RetrievalOptions(use_reranking=True, use_hybrid_search=False, similarity_threshold=0.0),
+        RetrievalOptions(use_reranking=False, use_hybrid_search=False, final_top_n=3),
+        RetrievalOptions(use_reranking=False, use_hybrid_search=True, hybrid_alpha=0.1,
+                         similarity_threshold=0.0, initial_top_k=10),
+        RetrievalOptions(use_reranking=False, use_hybrid_search=False, similarity_threshold=0.0,
+                         filter_metadata={'topic': 2}),
+    ]
+
+
+def result_ids(results):
+    return [r['id'] for r in results]
+
+
+def test_options_are_immutable():
+    options = RetrievalOptions(filter_metadata={'topic': 1})
+
+    with pytest.raises(Exception):
+        options.use_reranking = False
+    with pytest.raises(TypeError):
+        options.filter_metadata['topic'] = 2
+
+    changed = options.replace(final_top_n=2)
+    assert changed.final_top_n == 2
+    assert options.final_top_n == 5
+
+
+def test_options_do_not_mutate_retriever(retriever):
+    defaults = retriever.default_options
+    retriever.retrieve("who directed the film", RetrievalOptions(use_reranking=True, final_top_n=2))
+    assert retriever.default_options is defaults
+
+
+def test_concurrent_retrieval_matches_sequential(retriever):
+    queries = ["who directed the film", "budget of the sequel", "where was it shot"]
+    calls = [
+        (q, options, variants)
+        for q in queries
+        for options in option_grid()
+        for variants in (None, [q, q + " behind the scenes"])
+    ]
+
+    expected = {
+        i: result_ids(retriever.retrieve(*call)) for i, call in enumerate(calls)
+    }
+    assert len({tuple(ids) for ids in expected.values()}) > 1
+
+    jobs = [i for i in range(len(calls)) for _ in range(10)]
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        results = list(executor.map(lambda i: (i, retriever.retrieve(*calls[i])), jobs))
+
+    for i, chunks in results:
+        assert result_ids(chunks) == expected[i]
+        assert all(c['rerank_decision']['reranked'] == calls[i][1].use_reranking for c in chunks)
@@ -0,0 +1,120 @@
+"""
+Test of the NumPy reciprocal rank fusion against scores computed by hand.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+
+from src.retrieval import RAGRetriever, Candidate, ChunkTable
+
+
+def dense(*hits):
+    return [Candidate(i, i, {}, similarity=s, retrieval_method='dense') for i, s in hits]
+
+
+def sparse(*hits):
+    return [Candidate(i, i, {}, bm25_score=s, retrieval_method='sparse') for i, s in hits]
+
+
+@pytest.fixture
+def retriever():
+    return RAGRetriever(vector_store=None, embedding_service=None, use_reranking=False)
+
+
+def test_rrf_matches_hand_computed_scores(retriever):
+    # a: dense only, b and c: in both lists, d: sparse only
+    results = retriever._reciprocal_rank_fusion(
+        [dense(('a', 0.9), ('b', 0.8), ('c', 0.7))],
+        [sparse(('c', 9.0), ('d', 8.0), ('b', 7.0))],
+        alpha=0.6,
+        k=60
+    )
+
+    expected = {
+        'a': 0.6 / 61,
+        'b': 0.6 / 62 + 0.4 / 63,
+        'c': 0.6 / 63 + 0.4 / 61,
+        'd': 0.4 / 62,
+    }
+    # c 0.016081 > b 0.016027 > a 0.009836 > d 0.006452
+    assert [r['id'] for r in results] == ['c', 'b', 'a', 'd']
+    for result in results:
+        assert result['fusion_score'] == pytest.approx(expected[result['id']])
+        assert result['retrieval_method'] == 'hybrid'
+
+    by_id = {r['id']: r for r in results}
+    assert (by_id['b']['dense_rank'], by_id['b']['sparse_rank']) == (1, 2)
+    assert by_id['b']['bm25_score'] == 7.0
+    assert 'sparse_rank' not in by_id['a']
+    assert 'dense_rank' not in by_id['d'] and by_id['d']['bm25_score'] == 8.0
+
+
+def test_rrf_splits_weight_across_variants(retriever):
+    # Two dense variants share alpha; a chunk keeps its best rank and similarity
+    results = retriever._reciprocal_rank_fusion(
+        [dense(('a', 0.9), ('b', 0.8)), dense(('b', 0.95), ('a', 0.5))],
+        [],
+        alpha=1.0,
+        k=60
+    )
+
+    assert [r['id'] for r in results] == ['a', 'b']
+    for result in results:
+        assert result['fusion_score'] == pytest.approx(0.5 / 61 + 0.5 / 62)
+        assert result['dense_rank'] == 0
+        assert result['retrieval_method'] == 'dense'
+    assert {r['id']: r['similarity'] for r in results} == {'a': 0.9, 'b': 0.95}
+
+
+def test_rrf_of_empty_lists(retriever):
+    assert retriever._reciprocal_rank_fusion([[]], [[]]) == []
+
+
+class FakeVectorStore:
+    """Dense hits a (0.9) and b (0.3)"""
+
+    def query_collection(self, query_embeddings=None, top_k=25, filter_metadata=None, **kwargs):
+        return {
+            'ids': [['a', 'b']] * len(query_embeddings),
+            'documents': [['a', 'b']] * len(query_embeddings),
+            'metadatas': [[{}, {}]] * len(query_embeddings),
+            'distances': [[0.1, 0.7]] * len(query_embeddings)
+        }
+
+
+class FakeBM25Index:
+    """BM25 hits c and b, sharing chunk IDs with the vector store"""
+
+    has_shared_ids = True
+    doc_ids = ['a', 'b', 'c']
+    chunk_table = ChunkTable.from_records([{}, {}, {}])
+
+    def search(self, query, top_k=25, **kwargs):
+        return [(2, 5.0), (1, 4.0)]
+
+    def text_at(self, idx):
+        return self.doc_ids[idx]
+
+
+def test_threshold_keeps_sparse_only_hits(retriever):
+    retriever.vector_store = FakeVectorStore()
+    retriever.bm25_index = FakeBM25Index()
+
+    results = retriever._hybrid_retrieve(
+        "saloon", top_k=5, similarity_threshold=0.5, query_embeddings=np.array([[1.0, 0.0]])
+    )
+
+    # b is below the threshold; c has no similarity at all
+    assert {r['id'] for r in results} == {'a', 'c'}
+    assert 'similarity' not in next(r for r in results if r['id'] == 'c')
@@ -0,0 +1,98 @@
+"""
+Tests for the semantic cache of final rankings: the similarity threshold,
+LRU eviction, separation by retrieval settings, and invalidation when the
+index is rebuilt.
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval.semantic_cache import SemanticQueryCache
+from src.vector_store.index_manifest import write_index_manifest
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def put(cache, embedding, chunk_ids, settings='default'):
+    cache.put(embedding, settings, chunk_ids, [{'rerank_score': 1.0} for _ in chunk_ids])
+
+
+def test_hit_and_miss_around_the_threshold():
+    cache = SemanticQueryCache(max_size=4, similarity_threshold=0.95)
+    put(cache, unit(1, 0), ['a', 'b'])
+
+    # cos = 0.958 and 0.894
+    hit = cache.get(unit(1, 0.3), 'default')
+    assert hit['chunk_ids'] == ['a', 'b'] and hit['similarity'] == pytest.approx(0.958, abs=1e-3)
+    assert cache.get(unit(1, 0.5), 'default') is None
+
+    stats = cache.get_stats()
+    assert (stats['hits'], stats['misses'], stats['hit_rate']) == (1, 1, 0.5)
+
+
+def test_hits_return_copies():
+    cache = SemanticQueryCache(max_size=4)
+    put(cache, unit(1, 0), ['a'])
+
+    cache.get(unit(1, 0), 'default')['scores'][0]['rerank_score'] = 0.0
+    assert cache.get(unit(1, 0), 'default')['scores'] == [{'rerank_score': 1.0}]
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = SemanticQueryCache(max_size=2)
+    put(cache, unit(1, 0, 0), ['a'])
+    put(cache, unit(0, 1, 0), ['b'])
+    cache.get(unit(1, 0, 0), 'default')  # a is now more recent than b
+    put(cache, unit(0, 0, 1), ['c'])
+
+    assert cache.get(unit(0, 1, 0), 'default') is None
+    assert cache.get(unit(1, 0, 0), 'default')['chunk_ids'] == ['a']
+    assert cache.get(unit(0, 0, 1), 'default')['chunk_ids'] == ['c']
+    assert cache.get_stats()['evictions'] == 1 and cache.get_stats()['size'] == 2
+
+
+def test_settings_are_kept_apart():
+    cache = SemanticQueryCache(max_size=4)
+    put(cache, unit(1, 0), ['a'], settings='reranked')
+    put(cache, unit(1, 0), ['b'], settings='no-rerank')
+
+    assert cache.get(unit(1, 0), 'reranked')['chunk_ids'] == ['a']
+    assert cache.get(unit(1, 0), 'no-rerank')['chunk_ids'] == ['b']
+    assert cache.get(unit(1, 0), 'hybrid') is None
+
+
+def test_rebuilt_index_invalidates_the_cache(tmp_path):
+    manifest_path = tmp_path / "index_manifest.json"
+    write_index_manifest(str(manifest_path), chunks=10)
+    cache = SemanticQueryCache(max_size=4, manifest_path=str(manifest_path))
+    put(cache, unit(1, 0), ['a'])
+    assert cache.get(unit(1, 0), 'default') is not None
+
+    write_index_manifest(str(manifest_path), chunks=12)
+    # Make the rewrite visible on filesystems with coarse timestamps
+    stat = os.stat(manifest_path)
+    os.utime(manifest_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    assert cache.get(unit(1, 0), 'default') is None
+    assert cache.get_stats()['invalidations'] == 1 and cache.get_stats()['size'] == 0
+
+    # Entries written after the rebuild are served again
+    put(cache, unit(1, 0), ['a2'])
+    assert cache.get(unit(1, 0), 'default')['chunk_ids'] == ['a2']
+
+
+def test_zero_size_cache_stores_nothing():
+    cache = SemanticQueryCache(max_size=0)
+    put(cache, unit(1, 0), ['a'])
+    assert cache.get(unit(1, 0), 'default') is None
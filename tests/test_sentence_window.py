@@ -0,0 +1,97 @@
+"""
+Tests for sentence splitting at ingestion and sentence-window merging at
+query time.
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval.sentence_window import (
+    sentence_id,
+    window_id,
+    merge_sentence_windows,
+    window_sentence_ids
+)
+
+
+PAGE_TEXT = "Intro\n\nThe backlot opened in 1950. It has a western town! Does it have a saloon? Yes."
+
+
+def split_page_sentences(pages):
+    """Ingestion-time splitter; src.chunking needs the PDF and embedding stack"""
+    pytest.importorskip("fitz")
+    pytest.importorskip("langchain_text_splitters")
+    pytest.importorskip("sentence_transformers")
+    from src.chunking import split_page_sentences
+    return split_page_sentences(pages)
+
+
+def test_split_page_sentences_keeps_positions():
+    sentences = split_page_sentences(
+        [{'text': PAGE_TEXT, 'page_num': 3, 'source_file': 'tour_guide.pdf'}]
+    )
+
+    # The short heading is joined to the next sentence; the short last one is kept
+    assert [s['text'] for s in sentences] == [
+        "Intro The backlot opened in 1950.",
+        "It has a western town!",
+        "Does it have a saloon?",
+        "Yes.",
+    ]
+    assert [s['sentence_index'] for s in sentences] == [0, 1, 2, 3]
+    for sentence in sentences[1:]:
+        assert PAGE_TEXT[sentence['char_start']:sentence['char_end']] == sentence['text']
+    assert sentences[0]['char_start'] == 0
+    assert {(s['page_num'], s['document_type']) for s in sentences} == {(3, 'tour')}
+
+
+def test_lowercase_continuation_is_not_a_boundary():
+    sentences = split_page_sentences(
+        [{'text': "Tickets cost approx. twenty dollars per adult. Children enter free of charge.",
+          'page_num': 1, 'source_file': 'faq.pdf'}]
+    )
+    assert len(sentences) == 2
+
+
+def hit(source_file, page_num, index, similarity):
+    return {
+        'id': sentence_id(source_file, page_num, index),
+        'similarity': similarity,
+        'metadata': {'source_file': source_file, 'page_num': page_num, 'sentence_index': index}
+    }
+
+
+def test_overlapping_and_adjacent_windows_merge():
+    hits = [
+        hit('a.pdf', 1, 5, 0.9),
+        hit('a.pdf', 1, 9, 0.8),  # 8-10 is joined to 4-6 by the window 6-8 of the next hit
+        hit('a.pdf', 1, 7, 0.7),
+        hit('a.pdf', 1, 20, 0.6),
+        hit('b.pdf', 2, 0, 0.5),
+    ]
+    windows = merge_sentence_windows(hits, window=1)
+
+    assert [(w['source_file'], w['start'], w['end']) for w in windows] == [
+        ('a.pdf', 4, 10), ('a.pdf', 19, 21), ('b.pdf', 0, 1)
+    ]
+    assert windows[0]['best'] is hits[0]
+    assert sorted(windows[0]['hits']) == [5, 7, 9]
+    assert [w['rank'] for w in windows] == [0, 3, 4]
+
+
+def test_windows_on_different_pages_stay_apart():
+    windows = merge_sentence_windows([hit('a.pdf', 1, 3, 0.9), hit('a.pdf', 2, 3, 0.8)], window=2)
+    assert [(w['page_num'], w['start'], w['end']) for w in windows] == [(1, 1, 5), (2, 1, 5)]
+
+
+def test_window_ids_round_trip():
+    window = window_id('a.pdf', 1, 4, 6)
+    assert window_sentence_ids(window) == [sentence_id('a.pdf', 1, i) for i in (4, 5, 6)]
+    assert window_sentence_ids('chunk-12') == []
+    assert sentence_id('a.pdf', 1, 4) == sentence_id('a.pdf', '1', 4)
@@ -0,0 +1,134 @@
+"""
+Tests for per-conversation retrieval state: topic-shift detection, the
+carried-over candidate pool, and keeping the session current when a turn
+is answered from the semantic cache.
+"""
+
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+from src.retrieval import SessionRetrievalState
+
+
+def unit(*values):
+    vector = np.array(values, dtype=np.float32)
+    return vector / np.linalg.norm(vector)
+
+
+def chunks(*chunk_ids):
+    return [{'id': i, 'text': f'{i} text', 'metadata': {'page_num': 1}, 'rerank_score': 1.0} for i in chunk_ids]
+
+
+def test_first_turn_has_no_topic():
+    state = SessionRetrievalState()
+    assert state.check_topic(unit(1, 0)) == (False, 0.0)
+
+
+def test_topic_shift_detection():
+    state = SessionRetrievalState(topic_threshold=0.7)
+    state.update(unit(1, 0), chunks('a', 'b'), reused=False)
+
+    on_topic, similarity = state.check_topic(unit(1, 0.5))
+    assert on_topic and similarity == pytest.approx(0.894, abs=1e-3)
+
+    on_topic, similarity = state.check_topic(unit(0, 1))
+    assert not on_topic and similarity == pytest.approx(0.0)
+
+
+def test_follow_ups_move_the_topic():
+    state = SessionRetrievalState(topic_threshold=0.7, topic_decay=0.5)
+    state.update(unit(1, 0), chunks('a'), reused=False)
+    state.update(unit(0, 1), chunks('b'), reused=True)
+
+    assert state.topic == pytest.approx(unit(1, 1))
+    assert state.get_stats()['reuses'] == 1 and state.get_stats()['full_searches'] == 1
+
+    # A turn that is not a follow-up starts a new topic
+    state.update(unit(0, 1), chunks('c'), reused=False)
+    assert state.topic == pytest.approx(unit(0, 1))
+
+
+def test_pool_is_capped_and_stripped_of_scores():
+    state = SessionRetrievalState(pool_size=2)
+    state.update(unit(1, 0), chunks('a', 'b', 'c'), reused=False)
+
+    pool = state.pool()
+    assert [c['id'] for c in pool] == ['a', 'b']
+    assert all('rerank_score' not in c and c['retrieval_method'] == 'session' for c in pool)
+
+    state.reset()
+    assert state.check_topic(unit(1, 0)) == (False, 0.0)
+
+
+QUERY_EMBEDDINGS = {
+    'who built the saloon': unit(1, 0, 0),
+    'who built the saloon set': unit(1, 0.05, 0),  # Near-duplicate: semantic cache hit
+    'where can i park': unit(0, 0, 1),
+}
+CORPUS = [{'id': f'chunk-{i}', 'text': f'chunk {i}', 'metadata': {'page_num': i}} for i in range(6)]
+
+
+class FakeEmbeddingService:
+    def embed_query(self, query):
+        return QUERY_EMBEDDINGS[query]
+
+    def embed_texts(self, texts):
+        return np.array([QUERY_EMBEDDINGS[t] for t in texts])
+
+
+class FakeVectorStore:
+    """Ranks the corpus by the first embedding component"""
+
+    def query_collection(self, query_embedding=None, top_k=25, filter_metadata=None,
+                         query_embeddings=None, **kwargs):
+        results = {'ids': [], 'documents': [], 'metadatas': [], 'distances': []}
+        for embedding in query_embeddings or [query_embedding]:
+            docs = CORPUS if embedding[0] > 0.5 else CORPUS[::-1]
+            results['ids'].append([d['id'] for d in docs[:top_k]])
+            results['documents'].append([d['text'] for d in docs[:top_k]])
+            results['metadatas'].append([dict(d['metadata']) for d in docs[:top_k]])
+            results['distances'].append([0.01 * rank for rank in range(len(docs[:top_k]))])
+        return results
+
+    def get_by_ids(self, ids, include=None):
+        docs = [d for chunk_id in ids for d in CORPUS if d['id'] == chunk_id]
+        return {
+            'ids': [d['id'] for d in docs],
+            'documents': [d['text'] for d in docs],
+            'metadatas': [dict(d['metadata']) for d in docs]
+        }
+
+
+def test_semantic_cache_hit_updates_the_session():
+    pytest.importorskip("sentence_transformers")
+    pytest.importorskip("chromadb")
+    pytest.importorskip("rank_bm25")
+    from src.retrieval import RAGRetriever, RetrievalOptions
+
+    retriever = RAGRetriever(
+        vector_store=FakeVectorStore(),
+        embedding_service=FakeEmbeddingService(),
+        use_reranking=False,
+        semantic_cache_size=8
+    )
+    options = RetrievalOptions(use_reranking=False, use_hybrid_search=False, similarity_threshold=0.0)
+    session = SessionRetrievalState(topic_threshold=0.7)
+
+    retriever.retrieve('who built the saloon', options, session=session)
+    retriever.retrieve('where can i park', options, session=session)
+    assert session.topic == pytest.approx(QUERY_EMBEDDINGS['where can i park'])
+
+    results = retriever.retrieve('who built the saloon set', options, session=session)
+    assert 'semantic_cache_similarity' in results[0]
+
+    # The cached turn is the session's latest topic and pool
+    assert session.topic == pytest.approx(QUERY_EMBEDDINGS['who built the saloon set'])
+    assert [c['id'] for c in session.candidates] == [r['id'] for r in results]
+    assert session.get_stats()['full_searches'] == 3
@@ -0,0 +1,183 @@
+"""
+Tests for the lean source entries sent with answers and the lazily fetched
+full source behind /api/sources/{source_id}.
+"""
+
+import hashlib
+import json
+import sys
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+
+# Add parent directory to path
+project_root = Path(__file__).parent.parent
+sys.path.insert(0, str(project_root))
+
+pytest.importorskip("sentence_transformers")
+pytest.importorskip("chromadb")
+pytest.importorskip("rank_bm25")
+pytest.importorskip("ollama")
+pytest.importorskip("langchain_ollama")
+
+from backend.services.rag_service import (
+    RAGService, SOURCE_METADATA_FIELDS, SOURCE_SCORE_FIELDS
+)
+from src.retrieval.sentence_window import sentence_id, window_id
+
+
+class FakeStore:
+    """Stores (text, metadata) by ID and returns the IDs it has, like ChromaDB"""
+
+    def __init__(self, docs):
+        self.docs = docs
+
+    def get_by_ids(self, ids, include=None):
+        found = [i for i in ids if i in self.docs]
+        return {
+            'ids': found,
+            'documents': [self.docs[i][0] for i in found],
+            'metadatas': [self.docs[i][1] for i in found]
+        }
+
+
+CHUNK_METADATA = {
+    'source_file': 'docs/tour_guide.pdf', 'page_num': 4, 'document_type': 'tour',
+    'chapter': 'Backlot', 'entities': "['Western Town']", 'char_start': 120
+}
+CHUNKS = {
+    'chunk-1': ("The backlot opened in 1950.", CHUNK_METADATA),
+    'chunk-2': ("It has a western town.", dict(CHUNK_METADATA, page_num=5)),
+}
+SENTENCES = {
+    sentence_id('faq.pdf', 1, i): (text, {'source_file': 'faq.pdf', 'page_num': 1, 'sentence_index': i})
+    for i, text in enumerate(["Parking is free.", "The lot opens at 8am."])
+}
+
+
+def service(snippet_chars=240):
+    rag_service = RAGService.__new__(RAGService)
+    rag_service.source_snippet_chars = snippet_chars
+    rag_service.vector_store = FakeStore(CHUNKS)
+    rag_service.retriever = SimpleNamespace(sentence_store=FakeStore(SENTENCES))
+    return rag_service
+
+
+def test_serialized_source_is_lean():
+    chunk = {
+        'id': 'chunk-1',
+        'text': CHUNKS['chunk-1'][0],
+        'metadata': CHUNK_METADATA,
+        'similarity': 0.82,
+        'rerank_score': 3.1,
+        'retrieval_method': 'hybrid',
+        'fusion_score': 0.03,
+        'rerank_features': [0.1, 0.2]
+    }
+    source, = service().serialize_sources([chunk])
+
+    assert source == {
+        'id': 'chunk-1',
+        'source_id': 'chunk-1',
+        'title': 'tour_guide, Backlot',
+        'snippet': "The backlot opened in 1950.",
+        'truncated': False,
+        'metadata': {field: CHUNK_METADATA[field] for field in SOURCE_METADATA_FIELDS},
+        'similarity': 0.82,
+        'rerank_score': 3.1,
+        'retrieval_method': 'hybrid'
+    }
+    assert set(source) - {'id', 'source_id', 'title', 'snippet', 'truncated', 'metadata'} <= set(
+        SOURCE_SCORE_FIELDS
+    )
+
+
+def test_snippet_is_cut_at_a_word_boundary():
+    text = "Tickets cost twenty dollars per adult and children enter free."
+    source, = service(snippet_chars=20).serialize_sources(
+        [{'id': 'chunk-1', 'text': text, 'metadata': {}}]
+    )
+
+    assert source['snippet'] == "Tickets cost twenty…"
+    assert source['truncated'] is True
+    assert source['title'] == 'Unknown'
+
+
+def test_expanded_hit_points_at_its_chunk_run():
+    chunk = {
+        'id': 'chunk-1',
+        'text': "The backlot opened in 1950.\nIt has a western town.",
+        'hit_text': "The backlot opened in 1950.",
+        'expanded_chunk_ids': ['chunk-1', 'chunk-2'],
+        'metadata': CHUNK_METADATA
+    }
+    source, = service().serialize_sources([chunk])
+
+    assert source['source_id'] == 'chunk-1,chunk-2'
+    assert source['snippet'] == "The backlot opened in 1950."
+    assert source['truncated'] is True
+
+
+def test_get_source_returns_full_text_and_metadata():
+    assert service().get_source('chunk-1') == {
+        'id': 'chunk-1', 'text': "The backlot opened in 1950.", 'metadata': CHUNK_METADATA
+    }
+
+    run = service().get_source('chunk-1,chunk-2')
+    assert run['text'] == "The backlot opened in 1950.\nIt has a western town."
+    assert run['metadata'] == CHUNK_METADATA
+
+
+def test_get_source_joins_a_sentence_window():
+    # The window is clipped to the sentences the page has
+    window = window_id('faq.pdf', 1, 0, 3)
+    source = service().get_source(window)
+
+    assert source['id'] == window
+    assert source['text'] == "Parking is free. The lot opens at 8am."
+
+
+def test_unknown_source_is_none():
+    assert service().get_source('chunk-404') is None
+    # A chunk run must be complete
+    assert service().get_source('chunk-1,chunk-404') is None
+    assert service().get_source(window_id('faq.pdf', 9, 0, 2)) is None
+
+
+@pytest.fixture
+def client(monkeypatch):
+    pytest.importorskip("fastapi")
+    pytest.importorskip("httpx")
+    from fastapi.testclient import TestClient
+    import backend.main as main
+
+    # Not entered as a context manager, so the startup hook does not load the models
+    monkeypatch.setattr(main, "rag_service", service())
+    return TestClient(main.app)
+
+
+def test_source_endpoint_sets_cache_headers(client):
+    response = client.get("/api/sources/chunk-1")
+    assert response.status_code == 200
+
+    source = response.json()
+    assert source['text'] == "The backlot opened in 1950."
+    digest = hashlib.sha1(json.dumps(source, sort_keys=True, default=str).encode("utf-8"))
+    assert response.headers['etag'] == f'"{digest.hexdigest()}"'
+    assert response.headers['cache-control'].startswith("private, max-age=")
+
+
+def test_source_endpoint_revalidates_with_etag(client):
+    etag = client.get("/api/sources/chunk-1").headers['etag']
+
+    response = client.get("/api/sources/chunk-1", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers['etag'] == etag
+
+    assert client.get("/api/sources/chunk-1", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_source_endpoint_unknown_id_is_404(client):
+    assert client.get("/api/sources/chunk-404").status_code == 404